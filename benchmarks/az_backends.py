@@ -0,0 +1,64 @@
+"""
+Compare az command latency between the subprocess and in-process backends.
+
+Runs the same az command repeatedly through each backend and reports the
+first call (which includes loading the in-process CLI context) separately
+from the steady-state median. Requires an `az login` session; the in-process
+backend additionally requires `pip install fasttrack-terraform-cli[azure]`.
+
+Usage:
+    python benchmarks/az_backends.py
+    python benchmarks/az_backends.py --runs 20 --command "group list --query [].name"
+"""
+
+import os
+import shlex
+import statistics
+import sys
+import time
+
+import click
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fasttrack_cli.utils import azure_helper  # noqa: E402
+
+
+BACKENDS = {
+    "subprocess": azure_helper._subprocess_invoker,
+    "inprocess": azure_helper._inprocess_invoker,
+}
+
+
+def time_backend(invoker, args, runs: int) -> list:
+    """Run args through invoker runs times, returning per-call seconds"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        exit_code, _, stderr = invoker(args)
+        timings.append(time.perf_counter() - start)
+        if exit_code != 0:
+            raise click.ClickException(f"az {' '.join(args)} failed: {stderr.strip()}")
+    return timings
+
+
+@click.command()
+@click.option('--runs', default=10, help='Calls per backend')
+@click.option('--command', 'az_command', default='account show', help='az arguments to run')
+def main(runs, az_command):
+    """Benchmark az backends"""
+    args = shlex.split(az_command)
+
+    click.echo(f"{'BACKEND':<11} {'FIRST':>9} {'MEDIAN':>9} {'TOTAL':>9}")
+    for name, invoker in BACKENDS.items():
+        if name == "inprocess" and azure_helper._load_az_cli() is None:
+            click.echo(f"{name:<11} {'-':>9} {'-':>9} {'-':>9}  (azure-cli not installed)")
+            continue
+        timings = time_backend(invoker, args, runs)
+        steady = timings[1:] or timings
+        click.echo(f"{name:<11} {timings[0] * 1000:7.0f}ms {statistics.median(steady) * 1000:7.0f}ms "
+                   f"{sum(timings):8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Compare indexed and for_each container rendering at increasing container counts.
+
+Measures template render time and total generated file size for each mode and,
+with --validate, the time `terraform validate` takes on the result (providers
+are installed once per directory through the shared plugin cache).
+
+Usage:
+    python benchmarks/container_scaling.py
+    python benchmarks/container_scaling.py --sizes 10,1000,10000 --validate
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import click
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fasttrack_cli.utils.config_loader import build_config  # noqa: E402
+from fasttrack_cli.utils.template_generator import TerraformTemplateGenerator  # noqa: E402
+from fasttrack_cli.utils.terraform_helper import terraform_env  # noqa: E402
+
+
+MODES = ("indexed", "for_each")
+
+
+def container_config(count: int, mode: str) -> dict:
+    """Build a configuration with count containers"""
+    return build_config({
+        "project_name": "bench",
+        "resource_group": "bench-rg",
+        "storage_account": "benchstg",
+        "containers": tuple(f"container-{i:05d}" for i in range(count)),
+        "container_mode": mode,
+    })
+
+
+def time_validate(directory: str) -> float:
+    """Run terraform init and validate, returning the validate time in seconds"""
+    env = terraform_env()
+    subprocess.run(["terraform", "init", "-input=false", "-backend=false"], cwd=directory,
+                   env=env, check=True, capture_output=True)
+    start = time.perf_counter()
+    subprocess.run(["terraform", "validate"], cwd=directory, env=env, check=True, capture_output=True)
+    return time.perf_counter() - start
+
+
+@click.command()
+@click.option('--sizes', default='10,1000,10000', help='Comma-separated container counts')
+@click.option('--validate', is_flag=True, help='Also time terraform validate (requires terraform)')
+def main(sizes, validate):
+    """Benchmark container rendering modes"""
+    generator = TerraformTemplateGenerator()
+    generator.preload()
+
+    click.echo(f"{'CONTAINERS':>10}  {'MODE':<9} {'RENDER':>10} {'SIZE':>10} {'VALIDATE':>10}")
+    for count in (int(s) for s in sizes.split(",")):
+        for mode in MODES:
+            config = container_config(count, mode)
+
+            start = time.perf_counter()
+            rendered = {name: generator.render(template, config)
+                        for template, name in generator.output_files(config)}
+            render_time = time.perf_counter() - start
+
+            validate_time = "-"
+            if validate:
+                directory = tempfile.mkdtemp(prefix="fasttrack-bench-")
+                try:
+                    for name, content in rendered.items():
+                        with open(os.path.join(directory, name), "w") as f:
+                            f.write(content)
+                    validate_time = f"{time_validate(directory):9.2f}s"
+                finally:
+                    shutil.rmtree(directory, ignore_errors=True)
+
+            size_kb = sum(len(content) for content in rendered.values()) / 1024
+            click.echo(f"{count:>10}  {mode:<9} {render_time * 1000:8.1f}ms {size_kb:8.1f}KB {validate_time:>10}")
+
+
+if __name__ == "__main__":
+    main()
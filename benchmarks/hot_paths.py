@@ -0,0 +1,187 @@
+"""
+Micro-benchmarks for the generate hot paths: rendering, validation and config loading.
+
+Every case is run --repeat times after one warm-up run; results are reported
+as min/median/mean milliseconds and can be written as JSON. --compare checks
+the medians against a stored result file and exits with status 1 when a case
+is slower than the baseline by more than --threshold.
+
+Cases:
+    generate_cold_*    fresh Jinja environment without the bytecode cache
+    generate_cached_*  fresh environment loading templates from the bytecode cache
+    generate_warm_*    one preloaded generator reused across runs
+    generate_noop_*    unchanged config, skipped by the generation manifest
+    validate_config_*  validation of the resolved configuration
+    load_config_*      YAML loading, schema check and merge as done by `generate --config-file`
+                       (cold clears the parsed-layer cache, warm reuses it)
+
+"small" configs have 3 containers, "large" ones --large-containers (default 1000).
+
+Usage:
+    python benchmarks/hot_paths.py --output baseline.json
+    python benchmarks/hot_paths.py --compare baseline.json --threshold 0.2
+    python benchmarks/hot_paths.py --filter generate_warm
+"""
+
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import click
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fasttrack_cli.utils.config_loader import (  # noqa: E402
+    build_config, clear_layer_cache, load_layered_config, merge_file_config
+)
+from fasttrack_cli.utils.schema import file_schema  # noqa: E402
+from fasttrack_cli.utils.template_generator import TerraformTemplateGenerator, validate_config  # noqa: E402
+
+
+def file_config(containers: int) -> dict:
+    """YAML configuration with the given number of containers"""
+    return {
+        "project_name": "bench",
+        "resource_group": "bench-rg",
+        "location": "eastus",
+        "environment": "production",
+        "app_name": "bench-app",
+        "redirect_url": "https://bench.example.com/callback",
+        "storage_account": "benchstg",
+        "containers": [f"container-{i:05d}" for i in range(containers)],
+        "remote_state": {"storage_account": "benchstate", "container": "tfstate", "key": "bench.tfstate"},
+    }
+
+
+def load_config(config_file: str) -> dict:
+    """The config file path of `generate --config-file`"""
+    loaded = load_layered_config([config_file])
+    errors = file_schema().validate(loaded)
+    if errors:
+        raise click.ClickException(f"Benchmark config is invalid: {errors}")
+    return build_config(merge_file_config(loaded))
+
+
+def build_cases(workdir: str, large_containers: int) -> dict:
+    """Map of case name to a zero-argument callable"""
+    cases = {}
+    warm = TerraformTemplateGenerator()
+    warm.preload()
+    # Fill the bytecode cache so the cached cases measure loading, not compiling
+    TerraformTemplateGenerator().preload()
+
+    for size, containers in (("small", 3), ("large", large_containers)):
+        config_file = os.path.join(workdir, f"{size}.yaml")
+        with open(config_file, "w") as f:
+            yaml.safe_dump(file_config(containers), f)
+        config = load_config(config_file)
+        out = os.path.join(workdir, size)
+
+        cases[f"generate_cold_{size}"] = lambda c=config, o=out: (
+            TerraformTemplateGenerator(bytecode_cache=False).generate(o, c, quiet=True, force=True))
+        cases[f"generate_cached_{size}"] = lambda c=config, o=out: (
+            TerraformTemplateGenerator().generate(o, c, quiet=True, force=True))
+        cases[f"generate_warm_{size}"] = lambda c=config, o=out: warm.generate(o, c, quiet=True, force=True)
+        cases[f"generate_noop_{size}"] = lambda c=config, o=out: warm.generate(o, c, quiet=True)
+        cases[f"validate_config_{size}"] = lambda c=config: validate_config(c)
+
+        def load_cold(f=config_file):
+            clear_layer_cache()
+            return load_config(f)
+        cases[f"load_config_cold_{size}"] = load_cold
+        cases[f"load_config_warm_{size}"] = lambda f=config_file: load_config(f)
+
+    return cases
+
+
+def run_case(func, repeat: int) -> dict:
+    """Time func repeat times after one warm-up call"""
+    func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "min_ms": round(min(samples), 4),
+        "median_ms": round(statistics.median(samples), 4),
+        "mean_ms": round(statistics.mean(samples), 4),
+        "repeat": repeat,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Names of cases whose median regressed by more than threshold"""
+    regressions = []
+    click.echo(f"\n{'CASE':<26} {'BASELINE':>10} {'CURRENT':>10} {'CHANGE':>8}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            click.echo(f"{name:<26} {'-':>10} {result['median_ms']:8.2f}ms {'new':>8}")
+            continue
+        change = result["median_ms"] / base["median_ms"] - 1 if base["median_ms"] else 0.0
+        regressed = change > threshold
+        if regressed:
+            regressions.append(name)
+        click.secho(f"{name:<26} {base['median_ms']:8.2f}ms {result['median_ms']:8.2f}ms {change:+7.1%}",
+                    fg="red" if regressed else None)
+    return regressions
+
+
+@click.command()
+@click.option('--repeat', default=20, help='Timed runs per case')
+@click.option('--large-containers', default=1000, help='Containers in the large configs')
+@click.option('--filter', 'name_filter', help='Only run cases whose name contains this string')
+@click.option('--output', type=click.Path(dir_okay=False), help='Write results as JSON')
+@click.option('--compare', 'baseline_file', type=click.Path(exists=True, dir_okay=False),
+              help='Compare medians against a previous --output file')
+@click.option('--threshold', default=0.25, help='Allowed slowdown before a case counts as regressed (0.25 = 25%)')
+def main(repeat, large_containers, name_filter, output, baseline_file, threshold):
+    """Benchmark render, validate and config-load hot paths"""
+    workdir = tempfile.mkdtemp(prefix="fasttrack-bench-")
+    # Keep the bytecode and layer caches the cases fill and clear away from the user's cache
+    os.environ["FASTTRACK_CACHE_DIR"] = os.path.join(workdir, "cache")
+    try:
+        cases = build_cases(workdir, large_containers)
+        results = {}
+        click.echo(f"{'CASE':<26} {'MIN':>10} {'MEDIAN':>10} {'MEAN':>10}")
+        for name, func in cases.items():
+            if name_filter and name_filter not in name:
+                continue
+            result = run_case(func, repeat)
+            results[name] = result
+            click.echo(f"{name:<26} {result['min_ms']:8.2f}ms {result['median_ms']:8.2f}ms {result['mean_ms']:8.2f}ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if output:
+        with open(output, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "large_containers": large_containers,
+                "results": results,
+            }, f, indent=2)
+        click.echo(f"\n📄 Results written to: {output}")
+
+    if baseline_file:
+        with open(baseline_file) as f:
+            baseline = json.load(f)
+        if baseline.get("large_containers") != large_containers:
+            click.secho("⚠️  Baseline was recorded with a different --large-containers", fg="yellow")
+        regressions = compare(results, baseline["results"], threshold)
+        if regressions:
+            click.secho(f"\n✗ {len(regressions)} regressed by more than {threshold:.0%}: {', '.join(regressions)}",
+                        fg="red")
+            sys.exit(1)
+        click.secho(f"\n✓ No case regressed by more than {threshold:.0%}", fg="green")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Startup-time regression check for the CLI.
+
+Imports fasttrack_cli.cli in --runs fresh interpreters and compares the
+median import time against --budget milliseconds. Also fails when the
+import loads a module that only some commands need (Jinja, YAML, asyncio):
+those belong inside the commands that use them. Exits with status 1 on
+either regression.
+
+Usage:
+    python benchmarks/startup.py
+    python benchmarks/startup.py --budget 80 --runs 20
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+import click
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules importing the CLI must not load
+LAZY_MODULES = ("jinja2", "yaml", "asyncio")
+
+# Milliseconds; importing click alone accounts for most of it
+DEFAULT_BUDGET = 150
+
+PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+import fasttrack_cli.cli
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {LAZY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import() -> dict:
+    """Import the CLI in a fresh interpreter: {"seconds", "loaded"}"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    result = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=False)
+    if result.returncode != 0:
+        raise click.ClickException(f"Importing fasttrack_cli.cli failed:\n{result.stderr.strip()}")
+    return json.loads(result.stdout)
+
+
+@click.command()
+@click.option('--budget', default=DEFAULT_BUDGET, type=float, show_default=True,
+              help='Allowed median import time in milliseconds')
+@click.option('--runs', default=10, type=click.IntRange(min=1), help='Fresh interpreters to measure')
+def main(budget, runs):
+    """Check CLI import time and lazily imported modules"""
+    samples = [measure_import() for _ in range(runs)]
+    timings = [sample["seconds"] * 1000 for sample in samples]
+    median = statistics.median(timings)
+    loaded = sorted({module for sample in samples for module in sample["loaded"]})
+
+    click.echo(f"import fasttrack_cli.cli: min {min(timings):.1f}ms, median {median:.1f}ms "
+               f"(budget {budget:g}ms, {runs} runs)")
+
+    failed = False
+    if median > budget:
+        click.secho(f"✗ Median import time is over budget by {median - budget:.1f}ms", fg="red")
+        failed = True
+    if loaded:
+        click.secho(f"✗ Importing the CLI loads {', '.join(loaded)}; import it inside the commands that use it",
+                    fg="red")
+        failed = True
+    if failed:
+        sys.exit(1)
+    click.secho("✓ Startup within budget", fg="green")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,31 +6,45 @@ import sys
 from pathlib import Path
 from typing import Optional
 
-from .utils.azure_helper import (
-    validate_azure_login,
-    get_current_subscription,
-    resource_group_exists,
-    storage_account_exists,
-    app_registration_exists
-)
-from .utils.terraform_helper import (
-    validate_terraform_installation,
-    terraform_init,
-    terraform_validate,
-    terraform_plan,
-    terraform_apply,
-    terraform_destroy,
-    terraform_output,
-    terraform_import
-)
-from .utils.template_generator import TerraformTemplateGenerator, validate_config
+# Command modules import their helpers lazily so that light commands such as
+# `output` and `--version` do not pay for Jinja, YAML or Azure lookups.
 
 
 @click.group()
 @click.version_option(version="1.0.0")
-def cli():
+@click.option('--no-cache', is_flag=True, help='Bypass cached Azure lookups and outputs for this command')
+@click.option('--no-daemon', is_flag=True, help='Run in this process even if `fasttrack serve` is running')
+@click.option('--az-backend', type=click.Choice(['auto', 'inprocess', 'subprocess']), default=None,
+              help='Run az commands in-process through azure-cli-core or as subprocesses (default: auto)')
+@click.option('--profile', is_flag=True, help='Time every phase and subprocess and print a summary')
+@click.option('--profile-trace', type=click.Path(dir_okay=False),
+              help='Also write a trace-event JSON file (implies --profile)')
+def cli(no_cache, no_daemon, az_backend, profile, profile_trace):
     """Fasttrack Terraform CLI - Manage Azure resources with Terraform"""
-    pass
+    if no_cache:
+        from .utils.cache import set_cache_enabled
+        set_cache_enabled(False)
+    if no_daemon:
+        from .utils.daemon import set_daemon_enabled
+        set_daemon_enabled(False)
+    if az_backend:
+        from .utils.azure_helper import set_az_backend
+        set_az_backend(az_backend)
+    if profile or profile_trace:
+        from .utils.profiler import set_profiling_enabled
+        set_profiling_enabled(True)
+        click.get_current_context().call_on_close(lambda: _finish_profile(profile_trace))
+
+
+def _finish_profile(trace_file):
+    """Print the profile summary and write the trace file when the command ends"""
+    from .utils.profiler import get_profiler
+
+    profiler = get_profiler()
+    profiler.print_summary()
+    if trace_file:
+        profiler.write_trace(trace_file)
+        click.echo(f"📄 Trace written to: {trace_file} (open in chrome://tracing or ui.perfetto.dev)", err=True)
 
 
 @cli.command()
@@ -43,60 +57,108 @@ def cli():
 @click.option('--storage-account', help='Storage account name (3-24 lowercase alphanumeric chars)')
 @click.option('--use-existing-storage', is_flag=True, help='Use existing storage account (only create containers)')
 @click.option('--containers', multiple=True, help='Storage container names (can specify multiple)')
+@click.option('--container-mode', default='indexed', type=click.Choice(['indexed', 'for_each']),
+              help='Render containers as numbered resources or one for_each resource keyed by name')
+@click.option('--migrate-indexed-containers', is_flag=True,
+              help='Write moved blocks migrating container_N resources to for_each addresses')
 @click.option('--storage-tier', default='Standard', type=click.Choice(['Standard', 'Premium']), help='Storage tier')
 @click.option('--storage-replication', default='LRS', type=click.Choice(['LRS', 'GRS', 'RAGRS', 'ZRS']), help='Storage replication type')
 @click.option('--secret-rotation-months', default=12, type=int, help='Client secret rotation period in months')
 @click.option('--output-dir', default='./terraform-generated', help='Output directory for Terraform files')
 @click.option('--skip-validation', is_flag=True, help='Skip Azure login validation')
 @click.option('--dry-run', is_flag=True, help='Show what would be generated without writing files')
-@click.option('--config-file', type=click.Path(exists=True), help='Load configuration from YAML file')
+@click.option('--config-file', multiple=True, type=click.Path(exists=True),
+              help='Load configuration from YAML file (repeatable; later files override earlier ones)')
 @click.option('--enable-remote-state', is_flag=True, help='Add remote state backend configuration')
 @click.option('--state-storage-account', help='Storage account for remote state')
 @click.option('--state-container', default='tfstate', help='Container name for remote state')
 @click.option('--state-key', help='State file key (default: <project-name>.tfstate)')
+@click.option('--config-dir', help='Generate every YAML config in a directory or glob into <output-dir>/<config name>')
+@click.option('--workers', type=int, help='Worker processes for --config-dir (default: CPU count)')
+@click.option('--force', is_flag=True, help='Rewrite all files even if the manifest shows no changes')
+@click.option('--changes-file', type=click.Path(), help='Write a JSON report of changed projects and files')
 def generate(project_name, resource_group, location, environment, app_name, redirect_url,
-             storage_account, use_existing_storage, containers, storage_tier, storage_replication,
-             secret_rotation_months, output_dir, skip_validation, dry_run, config_file,
-             enable_remote_state, state_storage_account, state_container, state_key):
+             storage_account, use_existing_storage, containers, container_mode, migrate_indexed_containers,
+             storage_tier, storage_replication, secret_rotation_months, output_dir, skip_validation, dry_run, config_file,
+             enable_remote_state, state_storage_account, state_container, state_key,
+             config_dir, workers, force, changes_file):
     """Generate Terraform configuration files"""
+    from .utils.config_loader import load_layered_config, merge_file_config, build_config
+    from .utils.template_generator import TerraformTemplateGenerator
+    from .utils.schema import file_schema, unknown_file_fields, validate_resolved_config
+    from .utils.profiler import start_phase
 
     click.secho("\n🚀 Fasttrack Terraform CLI - Generate Configuration", fg="cyan", bold=True)
     click.echo("=" * 60)
 
+    # Batch mode renders every config in a directory or glob
+    if config_dir:
+        _generate_batch(config_dir, output_dir, workers, skip_validation, dry_run, force, changes_file)
+        return
+
+    settings = {
+        "project_name": project_name,
+        "resource_group": resource_group,
+        "location": location,
+        "environment": environment,
+        "app_name": app_name,
+        "redirect_url": redirect_url,
+        "storage_account": storage_account,
+        "use_existing_storage": use_existing_storage,
+        "containers": containers,
+        "container_mode": container_mode,
+        "migrate_indexed_containers": migrate_indexed_containers,
+        "storage_tier": storage_tier,
+        "storage_replication": storage_replication,
+        "secret_rotation_months": secret_rotation_months,
+        "enable_remote_state": enable_remote_state,
+        "state_storage_account": state_storage_account,
+        "state_container": state_container,
+        "state_key": state_key,
+    }
+
+    # A running `fasttrack serve` daemon keeps templates and Azure context warm
+    if not dry_run and _generate_via_daemon(settings, config_file, output_dir, skip_validation, force, changes_file):
+        return
+
     # Load configuration from file if provided
+    start_phase("load config")
     if config_file:
-        import yaml
-        click.echo(f"📄 Loading configuration from: {config_file}")
+        click.echo(f"📄 Loading configuration from: {', '.join(config_file)}")
         try:
-            with open(config_file, 'r') as f:
-                file_config = yaml.safe_load(f)
-                # Command line args override file config
-                project_name = project_name or file_config.get('project_name')
-                resource_group = resource_group or file_config.get('resource_group')
-                location = file_config.get('location', location)
-                environment = file_config.get('environment', environment)
-                app_name = app_name or file_config.get('app_name')
-                redirect_url = redirect_url or file_config.get('redirect_url')
-                storage_account = storage_account or file_config.get('storage_account')
-                use_existing_storage = use_existing_storage or file_config.get('use_existing_storage', False)
-                containers = containers or tuple(file_config.get('containers', []))
-                storage_tier = file_config.get('storage_tier', storage_tier)
-                storage_replication = file_config.get('storage_replication', storage_replication)
-                secret_rotation_months = file_config.get('secret_rotation_months', secret_rotation_months)
-
-                # Remote state config from file
-                if 'remote_state' in file_config:
-                    enable_remote_state = True
-                    rs = file_config['remote_state']
-                    state_storage_account = state_storage_account or rs.get('storage_account')
-                    state_container = rs.get('container', state_container)
-                    state_key = state_key or rs.get('key')
-
-                click.secho("✓ Configuration loaded from file", fg="green")
+            # Each file brings the layers it extends; later files override earlier ones
+            file_config = load_layered_config(list(config_file))
         except Exception as e:
             click.secho(f"✗ Error loading config file: {str(e)}", fg="red")
             sys.exit(1)
 
+        file_errors = file_schema().validate(file_config)
+        if file_errors:
+            click.secho(f"✗ Invalid config file: {', '.join(config_file)}", fg="red")
+            for path, message in file_errors:
+                click.echo(f"    {path}: {message}")
+            sys.exit(1)
+        for path, message in unknown_file_fields(file_config):
+            click.secho(f"⚠️  {path}: {message}, ignored", fg="yellow")
+
+        # Command line args override file config
+        settings = merge_file_config(file_config, settings)
+        click.secho("✓ Configuration loaded from file", fg="green")
+
+    project_name = settings["project_name"]
+    resource_group = settings["resource_group"]
+    location = settings["location"]
+    environment = settings["environment"]
+    app_name = settings["app_name"]
+    storage_account = settings["storage_account"]
+    use_existing_storage = settings["use_existing_storage"]
+    containers = settings["containers"]
+    storage_tier = settings["storage_tier"]
+    storage_replication = settings["storage_replication"]
+    enable_remote_state = settings["enable_remote_state"]
+    state_storage_account = settings["state_storage_account"]
+    state_container = settings["state_container"]
+
     # Ensure required fields are present
     if not project_name:
         click.secho("✗ project_name is required (via --project-name or config file)", fg="red")
@@ -105,8 +167,10 @@ def generate(project_name, resource_group, location, environment, app_name, redi
         click.secho("✗ resource_group is required (via --resource-group or config file)", fg="red")
         sys.exit(1)
 
-    # Validate prerequisites
+    # Validate prerequisites (dry runs never call Azure or Terraform)
+    start_phase("azure checks")
     if not skip_validation and not dry_run:
+        from .utils.azure_helper import validate_azure_login
         try:
             validate_azure_login()
             click.secho("✓ Azure CLI authenticated", fg="green")
@@ -114,53 +178,32 @@ def generate(project_name, resource_group, location, environment, app_name, redi
             click.secho(f"✗ {str(e)}", fg="red")
             sys.exit(1)
 
-    try:
-        validate_terraform_installation()
-        click.secho("✓ Terraform installed", fg="green")
-    except click.ClickException as e:
-        click.secho(f"✗ {str(e)}", fg="red")
-        sys.exit(1)
+    start_phase("terraform check")
+    if not dry_run:
+        from .utils.terraform_helper import validate_terraform_installation
+        try:
+            validate_terraform_installation()
+            click.secho("✓ Terraform installed", fg="green")
+        except click.ClickException as e:
+            click.secho(f"✗ {str(e)}", fg="red")
+            sys.exit(1)
 
     # Build configuration
-    config = {
-        "project_name": project_name,
-        "resource_group_name": resource_group,
-        "location": location,
-        "environment": environment,
-        "create_app_registration": bool(app_name),
-        "create_storage": bool(storage_account),
-        "use_existing_storage": use_existing_storage,
-        "storage_tier": storage_tier,
-        "storage_replication": storage_replication,
-        "secret_rotation_months": secret_rotation_months,
-        "secret_display_name": "Generated by Fasttrack CLI",
-        "enable_remote_state": enable_remote_state,
-        "state_storage_account": state_storage_account,
-        "state_container": state_container,
-        "state_key": state_key or f"{project_name}.tfstate"
-    }
-
-    if app_name:
-        config.update({
-            "azuread_app_name": app_name,
-            "redirect_url": redirect_url or f"https://{app_name}.example.com/auth/callback"
-        })
-
-    if storage_account:
-        config.update({
-            "storage_account_name": storage_account,
-            "storage_containers": list(containers) if containers else []
-        })
+    start_phase("validate config")
+    config = build_config(settings)
 
     # Validate configuration
-    is_valid, error_msg = validate_config(config)
-    if not is_valid:
-        click.secho(f"✗ Configuration error: {error_msg}", fg="red")
+    errors = validate_resolved_config(config)
+    if errors:
+        click.secho("✗ Configuration error:", fg="red")
+        for path, message in errors:
+            click.echo(f"    {path}: {message}")
         sys.exit(1)
 
     click.secho("✓ Configuration validated", fg="green")
 
     # Validate existing storage account if specified
+    start_phase("azure checks")
     if storage_account and use_existing_storage and not skip_validation and not dry_run:
         from .utils.azure_helper import storage_account_exists
         click.echo(f"\nChecking if storage account '{storage_account}' exists...")
@@ -192,7 +235,8 @@ def generate(project_name, resource_group, location, environment, app_name, redi
             click.echo(f"  Storage Tier: {storage_tier}")
             click.echo(f"  Replication: {storage_replication}")
         if containers:
-            click.echo(f"  Containers: {', '.join(containers)}")
+            shown = ', '.join(containers[:10]) + (", ..." if len(containers) > 10 else "")
+            click.echo(f"  Containers ({len(containers)}, {config['container_mode']}): {shown}")
 
     if enable_remote_state:
         click.echo(f"\n🔄 Remote State:")
@@ -205,20 +249,26 @@ def generate(project_name, resource_group, location, environment, app_name, redi
         click.echo("\n" + "=" * 60)
         click.secho("🔍 DRY RUN MODE - No files will be written", fg="yellow", bold=True)
         click.echo("\n📄 Files that would be generated:")
-        click.echo(f"  {output_dir}/main.tf")
-        click.echo(f"  {output_dir}/variables.tf")
-        click.echo(f"  {output_dir}/data.tf")
-        click.echo(f"  {output_dir}/outputs.tf")
-        if enable_remote_state:
-            click.echo(f"  {output_dir}/backend.tf")
+        for _, file_name in TerraformTemplateGenerator.output_files(config):
+            click.echo(f"  {output_dir}/{file_name}")
         click.echo(f"\n✓ Configuration validated successfully")
         click.echo(f"\n💡 To generate files, run without --dry-run flag")
         return
 
     # Generate templates
+    start_phase("render")
     click.echo("\n📝 Generating Terraform files...")
     generator = TerraformTemplateGenerator()
-    generator.generate(output_dir, config)
+    changed_files = generator.generate(output_dir, config, force=force)
+
+    if changes_file:
+        from .utils.batch import write_changes_file
+        write_changes_file(changes_file, [{
+            "config_file": config_file[-1] if config_file else None,
+            "output_dir": output_dir,
+            "success": True,
+            "changed_files": changed_files,
+        }])
 
     click.echo("\n✅ Configuration generated successfully!")
     click.echo(f"\n📂 Next steps:")
@@ -227,11 +277,147 @@ def generate(project_name, resource_group, location, environment, app_name, redi
     click.echo(f"  3. Or manually run: cd {output_dir} && terraform init && terraform apply")
 
 
+def _generate_via_daemon(settings, config_file, output_dir, skip_validation, force, changes_file):
+    """Forward a single-project generate to the daemon; returns False if none is running"""
+    from .utils.daemon import forward
+
+    response = forward("generate", {
+        "settings": {k: list(v) if isinstance(v, tuple) else v for k, v in settings.items()},
+        "config_files": [os.path.abspath(f) for f in config_file],
+        "output_dir": os.path.abspath(output_dir),
+        "skip_validation": skip_validation,
+        "force": force,
+    })
+    if response is None:
+        return False
+
+    if not response["ok"]:
+        click.secho(f"✗ {response['error']}", fg="red")
+        for path, message in response["errors"]:
+            click.echo(f"    {path}: {message}")
+        sys.exit(1)
+
+    changed_files = response["result"]["changed_files"]
+    if changed_files:
+        click.secho(f"✓ Terraform configuration generated in: {output_dir} (via daemon)", fg="green")
+        click.echo(f"  Changed: {', '.join(changed_files)}")
+    else:
+        click.secho(f"✓ Terraform configuration up to date in: {output_dir} (via daemon)", fg="green")
+
+    if changes_file:
+        from .utils.batch import write_changes_file
+        write_changes_file(changes_file, [{
+            "config_file": config_file[-1] if config_file else None,
+            "output_dir": output_dir,
+            "success": True,
+            "changed_files": changed_files,
+        }])
+    return True
+
+
+def _generate_batch(config_dir, output_dir, workers, skip_validation, dry_run, force, changes_file):
+    """Generate every project config matched by config_dir"""
+    import time
+    from .utils.batch import discover_config_files, generate_batch, print_batch_report, write_changes_file
+    from .utils.profiler import start_phase
+
+    start_phase("discover configs")
+    config_files = discover_config_files(config_dir)
+    if not config_files:
+        click.secho(f"✗ No YAML config files found in: {config_dir}", fg="red")
+        sys.exit(1)
+
+    click.echo(f"📄 Found {len(config_files)} configuration files in: {config_dir}")
+
+    # Pre-flight checks run once for the whole batch
+    start_phase("azure checks")
+    if not skip_validation and not dry_run:
+        from .utils.azure_helper import validate_azure_login
+        try:
+            validate_azure_login()
+            click.secho("✓ Azure CLI authenticated", fg="green")
+        except click.ClickException as e:
+            click.secho(f"✗ {str(e)}", fg="red")
+            sys.exit(1)
+
+    start_phase("terraform check")
+    if not dry_run:
+        from .utils.terraform_helper import validate_terraform_installation
+        try:
+            validate_terraform_installation()
+            click.secho("✓ Terraform installed", fg="green")
+        except click.ClickException as e:
+            click.secho(f"✗ {str(e)}", fg="red")
+            sys.exit(1)
+
+    workers = max(1, workers or os.cpu_count() or 1)
+    if dry_run:
+        click.secho("🔍 DRY RUN MODE - No files will be written", fg="yellow", bold=True)
+    else:
+        click.echo(f"\n📝 Generating Terraform files with {workers} workers...")
+
+    start_phase("generate batch")
+    start = time.perf_counter()
+    try:
+        results = generate_batch(
+            config_files, output_dir, workers,
+            dry_run=dry_run,
+            check_existing=not skip_validation and not dry_run,
+            force=force
+        )
+    except click.ClickException as e:
+        click.secho(f"✗ {str(e)}", fg="red")
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    print_batch_report(results, elapsed, workers)
+
+    if changes_file and not dry_run:
+        write_changes_file(changes_file, results)
+        click.echo(f"📄 Change report written to: {changes_file}")
+
+    if not all(r["success"] for r in results):
+        sys.exit(1)
+
+    click.echo("\n✅ Batch generation complete!")
+
+
+def _open_log_file(log_file):
+    """Open a log file for appending, closed when the command finishes"""
+    if not log_file:
+        return None
+    log = open(log_file, 'a')
+    click.get_current_context().call_on_close(log.close)
+    return log
+
+
 @cli.command()
 @click.option('--directory', default='./terraform-generated', help='Terraform configuration directory')
 @click.option('--auto-approve', is_flag=True, help='Skip interactive approval')
-def apply(directory, auto_approve):
+@click.option('--log-file', type=click.Path(dir_okay=False), help='Also append Terraform output to this file')
+@click.option('--reinit', is_flag=True, help='Run terraform init even if providers and backend are unchanged')
+@click.option('--targeted', is_flag=True,
+              help='Plan only the resources affected by config changes since the last apply')
+@click.option('--no-refresh', is_flag=True, help='With --targeted, do not refresh the targeted resources either')
+@click.option('--parallelism', type=click.IntRange(min=1),
+              help='Terraform -parallelism (default: chosen from the resource count, lowered on throttling)')
+def apply(directory, auto_approve, log_file, reinit, targeted, no_refresh, parallelism):
     """Apply Terraform configuration"""
+    import time
+    from .utils.azure_helper import validate_azure_login, get_current_subscription, invalidate_existence_cache
+    from .utils.generation import record_applied
+    from .utils.parallelism import OutputWatcher, choose_parallelism, record_outcome, throttle_backoff
+    from .utils.terraform_helper import (
+        validate_terraform_installation,
+        terraform_init,
+        terraform_validate,
+        terraform_plan_saved,
+        terraform_apply,
+        remove_plan_file,
+        echo_lines,
+        PLAN_FILE
+    )
+    from .utils.profiler import start_phase
 
     click.secho("\n🚀 Fasttrack Terraform CLI - Apply Configuration", fg="cyan", bold=True)
     click.echo("=" * 60)
@@ -242,7 +428,9 @@ def apply(directory, auto_approve):
 
     # Validate prerequisites
     try:
+        start_phase("azure checks")
         validate_azure_login()
+        start_phase("terraform check")
         validate_terraform_installation()
     except click.ClickException as e:
         click.secho(f"✗ {str(e)}", fg="red")
@@ -253,36 +441,235 @@ def apply(directory, auto_approve):
     if sub:
         click.echo(f"📌 Using subscription: {sub.get('name')} ({sub.get('id')})")
 
+    on_line = echo_lines(_open_log_file(log_file))
+
     # Initialize
-    if not terraform_init(directory):
+    start_phase("init")
+    if not terraform_init(directory, force=reinit):
         sys.exit(1)
 
     click.echo()
 
     # Validate
-    if not terraform_validate(directory):
+    start_phase("validate")
+    if not terraform_validate(directory, on_line):
         sys.exit(1)
 
     click.echo()
 
-    # Plan
-    if not terraform_plan(directory):
+    plan_args = []
+    if targeted:
+        from .utils.targeting import plan_targets
+
+        targets, reason = plan_targets(directory)
+        if targets is None:
+            click.secho(f"⚠️  Running a full plan: {reason}", fg="yellow")
+        elif not targets:
+            click.secho("✓ Configuration unchanged since the last apply", fg="green")
+            click.echo("\n✅ Nothing to apply. Run without --targeted to check for drift.")
+            return
+        else:
+            click.echo(f"🎯 Targeting {len(targets)} resources ({reason}):")
+            for address in targets:
+                click.echo(f"  - {address}")
+            plan_args = [f"-target={address}" for address in targets]
+            if no_refresh:
+                plan_args.append("-refresh=false")
+            click.echo()
+
+    current = choose_parallelism(directory, parallelism)
+    attempt = 0
+    while True:
+        watcher = OutputWatcher(on_line)
+
+        # Plan, saving the plan so apply does not plan and refresh a second time
+        start_phase("plan")
+        has_changes = terraform_plan_saved(directory, PLAN_FILE, watcher, plan_args + [f"-parallelism={current}"])
+        if has_changes is False:
+            remove_plan_file(directory)
+            record_outcome(watcher, current)
+            record_applied(directory)
+            click.echo("\n✅ Nothing to apply.")
+            return
+
+        applied = False
+        if has_changes:
+            click.echo()
+
+            # Apply
+            if not auto_approve:
+                start_phase("confirmation")
+                if not click.confirm('Do you want to apply these changes?'):
+                    remove_plan_file(directory)
+                    click.echo("❌ Apply cancelled")
+                    sys.exit(0)
+
+            start_phase("apply")
+            current = choose_parallelism(directory, parallelism, changes=watcher.planned_changes)
+            click.echo(f"⚙️  Parallelism: {current}")
+            applied = terraform_apply(directory, on_line=watcher, plan_file=PLAN_FILE, parallelism=current)
+        remove_plan_file(directory)
+        if applied:
+            record_outcome(watcher, current)
+            break
+
+        # Failed: plan and apply again with lower parallelism if ARM throttled
+        retry = throttle_backoff(watcher, current, attempt)
+        if retry is None:
+            sys.exit(1)
+        # Stay at the lowered value for the rest of this run
+        current, delay = retry
+        parallelism = current
+        click.secho(f"\n⚠️  ARM throttling, planning again with parallelism {current} in {delay:.1f}s",
+                    fg="yellow")
+        time.sleep(delay)
+        attempt += 1
+
+    record_applied(directory)
+    invalidate_existence_cache()
+
+    click.echo("\n✅ Resources created successfully!")
+    click.echo("\n📊 To view outputs, run:")
+    click.echo(f"  fasttrack output --directory {directory}")
+
+
+@cli.command()
+@click.argument('directories', nargs=-1, required=True, type=click.Path(exists=True, file_okay=False))
+@click.option('--concurrency', default=4, type=int, help='Directories applied at the same time (default: 4)')
+@click.option('--depends-on', multiple=True, metavar='CHILD=PARENT',
+              help='Apply CHILD only after PARENT succeeded (can specify multiple)')
+@click.option('--log-dir', default='./fasttrack-logs', help='Directory for per-directory log files')
+@click.option('--fail-fast', is_flag=True, help='Stop starting new directories after the first failure')
+@click.option('--auto-approve', is_flag=True, help='Skip interactive approval')
+@click.option('--reinit', is_flag=True, help='Run terraform init even if providers and backend are unchanged')
+@click.option('--parallelism', type=click.IntRange(min=1),
+              help='Terraform -parallelism (default: chosen from the resource count, lowered on throttling)')
+def apply_all(directories, concurrency, depends_on, log_dir, fail_fast, auto_approve, reinit, parallelism):
+    """Apply many Terraform directories in parallel"""
+    import time
+    from functools import partial
+    from .utils.azure_helper import validate_azure_login, invalidate_existence_cache
+    from .utils.terraform_helper import validate_terraform_installation, terraform_apply_unattended
+    from .utils.fleet import FleetRunner, parse_dependencies, print_fleet_summary, SUCCEEDED
+    from .utils.profiler import start_phase
+
+    click.secho("\n🚀 Fasttrack Terraform CLI - Apply All", fg="cyan", bold=True)
+    click.echo("=" * 60)
+
+    # Validate prerequisites once for the whole run
+    try:
+        start_phase("azure checks")
+        validate_azure_login()
+        start_phase("terraform check")
+        validate_terraform_installation()
+        dependencies = parse_dependencies(list(depends_on), list(directories))
+    except click.ClickException as e:
+        click.secho(f"✗ {str(e)}", fg="red")
         sys.exit(1)
 
-    click.echo()
+    click.echo(f"📂 {len(directories)} directories, concurrency {concurrency}")
+    click.echo(f"📄 Logs: {log_dir}")
 
-    # Apply
     if not auto_approve:
-        if not click.confirm('Do you want to apply these changes?'):
+        start_phase("confirmation")
+        if not click.confirm(f'Apply changes in {len(directories)} directories without reviewing each plan?'):
             click.echo("❌ Apply cancelled")
             sys.exit(0)
 
-    if not terraform_apply(directory, auto_approve):
+    click.echo()
+    runner = FleetRunner(
+        list(directories),
+        partial(terraform_apply_unattended, reinit=reinit, parallelism=parallelism, concurrency=concurrency),
+        concurrency=concurrency,
+        dependencies=dependencies,
+        log_dir=log_dir,
+        fail_fast=fail_fast
+    )
+    start_phase("apply directories")
+    start = time.perf_counter()
+    results = runner.run()
+    print_fleet_summary("Apply Summary", results, runner.display, time.perf_counter() - start)
+
+    invalidate_existence_cache()
+
+    if not all(r["status"] == SUCCEEDED for r in results.values()):
         sys.exit(1)
 
-    click.echo("\n✅ Resources created successfully!")
-    click.echo("\n📊 To view outputs, run:")
-    click.echo(f"  fasttrack output --directory {directory}")
+    click.echo("\n✅ All directories applied successfully!")
+
+
+@cli.command()
+@click.argument('directories', nargs=-1, required=True, type=click.Path(exists=True, file_okay=False))
+@click.option('--concurrency', default=8, type=int, help='Directories checked at the same time (default: 8)')
+@click.option('--log-dir', default='./fasttrack-logs', help='Directory for per-directory log files')
+@click.option('--report', 'report_file', default='./drift-report.json', type=click.Path(dir_okay=False),
+              help='JSON report file (default: ./drift-report.json)')
+@click.option('--markdown', 'markdown_file', type=click.Path(dir_okay=False), help='Also write a Markdown report')
+@click.option('--reinit', is_flag=True, help='Run terraform init even if providers and backend are unchanged')
+@click.option('--parallelism', type=click.IntRange(min=1),
+              help='Terraform -parallelism (default: chosen from the resource count, lowered on throttling)')
+def drift(directories, concurrency, log_dir, report_file, markdown_file, reinit, parallelism):
+    """Detect drift between Terraform state and Azure in many directories"""
+    import threading
+    import time
+    from .utils.azure_helper import validate_azure_login
+    from .utils.terraform_helper import validate_terraform_installation
+    from .utils.fleet import FleetRunner, print_fleet_summary
+    from .utils.drift import (
+        check_drift, build_report, write_json_report, write_markdown_report, CLEAN, DRIFTED, ERROR
+    )
+    from .utils.profiler import start_phase
+
+    click.secho("\n🔎 Fasttrack Terraform CLI - Drift Detection", fg="cyan", bold=True)
+    click.echo("=" * 60)
+
+    try:
+        start_phase("azure checks")
+        validate_azure_login()
+        start_phase("terraform check")
+        validate_terraform_installation()
+    except click.ClickException as e:
+        click.secho(f"✗ {str(e)}", fg="red")
+        sys.exit(1)
+
+    click.echo(f"📂 {len(directories)} directories, concurrency {concurrency}")
+    click.echo(f"📄 Logs: {log_dir}")
+    click.echo()
+
+    results = {}
+    results_lock = threading.Lock()
+
+    def task(directory, log):
+        result = check_drift(directory, log, reinit=reinit, parallelism=parallelism, concurrency=concurrency)
+        with results_lock:
+            results[directory] = result
+        if result["status"] == ERROR:
+            return False, result["error"]
+        if result["status"] == DRIFTED:
+            return True, f"drift in {len(result['resources'])} resources"
+        return True, "no drift"
+
+    runner = FleetRunner(list(directories), task, concurrency=concurrency, log_dir=log_dir)
+    start_phase("check directories")
+    start = time.perf_counter()
+    fleet_results = runner.run()
+    print_fleet_summary("Drift Summary", fleet_results, runner.display, time.perf_counter() - start)
+
+    report = build_report(results, runner.display, fleet_results)
+    write_json_report(report_file, report)
+    click.echo(f"\n📄 Report written to: {report_file}")
+    if markdown_file:
+        write_markdown_report(markdown_file, report)
+        click.echo(f"📄 Markdown report written to: {markdown_file}")
+
+    summary = report["summary"]
+    if summary[ERROR]:
+        click.secho(f"\n✗ {summary[ERROR]} directories could not be checked", fg="red")
+        sys.exit(1)
+    if summary[DRIFTED]:
+        click.secho(f"\n⚠️  Drift detected in {summary[DRIFTED]} of {len(fleet_results)} directories", fg="yellow")
+        sys.exit(2)
+    click.echo(f"\n✅ No drift in {summary[CLEAN]} directories")
 
 
 @cli.command()
@@ -290,11 +677,32 @@ def apply(directory, auto_approve):
 @click.option('--output-name', help='Specific output to retrieve')
 def output(directory, output_name):
     """Show Terraform outputs"""
+    from .utils.daemon import forward
 
     if not os.path.exists(directory):
         click.secho(f"✗ Directory not found: {directory}", fg="red")
         sys.exit(1)
 
+    response = forward("output", {"directory": os.path.abspath(directory), "name": output_name})
+    if response is not None:
+        if not response["ok"]:
+            click.secho(f"✗ {response['error']}", fg="red")
+            for _, detail in response["errors"]:
+                click.echo(f"  {detail}")
+            sys.exit(1)
+        click.echo(response["result"]["output"])
+        return
+
+    from .utils.terraform_helper import terraform_output
+    from .utils.generation import load_generation_record
+
+    # Reject unknown output names without running terraform
+    record = load_generation_record(directory)
+    if output_name and record and output_name not in record["outputs"]:
+        click.secho(f"✗ Unknown output: {output_name}", fg="red")
+        click.echo(f"  Available outputs: {', '.join(record['outputs'])}")
+        sys.exit(1)
+
     success, result = terraform_output(directory, output_name)
 
     if success:
@@ -307,8 +715,17 @@ def output(directory, output_name):
 @cli.command()
 @click.option('--directory', default='./terraform-generated', help='Terraform configuration directory')
 @click.option('--auto-approve', is_flag=True, help='Skip interactive approval')
-def destroy(directory, auto_approve):
+@click.option('--log-file', type=click.Path(dir_okay=False), help='Also append Terraform output to this file')
+@click.option('--parallelism', type=click.IntRange(min=1),
+              help='Terraform -parallelism (default: chosen from the resource count, lowered on throttling)')
+def destroy(directory, auto_approve, log_file, parallelism):
     """Destroy Terraform-managed resources"""
+    import time
+    from .utils.azure_helper import validate_azure_login, invalidate_existence_cache
+    from .utils.terraform_helper import validate_terraform_installation, terraform_destroy, echo_lines
+    from .utils.generation import record_destroyed
+    from .utils.parallelism import OutputWatcher, choose_parallelism, record_outcome, throttle_backoff
+    from .utils.profiler import start_phase
 
     click.secho("\n🗑️  Fasttrack Terraform CLI - Destroy Resources", fg="red", bold=True)
     click.echo("=" * 60)
@@ -319,28 +736,58 @@ def destroy(directory, auto_approve):
 
     # Validate prerequisites
     try:
+        start_phase("azure checks")
         validate_azure_login()
+        start_phase("terraform check")
         validate_terraform_installation()
     except click.ClickException as e:
         click.secho(f"✗ {str(e)}", fg="red")
         sys.exit(1)
 
     if not auto_approve:
+        start_phase("confirmation")
         click.secho("\n⚠️  WARNING: This will destroy all resources managed by Terraform!", fg="yellow", bold=True)
         if not click.confirm('Are you sure you want to continue?'):
             click.echo("❌ Destroy cancelled")
             sys.exit(0)
 
-    if not terraform_destroy(directory, auto_approve):
-        sys.exit(1)
+    start_phase("destroy")
+    on_line = echo_lines(_open_log_file(log_file))
+    current = choose_parallelism(directory, parallelism)
+    attempt = 0
+    while True:
+        click.echo(f"⚙️  Parallelism: {current}")
+        watcher = OutputWatcher(on_line)
+        if terraform_destroy(directory, watcher, current):
+            record_outcome(watcher, current)
+            # Nothing is applied any more; a targeted apply must plan everything again
+            record_destroyed(directory)
+            break
+
+        # Destroy picks up where it stopped, so a throttled run is simply repeated
+        retry = throttle_backoff(watcher, current, attempt)
+        if retry is None:
+            sys.exit(1)
+        current, delay = retry
+        click.secho(f"\n⚠️  ARM throttling, destroying again with parallelism {current} in {delay:.1f}s",
+                    fg="yellow")
+        time.sleep(delay)
+        attempt += 1
+
+    invalidate_existence_cache()
 
     click.echo("\n✅ Resources destroyed successfully!")
 
 
 @cli.command()
 @click.option('--directory', default='./terraform-generated', help='Terraform configuration directory')
-def init_import(directory):
+@click.option('--reinit', is_flag=True, help='Run terraform init even if providers and backend are unchanged')
+def init_import(directory, reinit):
     """Initialize and import existing Azure resources into Terraform state"""
+    from .utils.azure_helper import validate_azure_login
+    from .utils.terraform_helper import validate_terraform_installation, terraform_init
+    from .utils.generation import load_generated_resources
+    from .utils.importer import discover_imports, write_imports_file
 
     click.secho("\n🔄 Fasttrack Terraform CLI - Auto-Import Existing Resources", fg="cyan", bold=True)
     click.echo("=" * 60)
@@ -358,83 +805,49 @@ def init_import(directory):
         sys.exit(1)
 
     # Initialize terraform
-    click.echo("Initializing Terraform...")
-    if not terraform_init(directory):
+    if not terraform_init(directory, force=reinit):
         sys.exit(1)
 
-    click.echo("\n📊 Checking for existing resources...")
-
-    # Read variables from terraform files to understand what resources we're managing
-    import re
-    vars_file = Path(directory) / "variables.tf"
-    if not vars_file.exists():
-        click.secho("✗ variables.tf not found", fg="red")
-        sys.exit(1)
-
-    # Extract variable defaults
-    with open(vars_file, 'r') as f:
-        content = f.read()
-
-    # Parse resource group name
-    rg_match = re.search(r'variable\s+"resource_group_name".*?default\s+=\s+"([^"]+)"', content, re.DOTALL)
-    if not rg_match:
-        click.secho("✗ Could not find resource_group_name in variables.tf", fg="red")
+    # What this configuration manages, from the generation sidecar or its HCL
+    try:
+        resources = load_generated_resources(directory)
+    except ValueError as e:
+        click.secho(f"✗ {str(e)}", fg="red")
         sys.exit(1)
 
-    resource_group = rg_match.group(1)
-
-    # Check if resource group exists
-    from .utils.azure_helper import resource_group_exists, storage_account_exists
+    click.echo("\n📊 Checking for existing resources...")
+    imports, missing = discover_imports(resources)
 
-    click.echo(f"\nChecking resource group: {resource_group}")
-    if resource_group_exists(resource_group):
-        click.secho(f"  ✓ Resource group exists", fg="green")
+    for address, resource_id in imports:
+        click.secho(f"  ✓ {address}", fg="green")
+        click.echo(f"      {resource_id}")
+    for description in missing:
+        click.echo(f"  ℹ {description} does not exist (will be created on apply)")
 
-        # Try to import it
-        click.echo(f"  Importing into Terraform state...")
-        sub = get_current_subscription()
-        if sub:
-            rg_id = f"/subscriptions/{sub['id']}/resourceGroups/{resource_group}"
-            if terraform_import(directory, "azurerm_resource_group.main", rg_id):
-                click.secho(f"  ✓ Resource group imported", fg="green")
-            else:
-                click.echo(f"  ℹ Resource group may already be in state")
-    else:
-        click.echo(f"  ℹ Resource group does not exist (will be created on apply)")
-
-    # Check for storage account
-    storage_match = re.search(r'variable\s+"storage_account_name".*?default\s+=\s+"([^"]+)"', content, re.DOTALL)
-    if storage_match:
-        storage_account = storage_match.group(1)
-        click.echo(f"\nChecking storage account: {storage_account}")
-
-        if storage_account_exists(storage_account, resource_group):
-            click.secho(f"  ✓ Storage account exists", fg="green")
-
-            # Try to import it
-            click.echo(f"  Importing into Terraform state...")
-            if sub:
-                sa_id = f"/subscriptions/{sub['id']}/resourceGroups/{resource_group}/providers/Microsoft.Storage/storageAccounts/{storage_account}"
-                if terraform_import(directory, "azurerm_storage_account.main", sa_id):
-                    click.secho(f"  ✓ Storage account imported", fg="green")
-                else:
-                    click.echo(f"  ℹ Storage account may already be in state")
-        else:
-            click.echo(f"  ℹ Storage account does not exist (will be created on apply)")
+    imports_file = write_imports_file(directory, imports)
 
     click.echo("\n" + "=" * 60)
-    click.echo("✅ Import check complete!")
-    click.echo("\n💡 Next steps:")
-    click.echo(f"  1. Run: fasttrack apply --directory {directory}")
-    click.echo(f"  2. Terraform will create any missing resources")
+    if imports_file:
+        click.echo(f"✅ Wrote {len(imports)} import blocks to {imports_file}")
+        click.echo("\n💡 Next steps:")
+        click.echo(f"  1. Run: fasttrack apply --directory {directory}")
+        click.echo("  2. One plan imports every existing resource and creates the missing ones")
+    else:
+        click.echo("✅ Import check complete! No existing resources found.")
+        click.echo("\n💡 Next steps:")
+        click.echo(f"  1. Run: fasttrack apply --directory {directory}")
+        click.echo("  2. Terraform will create any missing resources")
 
 
 @cli.command()
 @click.option('--directory', default='./terraform-generated', help='Terraform configuration directory')
 @click.option('--resource-address', required=True, help='Terraform resource address (e.g., azurerm_resource_group.main)')
 @click.option('--resource-id', required=True, help='Azure resource ID to import')
-def import_resource(directory, resource_address, resource_id):
+@click.option('--reinit', is_flag=True, help='Run terraform init even if providers and backend are unchanged')
+def import_resource(directory, resource_address, resource_id, reinit):
     """Import existing Azure resource into Terraform state"""
+    from .utils.azure_helper import validate_azure_login
+    from .utils.terraform_helper import validate_terraform_installation, terraform_init, terraform_import
 
     click.secho("\n📥 Fasttrack Terraform CLI - Import Resource", fg="cyan", bold=True)
     click.echo("=" * 60)
@@ -452,12 +865,9 @@ def import_resource(directory, resource_address, resource_id):
         sys.exit(1)
 
     # Initialize if needed
-    terraform_dir = Path(directory)
-    if not (terraform_dir / ".terraform").exists():
-        click.echo("Terraform not initialized. Running init...")
-        if not terraform_init(directory):
-            sys.exit(1)
-        click.echo()
+    if not terraform_init(directory, force=reinit):
+        sys.exit(1)
+    click.echo()
 
     # Import resource
     if not terraform_import(directory, resource_address, resource_id):
@@ -470,9 +880,223 @@ def import_resource(directory, resource_address, resource_id):
     click.echo(f"  3. Run: terraform plan to verify the import")
 
 
+@cli.command()
+@click.option('--socket', 'socket_file', type=click.Path(dir_okay=False),
+              help='Unix socket to listen on (default: $FASTTRACK_SOCKET or <cache dir>/daemon.sock)')
+def serve(socket_file):
+    """Run a daemon that serves generate, validate, plan and output requests"""
+    import signal
+    import threading
+    from .utils.daemon import DaemonServer, DaemonState, socket_path
+
+    click.secho("\n🛰️  Fasttrack Terraform CLI - Daemon", fg="cyan", bold=True)
+    click.echo("=" * 60)
+
+    path = Path(socket_file) if socket_file else socket_path()
+    try:
+        server = DaemonServer(path, DaemonState())
+    except (click.ClickException, OSError) as e:
+        click.secho(f"✗ {str(e)}", fg="red")
+        sys.exit(1)
+
+    # shutdown() must not run on the thread inside serve_forever()
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+
+    click.secho(f"✓ Listening on {path}", fg="green")
+    click.echo("  Other fasttrack commands now forward generate, validate and output here")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    click.echo("\n✅ Daemon stopped")
+
+
+@cli.group()
+def cache():
+    """Manage local caches"""
+    pass
+
+
+@cache.command('clear')
+def cache_clear():
+    """Clear cached Azure lookups, config layers and compiled templates"""
+    from .utils.azure_helper import get_session_cache
+    from .utils.template_generator import get_bytecode_cache
+    from .utils.config_loader import clear_layer_cache
+
+    get_session_cache().invalidate()
+    click.secho("✓ Azure lookup cache cleared", fg="green")
+
+    clear_layer_cache()
+    click.secho("✓ Config layer cache cleared", fg="green")
+
+    bytecode_cache = get_bytecode_cache()
+    if bytecode_cache is not None:
+        bytecode_cache.clear()
+        click.secho("✓ Template bytecode cache cleared", fg="green")
+
+
+@cli.group()
+def providers():
+    """Manage the shared Terraform provider cache"""
+    pass
+
+
+@providers.command('warm')
+@click.option('--mirror', is_flag=True, help='Also fill a local provider mirror so init works offline')
+@click.option('--platform', 'platforms', multiple=True,
+              help='Platform to mirror, e.g. linux_amd64 (can specify multiple; default: current)')
+def providers_warm(mirror, platforms):
+    """Pre-download the providers used by generated configurations"""
+    from .utils.template_generator import TerraformTemplateGenerator
+    from .utils.config_loader import build_config
+    from .utils.terraform_helper import (
+        validate_terraform_installation,
+        warm_provider_cache,
+        plugin_cache_dir,
+        provider_mirror_dir
+    )
+
+    click.secho("\n📦 Fasttrack Terraform CLI - Warm Provider Cache", fg="cyan", bold=True)
+    click.echo("=" * 60)
+
+    try:
+        validate_terraform_installation()
+    except click.ClickException as e:
+        click.secho(f"✗ {str(e)}", fg="red")
+        sys.exit(1)
+
+    # The provider requirements do not depend on the project settings
+    main_tf = TerraformTemplateGenerator().render("main.tf.j2", build_config({
+        "project_name": "warm",
+        "resource_group": "warm-rg",
+    }))
+
+    click.echo(f"Plugin cache: {plugin_cache_dir()}")
+    if mirror:
+        click.echo(f"Provider mirror: {provider_mirror_dir()}")
+
+    success, output = warm_provider_cache(main_tf, mirror, list(platforms))
+    if not success:
+        click.secho(f"✗ Failed to warm provider cache: {output}", fg="red")
+        sys.exit(1)
+
+    click.secho("✓ Provider cache warmed", fg="green")
+    if mirror:
+        click.secho("✓ Provider mirror filled; terraform init now installs providers offline", fg="green")
+
+
+@cli.group()
+def templates():
+    """Manage the compiled template cache"""
+    pass
+
+
+@templates.command('compile')
+def templates_compile():
+    """Precompile all templates into the bytecode cache"""
+    from .utils.template_generator import TEMPLATE_NAMES, TerraformTemplateGenerator, get_bytecode_cache
+
+    if get_bytecode_cache() is None:
+        click.secho("✗ Template cache directory is not writable", fg="red")
+        sys.exit(1)
+
+    TerraformTemplateGenerator().preload()
+    click.secho(f"✓ {len(TEMPLATE_NAMES)} templates compiled into the bytecode cache", fg="green")
+
+
+@templates.command('timing')
+@click.option('--config-file', type=click.Path(exists=True), help='Render this YAML config instead of a sample')
+@click.option('--iterations', default=20, type=int, help='Runs per measurement (default: 20)')
+def templates_timing(config_file, iterations):
+    """Measure cold, warm and hot template render latency"""
+    from .utils.template_generator import measure_render_latency
+    from .utils.config_loader import config_from_file, build_config
+
+    if config_file:
+        config = config_from_file(config_file)
+    else:
+        config = build_config({
+            "project_name": "sample",
+            "resource_group": "sample-rg",
+            "app_name": "sample-app",
+            "storage_account": "samplestorage",
+            "containers": ("data", "logs", "backups"),
+            "enable_remote_state": True,
+            "state_storage_account": "sampletfstate",
+        })
+
+    results = measure_render_latency(config, iterations)
+
+    click.echo(f"\n⏱  Template render latency (median of {iterations} runs):")
+    click.echo(f"  Cold (compile from source):   {results['cold']:8.2f} ms")
+    click.echo(f"  Warm (bytecode cache):        {results['warm']:8.2f} ms")
+    click.echo(f"  Hot  (in-memory templates):   {results['hot']:8.2f} ms")
+
+
+@cli.command()
+@click.argument('paths', nargs=-1, required=True)
+@click.option('--json', 'as_json', is_flag=True, help='Print results as JSON')
+@click.option('--strict', is_flag=True, help='Treat unknown keys as errors instead of warnings')
+def validate(paths, as_json, strict):
+    """Validate YAML configuration files without contacting Azure or Terraform
+
+    PATHS may be files, directories or glob patterns.
+    """
+    from .utils.daemon import forward
+
+    response = forward("validate", {"paths": [os.path.abspath(p) for p in paths], "strict": strict})
+    if response is not None:
+        if not response["ok"]:
+            click.secho(f"✗ {response['error']}", fg="red")
+            sys.exit(1)
+        results = {
+            os.path.relpath(f): tuple([(e["path"], e["message"]) for e in found[kind]]
+                                      for kind in ("errors", "warnings"))
+            for f, found in response["result"].items()
+        }
+    else:
+        from .utils.batch import expand_config_paths
+        from .utils.schema import validate_files
+        results = validate_files(expand_config_paths(list(paths)), strict=strict)
+
+    if not results:
+        click.secho(f"✗ No YAML config files found in: {', '.join(paths)}", fg="red")
+        sys.exit(1)
+    invalid = [f for f, (errors, _) in results.items() if errors]
+
+    if as_json:
+        import json
+        click.echo(json.dumps({
+            f: {
+                "errors": [{"path": path, "message": message} for path, message in errors],
+                "warnings": [{"path": path, "message": message} for path, message in warnings],
+            }
+            for f, (errors, warnings) in results.items()
+        }, indent=2))
+    else:
+        for config_file, (errors, warnings) in results.items():
+            if errors:
+                click.secho(f"✗ {config_file}", fg="red")
+            else:
+                click.secho(f"✓ {config_file}", fg="green")
+            for path, message in errors:
+                click.echo(f"    {path}: {message}")
+            for path, message in warnings:
+                click.secho(f"    ⚠️  {path}: {message}", fg="yellow")
+        click.echo(f"\n{len(results) - len(invalid)} valid, {len(invalid)} invalid")
+
+    if invalid:
+        sys.exit(1)
+
+
 @cli.command()
 def check():
     """Check prerequisites and Azure connection"""
+    from .utils.azure_helper import validate_azure_login, get_current_subscription
+    from .utils.terraform_helper import validate_terraform_installation, terraform_version
 
     click.secho("\n🔍 Fasttrack Terraform CLI - Prerequisites Check", fg="cyan", bold=True)
     click.echo("=" * 60)
@@ -497,10 +1121,9 @@ def check():
         validate_terraform_installation()
         click.secho("✓ Terraform installed", fg="green")
 
-        import subprocess
-        result = subprocess.run(["terraform", "version"], capture_output=True, text=True)
-        version_line = result.stdout.split('\n')[0]
-        click.echo(f"  {version_line}")
+        version_line = terraform_version()
+        if version_line:
+            click.echo(f"  {version_line}")
     except click.ClickException as e:
         click.secho(f"✗ Terraform: {str(e)}", fg="red")
 
@@ -1,9 +1,264 @@
 """Azure helper functions for CLI operations"""
 
-import subprocess
 import json
+import logging
+import os
+import threading
+import time
 import click
-from typing import Optional, Dict, Any
+from io import StringIO
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple, Callable
+
+from .cache import SessionCache, get_cache_dir
+from .executor import run_command, command_timeout, command_retries, retry_notice
+from .profiler import record_subprocess
+
+
+# Cache lifetimes in seconds. Account details are additionally keyed on the
+# az profile file, so `az login` and `az account set` invalidate them at once.
+ACCOUNT_TTL = 600
+EXISTS_TTL = 300
+MISSING_TTL = 30
+
+# Resource Graph table and type for each resource kind the CLI checks
+RESOURCE_GRAPH_TYPES = {
+    "resource_group": ("resourcecontainers", "microsoft.resources/subscriptions/resourcegroups"),
+    "storage_account": ("resources", "microsoft.storage/storageaccounts"),
+}
+
+# Seconds an az command may run before it is stopped ($FASTTRACK_AZ_TIMEOUT)
+AZ_TIMEOUT = 120
+
+# (kind, resource group, name) identifying one resource to look up
+ResourceKey = Tuple[str, str, str]
+
+# Runs az arguments (without the leading "az") and returns (exit code, stdout, stderr)
+AzInvoker = Callable[[List[str]], Tuple[int, str, str]]
+
+# "inprocess" runs commands through azure-cli-core in this process, "subprocess"
+# spawns the az executable, "auto" uses in-process when azure-cli is installed
+AZ_BACKENDS = ("auto", "inprocess", "subprocess")
+
+_session_cache: Optional[SessionCache] = None
+_session_cache_lock = threading.Lock()
+_az_invoker: Optional[AzInvoker] = None
+_az_cli = None
+_az_cli_lock = threading.Lock()
+# Set once an in-process call timed out; its thread may still hold the CLI context
+_inprocess_abandoned = False
+
+
+def get_az_executable() -> str:
+    """az executable to run; $FASTTRACK_AZ points it at a wrapper or test stub"""
+    return os.environ.get("FASTTRACK_AZ") or "az"
+
+
+def get_az_backend() -> str:
+    """Requested az backend: --az-backend or $FASTTRACK_AZ_BACKEND (default: auto)"""
+    backend = os.environ.get("FASTTRACK_AZ_BACKEND", "auto")
+    return backend if backend in AZ_BACKENDS else "auto"
+
+
+def set_az_backend(backend: str):
+    """
+    Select the az backend for this process and the processes it spawns.
+
+    Args:
+        backend: One of AZ_BACKENDS
+    """
+    global _az_invoker
+    os.environ["FASTTRACK_AZ_BACKEND"] = backend
+    _az_invoker = None
+
+
+def _subprocess_invoker(args: List[str]) -> Tuple[int, str, str]:
+    """
+    Run az as a child process.
+
+    Hung commands (e.g. a stuck token refresh) are stopped after the az
+    timeout, and throttled or transient failures are retried with backoff.
+    """
+    result = run_command(
+        [get_az_executable()] + list(args),
+        timeout=command_timeout("az", AZ_TIMEOUT),
+        retries=command_retries(),
+        on_retry=retry_notice(f"az {' '.join(args[:2])}")
+    )
+    return result.returncode, result.stdout, result.stderr
+
+
+def _load_az_cli():
+    """Load the azure-cli command context once; None if azure-cli is not installed"""
+    global _az_cli
+    if _az_cli is None:
+        try:
+            from azure.cli.core import get_default_cli
+        except ImportError:
+            return None
+        _az_cli = get_default_cli()
+    return _az_cli
+
+
+class _AzLogCapture(logging.Handler):
+    """Collects the warnings and errors azure-cli logs on one thread"""
+
+    def __init__(self, thread_id: int):
+        super().__init__(logging.WARNING)
+        self.thread_id = thread_id
+        self.messages: List[str] = []
+
+    def emit(self, record: logging.LogRecord):
+        # Other threads (fleet workers, daemon requests) log through the same loggers
+        if record.thread == self.thread_id:
+            self.messages.append(f"{record.levelname}: {record.getMessage()}")
+
+
+def _invoke_az_cli(args: List[str]) -> Tuple[int, str, str]:
+    """
+    One call through the loaded CLI context.
+
+    Output is written to a buffer; errors come from the CLI's result and
+    from what it logs on the "cli" logger during the call. sys.stderr is
+    left alone because other threads keep writing to it.
+    """
+    with _az_cli_lock:
+        az_cli = _load_az_cli()
+        out = StringIO()
+        capture = _AzLogCapture(threading.get_ident())
+        cli_logger = logging.getLogger("cli")
+        cli_logger.addHandler(capture)
+        started = time.perf_counter()
+        try:
+            exit_code = az_cli.invoke(list(args), out_file=out)
+        except SystemExit as e:
+            exit_code = e.code if isinstance(e.code, int) else 1
+        finally:
+            cli_logger.removeHandler(capture)
+        record_subprocess(["az"] + list(args), started, exit_code, out.tell(), category="az")
+        error = getattr(az_cli.result, "error", None)
+        stderr = "\n".join(capture.messages) or (str(error) if error else "")
+        return exit_code, out.getvalue(), stderr
+
+
+def _inprocess_invoker(args: List[str]) -> Tuple[int, str, str]:
+    """
+    Run az through azure-cli-core in this process.
+
+    The loaded CLI context, command table and token cache are reused by
+    every call. Invocations are serialized because the context is not
+    thread-safe.
+
+    Each call runs on a worker thread and is given up after the az timeout,
+    like a hung az subprocess. The abandoned call may keep the CLI context
+    locked, so later commands of this process use the az subprocess.
+    """
+    global _az_invoker, _inprocess_abandoned
+    timeout = command_timeout("az", AZ_TIMEOUT)
+    outcome: Dict[str, Any] = {}
+
+    def call():
+        try:
+            outcome["result"] = _invoke_az_cli(args)
+        except BaseException as e:
+            outcome["error"] = e
+
+    worker = threading.Thread(target=call, name="az-inprocess", daemon=True)
+    worker.start()
+    worker.join(timeout)
+    if worker.is_alive():
+        _inprocess_abandoned = True
+        if _az_invoker is _inprocess_invoker:
+            _az_invoker = _subprocess_invoker
+        return -1, "", f"az {' '.join(args[:2])} timed out after {timeout:g}s"
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+def get_az_invoker() -> AzInvoker:
+    """
+    Invoker used by run_az_command.
+
+    In-process invocation needs azure-cli (azure-cli-core and its command
+    modules); without it, and whenever $FASTTRACK_AZ points at another
+    executable, commands fall back to the az subprocess. So do they after an
+    in-process call timed out.
+    """
+    global _az_invoker
+    if _az_invoker is None:
+        backend = get_az_backend()
+        use_inprocess = backend == "inprocess" or (backend == "auto" and not os.environ.get("FASTTRACK_AZ"))
+        if use_inprocess and not _inprocess_abandoned and _load_az_cli() is not None:
+            _az_invoker = _inprocess_invoker
+        else:
+            _az_invoker = _subprocess_invoker
+    return _az_invoker
+
+
+def set_az_invoker(invoker: Optional[AzInvoker]):
+    """Replace the invoker, e.g. with a fake in tests; None restores backend selection"""
+    global _az_invoker
+    _az_invoker = invoker
+
+
+def get_session_cache() -> SessionCache:
+    """Session cache for Azure lookups shared by all CLI invocations"""
+    global _session_cache
+    with _session_cache_lock:
+        if _session_cache is None:
+            try:
+                path = get_cache_dir() / "azure-session.json"
+            except OSError:
+                path = Path(os.devnull)
+            _session_cache = SessionCache(path)
+        return _session_cache
+
+
+def _profile_stamp() -> str:
+    """Identify the active az login from the az profile file"""
+    config_dir = os.environ.get("AZURE_CONFIG_DIR") or str(Path.home() / ".azure")
+    try:
+        stat = os.stat(os.path.join(config_dir, "azureProfile.json"))
+    except OSError:
+        return f"{config_dir}:none"
+    return f"{config_dir}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def _subscription_scope() -> Optional[str]:
+    """Cache key prefix for lookups scoped to the current tenant/subscription"""
+    sub = get_current_subscription()
+    if not sub:
+        return None
+    return f"{sub.get('tenantId')}/{sub.get('id')}"
+
+
+def _cached_exists(key: str, lookup) -> Any:
+    """
+    Run an existence lookup through the session cache.
+
+    Positive results live longer than negative ones because missing
+    resources are often created moments later by an apply.
+    """
+    scope = _subscription_scope()
+    if scope is None:
+        return lookup()
+
+    cache = get_session_cache()
+    cache_key = f"exists:{scope}:{key}"
+    hit, value = cache.get(cache_key)
+    if hit:
+        return value
+
+    value = lookup()
+    found = value[0] if isinstance(value, (list, tuple)) else value
+    cache.set(cache_key, value, EXISTS_TTL if found else MISSING_TTL)
+    return value
+
+
+def invalidate_existence_cache():
+    """Forget cached existence lookups, e.g. after apply or destroy"""
+    get_session_cache().invalidate("exists:")
 
 
 def run_az_command(command: list) -> tuple[bool, Optional[Dict[Any, Any]], Optional[str]]:
@@ -16,37 +271,47 @@ def run_az_command(command: list) -> tuple[bool, Optional[Dict[Any, Any]], Optio
     Returns:
         Tuple of (success, result_dict, error_message)
     """
-    try:
-        result = subprocess.run(
-            command,
-            capture_output=True,
-            text=True,
-            check=True
-        )
-
-        if result.stdout:
-            try:
-                return True, json.loads(result.stdout), None
-            except json.JSONDecodeError:
-                return True, {"output": result.stdout}, None
-        return True, {}, None
+    args = list(command[1:]) if command and command[0] == "az" else list(command)
 
-    except subprocess.CalledProcessError as e:
-        return False, None, e.stderr or str(e)
+    invoker = get_az_invoker()
+    try:
+        exit_code, stdout, stderr = invoker(args)
     except Exception as e:
-        return False, None, str(e)
+        if invoker is _subprocess_invoker:
+            return False, None, str(e)
+        # A broken in-process context should not take lookups down with it
+        try:
+            exit_code, stdout, stderr = _subprocess_invoker(args)
+        except Exception as e:
+            return False, None, str(e)
+
+    if exit_code != 0:
+        return False, None, stderr or f"az {' '.join(args)} failed with exit code {exit_code}"
+    if stdout:
+        try:
+            return True, json.loads(stdout), None
+        except json.JSONDecodeError:
+            return True, {"output": stdout}, None
+    return True, {}, None
 
 
 def check_az_login() -> bool:
     """Check if user is logged into Azure CLI"""
-    success, result, _ = run_az_command(["az", "account", "show"])
-    return success
+    return get_current_subscription() is not None
 
 
 def get_current_subscription() -> Optional[Dict[str, Any]]:
     """Get current Azure subscription details"""
+    cache = get_session_cache()
+    cache_key = f"account:{_profile_stamp()}"
+    hit, result = cache.get(cache_key)
+    if hit:
+        return result
+
     success, result, _ = run_az_command(["az", "account", "show"])
     if success:
+        # Only successful lookups are cached so a fresh `az login` is seen at once
+        cache.set(cache_key, result, ACCOUNT_TTL)
         return result
     return None
 
@@ -59,20 +324,170 @@ def get_tenant_id() -> Optional[str]:
     return None
 
 
+def resource_key(kind: str, name: str, resource_group: Optional[str] = None) -> ResourceKey:
+    """Normalized key for resources_exist; resource groups are their own group"""
+    return kind, (resource_group or name).lower(), name.lower()
+
+
+def _kql_list(values: List[str]) -> str:
+    return ", ".join("'" + v.replace("\\", "\\\\").replace("'", "\\'") + "'" for v in sorted(set(values)))
+
+
+def _graph_query(query: str, subscription_id: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    Run a Resource Graph query, following skip tokens.
+
+    Returns:
+        Result rows, or None if the query failed
+    """
+    rows = []
+    skip_token = None
+    while True:
+        command = [
+            "az", "graph", "query",
+            "-q", query,
+            "--subscriptions", subscription_id,
+            "--first", "1000",
+            "-o", "json"
+        ]
+        if skip_token:
+            command.extend(["--skip-token", skip_token])
+
+        success, result, _ = run_az_command(command)
+        if not success:
+            return None
+
+        # Older versions of the graph extension return a bare list
+        if isinstance(result, list):
+            return rows + result
+
+        rows.extend(result.get("data", []))
+        skip_token = result.get("skip_token") or result.get("skipToken")
+        if not skip_token:
+            return rows
+
+
+def _show_resource_id(key: ResourceKey) -> Optional[str]:
+    """Look up one resource ID with `az ... show` (fallback when Resource Graph is unavailable)"""
+    kind, resource_group, name = key
+    if kind == "resource_group":
+        command = ["az", "group", "show", "--name", name, "--query", "id", "-o", "json"]
+    else:
+        command = [
+            "az", "storage", "account", "show",
+            "--name", name,
+            "--resource-group", resource_group,
+            "--query", "id", "-o", "json"
+        ]
+
+    success, result, _ = run_az_command(command)
+    if not success:
+        return None
+    return result if isinstance(result, str) else (result or {}).get("id")
+
+
+def _query_resource_ids(keys: List[ResourceKey], subscription_id: str) -> Dict[ResourceKey, Optional[str]]:
+    """Resolve resource IDs for keys with one Resource Graph query"""
+    parts = []
+    for kind, (table, resource_type) in RESOURCE_GRAPH_TYPES.items():
+        names = [name for k, _, name in keys if k == kind]
+        if names:
+            parts.append(
+                f"{table} | where type =~ '{resource_type}' and name in~ ({_kql_list(names)}) "
+                f"| project id, name, type, resourceGroup"
+            )
+    if not parts:
+        return {}
+
+    query = parts[0] if len(parts) == 1 else f"{parts[0]} | union ({parts[1]})"
+    rows = _graph_query(query, subscription_id)
+    if rows is None:
+        return {key: _show_resource_id(key) for key in keys}
+
+    kinds = {resource_type: kind for kind, (_, resource_type) in RESOURCE_GRAPH_TYPES.items()}
+    found = {}
+    for row in rows:
+        kind = kinds.get(str(row.get("type", "")).lower())
+        if kind:
+            name = row.get("name", "")
+            found[resource_key(kind, name, row.get("resourceGroup") if kind != "resource_group" else None)] = row.get("id")
+
+    return {key: found.get(key) for key in keys}
+
+
+def resources_exist(keys: List[ResourceKey]) -> Dict[ResourceKey, Optional[str]]:
+    """
+    Resolve many resource group and storage account lookups at once.
+
+    Cached results are served from the session cache; everything else is
+    resolved with a single `az graph query` call. If Resource Graph is not
+    available (missing extension or permissions) each resource falls back to
+    its own `az ... show` call.
+
+    Args:
+        keys: Resources to look up, built with resource_key()
+
+    Returns:
+        Mapping of each key to its full resource ID, or None if it does not exist
+    """
+    keys = list(dict.fromkeys(keys))
+    sub = get_current_subscription()
+    if not sub:
+        return {key: None for key in keys}
+
+    scope = f"{sub.get('tenantId')}/{sub.get('id')}"
+    cache = get_session_cache()
+    results = {}
+    missing = []
+    for key in keys:
+        hit, value = cache.get(f"exists:{scope}:{'/'.join(key)}")
+        if hit:
+            results[key] = value
+        else:
+            missing.append(key)
+
+    if missing:
+        resolved = _query_resource_ids(missing, sub["id"])
+        cache.set_many({
+            f"exists:{scope}:{'/'.join(key)}": (resource_id, EXISTS_TTL if resource_id else MISSING_TTL)
+            for key, resource_id in resolved.items()
+        })
+        results.update(resolved)
+
+    return results
+
+
 def resource_group_exists(name: str) -> bool:
     """Check if resource group exists"""
-    success, _, _ = run_az_command(["az", "group", "show", "--name", name])
-    return success
+    key = resource_key("resource_group", name)
+    return resources_exist([key])[key] is not None
 
 
 def storage_account_exists(name: str, resource_group: str) -> bool:
     """Check if storage account exists"""
-    success, _, _ = run_az_command([
-        "az", "storage", "account", "show",
-        "--name", name,
-        "--resource-group", resource_group
-    ])
-    return success
+    key = resource_key("storage_account", name, resource_group)
+    return resources_exist([key])[key] is not None
+
+
+def find_app_registration(name: str) -> Optional[Dict[str, str]]:
+    """
+    Look up an app registration by display name.
+
+    Returns:
+        Dict with the object "id" and client "appId", or None if not found
+    """
+    def lookup():
+        success, result, _ = run_az_command([
+            "az", "ad", "app", "list",
+            "--filter", f"displayName eq '{name}'",
+            "--query", "[].{id:id,appId:appId}"
+        ])
+
+        if success and result and len(result) > 0:
+            return True, result[0]
+        return False, None
+
+    return _cached_exists(f"app-registration:{name}", lookup)[1]
 
 
 def app_registration_exists(name: str) -> tuple[bool, Optional[str]]:
@@ -82,15 +497,45 @@ def app_registration_exists(name: str) -> tuple[bool, Optional[str]]:
     Returns:
         Tuple of (exists, app_id)
     """
+    app = find_app_registration(name)
+    if app:
+        return True, app.get("appId")
+    return False, None
+
+
+def find_service_principal(app_id: str) -> Optional[str]:
+    """Object ID of the service principal for an app (client) ID, or None"""
+    def lookup():
+        success, result, _ = run_az_command([
+            "az", "ad", "sp", "list",
+            "--filter", f"appId eq '{app_id}'",
+            "--query", "[].id"
+        ])
+
+        if success and result and len(result) > 0:
+            return True, result[0]
+        return False, None
+
+    return _cached_exists(f"sp:{app_id}", lookup)[1]
+
+
+def list_storage_containers(storage_account: str, resource_group: str) -> Optional[List[str]]:
+    """
+    List the container names of a storage account with one management-plane call.
+
+    Returns:
+        Container names, or None if the listing failed
+    """
     success, result, _ = run_az_command([
-        "az", "ad", "app", "list",
-        "--filter", f"displayName eq '{name}'",
-        "--query", "[].{{id:id,appId:appId}}"
+        "az", "storage", "container-rm", "list",
+        "--storage-account", storage_account,
+        "--resource-group", resource_group,
+        "--query", "[].name",
+        "-o", "json"
     ])
-
-    if success and result and len(result) > 0:
-        return True, result[0].get("appId")
-    return False, None
+    if not success or not isinstance(result, list):
+        return None
+    return result
 
 
 def validate_azure_login():
@@ -0,0 +1,299 @@
+"""Batch generation of many project configurations"""
+
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Optional, List, Dict, Any
+
+import click
+
+from .config_loader import config_from_file, load_layered_config, merge_file_config, build_config
+from .profiler import phase, profiling_enabled, get_profiler
+from .schema import validate_file_config, unknown_file_fields, format_errors
+from .template_generator import TerraformTemplateGenerator
+
+
+CONFIG_SUFFIXES = (".yaml", ".yml")
+
+# Generator shared by every project rendered in this process
+_generator: Optional[TerraformTemplateGenerator] = None
+
+
+def discover_config_files(pattern: str) -> List[Path]:
+    """
+    Resolve a directory or glob pattern into a sorted list of config files.
+
+    Files whose name starts with an underscore are shared layers pulled in
+    through `extends`, not projects, and are skipped.
+
+    Args:
+        pattern: Directory containing YAML files, or a glob pattern
+
+    Returns:
+        Sorted list of config file paths
+    """
+    path = Path(pattern)
+    if path.is_dir():
+        files = [p for p in path.iterdir() if p.suffix in CONFIG_SUFFIXES and p.is_file()]
+    else:
+        files = [Path(p) for p in glob.glob(pattern, recursive=True)]
+        files = [p for p in files if p.suffix in CONFIG_SUFFIXES and p.is_file()]
+    return sorted(p for p in files if not p.name.startswith("_"))
+
+
+def expand_config_paths(paths: List[str]) -> List[Path]:
+    """Expand files, directories and glob patterns into unique config files, in order"""
+    config_files = []
+    for path in paths:
+        config_files.extend([Path(path)] if os.path.isfile(path) else discover_config_files(path))
+    return list(dict.fromkeys(config_files))
+
+
+def project_output_dirs(config_files: List[Path], output_root: str) -> Dict[Path, Path]:
+    """
+    Map each config file to its own output directory under output_root.
+
+    Raises:
+        click.ClickException: If two config files share the same name
+    """
+    output_dirs = {}
+    seen = {}
+    for config_file in config_files:
+        name = config_file.stem
+        if name in seen:
+            raise click.ClickException(
+                f"Config files {seen[name]} and {config_file} would both generate into '{name}'"
+            )
+        seen[name] = config_file
+        output_dirs[config_file] = Path(output_root) / name
+    return output_dirs
+
+
+def _get_generator() -> TerraformTemplateGenerator:
+    global _generator
+    if _generator is None:
+        _generator = TerraformTemplateGenerator()
+        _generator.preload()
+    return _generator
+
+
+def _init_worker():
+    """Process pool initializer; reuses the parent's generator when forked"""
+    # Forked workers inherit the parent's events; only report their own
+    get_profiler().take_events()
+    _get_generator()
+
+
+def find_missing_storage(config_files: List[Path]) -> set:
+    """
+    Find configs whose existing storage account does not exist.
+
+    All storage accounts are checked with a single batched Azure lookup.
+
+    Returns:
+        Set of config files referencing a missing storage account
+    """
+    from .azure_helper import resources_exist, resource_key
+
+    wanted = {}
+    for config_file in config_files:
+        try:
+            config = config_from_file(str(config_file))
+        except Exception:
+            # Reported by render_project
+            continue
+        if config.get("create_storage") and config.get("use_existing_storage"):
+            wanted[config_file] = resource_key(
+                "storage_account", config["storage_account_name"], config["resource_group_name"]
+            )
+
+    if not wanted:
+        return set()
+
+    existing = resources_exist(list(wanted.values()))
+    return {config_file for config_file, key in wanted.items() if not existing[key]}
+
+
+def render_project(config_file: str, output_dir: str, dry_run: bool = False,
+                   storage_missing: bool = False, force: bool = False) -> Dict[str, Any]:
+    """
+    Load, validate and render a single project configuration.
+
+    Args:
+        config_file: YAML configuration file
+        output_dir: Directory to render into
+        dry_run: Validate only, do not write files
+        storage_missing: The config's existing storage account was found missing
+        force: Rewrite every file regardless of the manifest
+
+    Returns:
+        Result dictionary with status, changed files, error, warnings and per-phase timings
+    """
+    result = {
+        "config_file": str(config_file),
+        "output_dir": str(output_dir),
+        "project_name": None,
+        "success": False,
+        "error": None,
+        "warnings": [],
+        "changed_files": [],
+        "load_time": 0.0,
+        "render_time": 0.0,
+    }
+
+    start = time.perf_counter()
+    with phase("load config", config_file=str(config_file)):
+        try:
+            file_config = load_layered_config([config_file])
+        except Exception as e:
+            result["error"] = f"Error loading config file: {str(e)}"
+            result["load_time"] = time.perf_counter() - start
+            return result
+
+        errors = validate_file_config(file_config)
+    result["load_time"] = time.perf_counter() - start
+    if errors:
+        result["error"] = f"Configuration error: {format_errors(errors)}"
+        return result
+    result["warnings"] = [f"{path}: {message}, ignored" for path, message in unknown_file_fields(file_config)]
+
+    config = build_config(merge_file_config(file_config))
+    result["project_name"] = config.get("project_name")
+
+    if storage_missing:
+        result["error"] = (
+            f"Storage account '{config['storage_account_name']}' does not exist "
+            f"in resource group '{config['resource_group_name']}'"
+        )
+        return result
+
+    if not dry_run:
+        start = time.perf_counter()
+        try:
+            with phase("render", config_file=str(config_file)):
+                result["changed_files"] = _get_generator().generate(output_dir, config, quiet=True, force=force)
+        except Exception as e:
+            result["error"] = f"Render failed: {str(e)}"
+            result["render_time"] = time.perf_counter() - start
+            return result
+        result["render_time"] = time.perf_counter() - start
+
+    result["success"] = True
+    return result
+
+
+def _render_in_worker(*args) -> Dict[str, Any]:
+    """render_project for pool workers; ships the worker's trace events back with the result"""
+    result = render_project(*args)
+    if profiling_enabled():
+        result["trace_events"] = get_profiler().take_events()
+    return result
+
+
+def generate_batch(config_files: List[Path], output_root: str, workers: Optional[int] = None,
+                   dry_run: bool = False, check_existing: bool = False,
+                   force: bool = False) -> List[Dict[str, Any]]:
+    """
+    Render many project configurations across a process pool.
+
+    The template environment is built once in the parent and inherited by
+    forked workers; spawned workers build their own once at startup.
+
+    Args:
+        config_files: Config files to render
+        output_root: Root directory; each project renders into <output_root>/<config name>
+        workers: Number of worker processes (default: CPU count)
+        dry_run: Validate only, do not write files
+        check_existing: Verify existing storage accounts before rendering
+        force: Rewrite every file regardless of the manifests
+
+    Returns:
+        Result dictionaries in config file order
+    """
+    output_dirs = project_output_dirs(config_files, output_root)
+    workers = max(1, workers or os.cpu_count() or 1)
+    missing = find_missing_storage(config_files) if check_existing else set()
+
+    _get_generator()
+
+    if workers == 1 or len(config_files) <= 1:
+        return [
+            render_project(str(f), str(output_dirs[f]), dry_run, f in missing, force)
+            for f in config_files
+        ]
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {
+            pool.submit(_render_in_worker, str(f), str(output_dirs[f]), dry_run, f in missing, force): f
+            for f in config_files
+        }
+        for future in as_completed(futures):
+            config_file = futures[future]
+            try:
+                results[config_file] = future.result()
+                get_profiler().add_events(results[config_file].pop("trace_events", []))
+            except Exception as e:
+                results[config_file] = {
+                    "config_file": str(config_file),
+                    "output_dir": str(output_dirs[config_file]),
+                    "project_name": None,
+                    "success": False,
+                    "error": f"Worker failed: {str(e)}",
+                    "changed_files": [],
+                    "load_time": 0.0,
+                    "render_time": 0.0,
+                }
+
+    return [results[f] for f in config_files]
+
+
+def print_batch_report(results: List[Dict[str, Any]], elapsed: float, workers: int):
+    """Print an aggregated success/failure report with per-project timings"""
+    click.echo("\n📊 Batch Generation Report:")
+
+    name_width = max([len(Path(r["config_file"]).stem) for r in results] + [7])
+    for r in results:
+        name = Path(r["config_file"]).stem.ljust(name_width)
+        timing = f"{(r['load_time'] + r['render_time']) * 1000:8.1f} ms"
+        if r["success"] and r["changed_files"]:
+            click.secho(f"  ✓ {name} {timing}  {r['output_dir']} ({', '.join(r['changed_files'])})", fg="green")
+        elif r["success"]:
+            click.echo(f"  = {name} {timing}  {r['output_dir']} (unchanged)")
+        else:
+            click.secho(f"  ✗ {name} {timing}  {r['error']}", fg="red")
+        for warning in r.get("warnings", []):
+            click.secho(f"    ⚠️  {warning}", fg="yellow")
+
+    succeeded = sum(1 for r in results if r["success"])
+    changed = sum(1 for r in results if r["changed_files"])
+    failed = len(results) - succeeded
+    click.echo(
+        f"\n  {succeeded} succeeded ({changed} changed), {failed} failed "
+        f"({len(results)} projects, {workers} workers, {elapsed:.2f}s total)"
+    )
+
+
+def write_changes_file(changes_file: str, results: List[Dict[str, Any]]):
+    """
+    Write a JSON report of the projects whose generated files changed.
+
+    Pipelines use it to run terraform only in directories that changed.
+    """
+    report = {
+        "changed": [
+            {
+                "config_file": r.get("config_file"),
+                "output_dir": r["output_dir"],
+                "files": r["changed_files"],
+            }
+            for r in results if r.get("changed_files")
+        ],
+        "unchanged": [r["output_dir"] for r in results if r.get("success") and not r.get("changed_files")],
+        "failed": [r["output_dir"] for r in results if not r.get("success")],
+    }
+    with open(changes_file, 'w') as f:
+        json.dump(report, f, indent=2)
@@ -0,0 +1,259 @@
+"""Local caches for Fasttrack CLI"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Dict, Any, Tuple, Callable
+
+
+def get_cache_dir(subdir: Optional[str] = None) -> Path:
+    """
+    Return the Fasttrack cache directory, creating it if needed.
+
+    Uses $FASTTRACK_CACHE_DIR, then $XDG_CACHE_HOME/fasttrack, then
+    ~/.cache/fasttrack.
+
+    Args:
+        subdir: Optional subdirectory inside the cache directory
+
+    Returns:
+        Path to the cache directory
+    """
+    base = os.environ.get("FASTTRACK_CACHE_DIR")
+    if not base:
+        xdg = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+        base = os.path.join(xdg, "fasttrack")
+
+    path = Path(base)
+    if subdir:
+        path = path / subdir
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+# Per-thread override set by cache_bypassed()
+_thread_settings = threading.local()
+
+
+def cache_enabled() -> bool:
+    """Caching is on unless disabled with --no-cache, $FASTTRACK_NO_CACHE or cache_bypassed()"""
+    if getattr(_thread_settings, "bypass", False):
+        return False
+    return os.environ.get("FASTTRACK_NO_CACHE", "") in ("", "0", "false")
+
+
+@contextmanager
+def cache_bypassed():
+    """
+    Disable caching for the current thread only while the block runs.
+
+    The daemon serves concurrent requests from one process, so a request
+    made with --no-cache cannot change the environment of the others.
+    """
+    previous = getattr(_thread_settings, "bypass", False)
+    _thread_settings.bypass = True
+    try:
+        yield
+    finally:
+        _thread_settings.bypass = previous
+
+
+def set_cache_enabled(enabled: bool):
+    """
+    Enable or disable caching for this process and the processes it spawns.
+
+    The setting travels through the environment so batch worker processes
+    inherit it.
+    """
+    if enabled:
+        os.environ.pop("FASTTRACK_NO_CACHE", None)
+    else:
+        os.environ["FASTTRACK_NO_CACHE"] = "1"
+
+
+@contextmanager
+def file_lock(path: Path):
+    """
+    Hold an exclusive flock on path while the block runs.
+
+    Runs unlocked where flock is unavailable or the lock file cannot be
+    created (e.g. a read-only cache directory).
+    """
+    try:
+        import fcntl
+        lock_file = open(path, "a")
+    except (ImportError, OSError):
+        yield
+        return
+
+    with lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def write_json_atomic(path: Path, value: Any, mode: int = 0o600):
+    """Write JSON to a unique temporary file and move it into place"""
+    fd, tmp_file = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(value, f)
+        os.chmod(tmp_file, mode)
+        os.replace(tmp_file, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_file)
+        except OSError:
+            pass
+        raise
+
+
+class SessionCache:
+    """
+    Small key/value cache kept in memory and mirrored to a JSON file.
+
+    Every entry carries its own expiry time. The file lets short-lived CLI
+    processes share lookups; the in-memory copy makes repeated lookups within
+    one command free.
+
+    Safe to share between threads. Writes re-read the file under a file lock
+    and apply only this process's change, so concurrent processes do not
+    overwrite each other's entries or invalidations.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._entries: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, 'r') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def _load(self) -> Dict[str, Any]:
+        if self._entries is None:
+            self._entries = self._read()
+        return self._entries
+
+    def _update(self, change: Callable[[Dict[str, Any]], None]):
+        """Apply change to the current file contents and to the in-memory copy"""
+        with self._lock:
+            with file_lock(self.path.with_name(self.path.name + ".lock")):
+                entries = self._read()
+                now = time.time()
+                # Drop expired entries so the file does not grow without bound
+                for stale in [k for k, e in entries.items() if e["expires"] < now]:
+                    del entries[stale]
+                change(entries)
+                try:
+                    write_json_atomic(self.path, entries)
+                except OSError:
+                    # A read-only cache directory only costs us the cross-process reuse
+                    change(self._load())
+                    return
+            self._entries = entries
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Look up a key.
+
+        Returns:
+            Tuple of (hit, value)
+        """
+        if not cache_enabled():
+            return False, None
+
+        with self._lock:
+            entry = self._load().get(key)
+        if entry is None or entry["expires"] < time.time():
+            return False, None
+        return True, entry["value"]
+
+    def set(self, key: str, value: Any, ttl: float):
+        """Store a value for ttl seconds"""
+        self.set_many({key: (value, ttl)})
+
+    def set_many(self, items: Dict[str, Tuple[Any, float]]):
+        """Store several {key: (value, ttl)} entries with a single file write"""
+        if not cache_enabled() or not items:
+            return
+
+        now = time.time()
+
+        def change(entries):
+            for key, (value, ttl) in items.items():
+                entries[key] = {"value": value, "expires": now + ttl}
+        self._update(change)
+
+    def invalidate(self, prefix: str = ""):
+        """Remove every entry whose key starts with prefix (all entries by default)"""
+        def change(entries):
+            for key in [k for k in entries if k.startswith(prefix)]:
+                del entries[key]
+        self._update(change)
+
+
+class ContentCache:
+    """
+    Cache of JSON values keyed by content hashes, one file per key.
+
+    Keys already identify their content, so entries never expire; they are
+    only removed by `fasttrack cache clear`. Lookups are memoized in memory.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._memory: Dict[str, Any] = {}
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Look up a key.
+
+        Returns:
+            Tuple of (hit, value)
+        """
+        if key in self._memory:
+            return True, self._memory[key]
+        if not cache_enabled():
+            return False, None
+
+        try:
+            with open(self.directory / f"{key}.json", 'r') as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            return False, None
+        self._memory[key] = value
+        return True, value
+
+    def set(self, key: str, value: Any):
+        """Store a value"""
+        self._memory[key] = value
+        if not cache_enabled():
+            return
+
+        try:
+            write_json_atomic(self.directory / f"{key}.json", value, 0o644)
+        except (TypeError, ValueError):
+            # Values JSON cannot represent (e.g. YAML dates) are only memoized
+            pass
+        except OSError:
+            pass
+
+    def clear(self):
+        """Remove every entry"""
+        self._memory.clear()
+        for path in self.directory.glob("*.json"):
+            try:
+                path.unlink()
+            except OSError:
+                pass
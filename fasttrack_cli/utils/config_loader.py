@@ -0,0 +1,288 @@
+"""Configuration loading helpers shared by single and batch generation"""
+
+import copy
+import hashlib
+import os
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+
+from .cache import ContentCache, get_cache_dir
+
+
+# Key naming the layers a config file builds on
+EXTENDS_KEY = "extends"
+
+
+# Defaults applied when neither the CLI nor the config file sets a value
+DEFAULT_SETTINGS = {
+    "project_name": None,
+    "resource_group": None,
+    "location": "eastus",
+    "environment": "development",
+    "app_name": None,
+    "redirect_url": None,
+    "storage_account": None,
+    "use_existing_storage": False,
+    "containers": (),
+    "container_mode": "indexed",
+    "migrate_indexed_containers": False,
+    "storage_tier": "Standard",
+    "storage_replication": "LRS",
+    "secret_rotation_months": 12,
+    "enable_remote_state": False,
+    "state_storage_account": None,
+    "state_container": "tfstate",
+    "state_key": None,
+}
+
+
+def load_config_file(config_file: str) -> Dict[str, Any]:
+    """
+    Load a YAML configuration file.
+
+    Args:
+        config_file: Path to the YAML file
+
+    Returns:
+        Parsed configuration (empty dict for an empty file)
+    """
+    import yaml
+
+    # The libyaml loader is several times faster when PyYAML was built with it
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(config_file, 'r') as f:
+        return yaml.load(f, Loader=loader) or {}
+
+
+_layer_cache: Optional[ContentCache] = None
+
+
+def _get_layer_cache() -> ContentCache:
+    global _layer_cache
+    if _layer_cache is None:
+        try:
+            directory = get_cache_dir("configs")
+        except OSError:
+            directory = Path(os.devnull)
+        _layer_cache = ContentCache(directory)
+    return _layer_cache
+
+
+def clear_layer_cache():
+    """Forget parsed and merged config layers"""
+    _get_layer_cache().clear()
+
+
+def deep_merge(base: Dict[str, Any], overlay: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge overlay onto base.
+
+    Mappings are merged key by key, recursively; any other value in the
+    overlay (including lists) replaces the base value.
+    """
+    merged = dict(base)
+    for key, value in overlay.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = deep_merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def _load_layer(path: Path) -> Tuple[str, Dict[str, Any]]:
+    """Read one layer, reusing its parsed form when the content was seen before"""
+    with open(path, 'rb') as f:
+        content_hash = hashlib.sha256(f.read()).hexdigest()
+
+    cache = _get_layer_cache()
+    hit, parsed = cache.get(f"layer-{content_hash}")
+    if not hit:
+        parsed = load_config_file(str(path))
+        if not isinstance(parsed, dict):
+            raise ValueError(f"{path}: configuration must be a mapping")
+        cache.set(f"layer-{content_hash}", parsed)
+    return content_hash, parsed
+
+
+def resolve_layers(config_files: List[str]) -> List[Tuple[Path, str, Dict[str, Any]]]:
+    """
+    Expand config files into their ordered layers.
+
+    Each file is preceded by the files it extends (recursively, base first).
+    A layer shared by several files is applied once, at its first position.
+
+    Args:
+        config_files: Config files, lowest precedence first
+
+    Returns:
+        List of (path, content hash, parsed layer) tuples
+
+    Raises:
+        ValueError: On missing layers or circular extends
+    """
+    layers = []
+    seen = set()
+
+    def visit(path: Path, stack: List[Path]):
+        path = path.resolve()
+        if path in stack:
+            chain = " -> ".join(str(p) for p in stack + [path])
+            raise ValueError(f"Circular extends: {chain}")
+        if path in seen:
+            return
+
+        content_hash, parsed = _load_layer(path)
+        parents = parsed.get(EXTENDS_KEY) or []
+        for parent in [parents] if isinstance(parents, str) else parents:
+            visit(path.parent / parent, stack + [path])
+
+        seen.add(path)
+        layers.append((path, content_hash, parsed))
+
+    for config_file in config_files:
+        visit(Path(config_file), [])
+    return layers
+
+
+def load_layered_config(config_files: List[str]) -> Dict[str, Any]:
+    """
+    Load and deep-merge config files with everything they extend.
+
+    Merged results are cached under the content hashes of the layers they
+    were built from, so a fleet sharing base and environment layers merges
+    those once and afterwards only re-merges layers that changed.
+
+    Args:
+        config_files: Config files, lowest precedence first
+
+    Returns:
+        Merged file configuration (without the extends key)
+    """
+    layers = resolve_layers(config_files)
+    cache = _get_layer_cache()
+
+    # Key of every prefix of the layer stack
+    keys = []
+    digest = hashlib.sha256()
+    for _, content_hash, _ in layers:
+        digest.update(content_hash.encode())
+        keys.append(f"merged-{digest.hexdigest()}")
+
+    # Start from the longest prefix merged before
+    merged = {}
+    start = 0
+    for index in range(len(layers) - 1, -1, -1):
+        hit, value = cache.get(keys[index])
+        if hit:
+            merged, start = value, index + 1
+            break
+
+    for index in range(start, len(layers)):
+        layer = {k: v for k, v in layers[index][2].items() if k != EXTENDS_KEY}
+        merged = deep_merge(merged, layer)
+        cache.set(keys[index], merged)
+
+    return copy.deepcopy(merged)
+
+
+def merge_file_config(file_config: Dict[str, Any], settings: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Merge a loaded config file with command line settings.
+
+    Command line values win for names and identifiers, while file values win
+    for options that carry a CLI default (location, tier, ...).
+
+    Args:
+        file_config: Parsed YAML configuration
+        settings: Command line settings keyed like DEFAULT_SETTINGS
+
+    Returns:
+        Merged settings dictionary
+    """
+    merged = dict(DEFAULT_SETTINGS)
+    merged.update(settings or {})
+
+    merged["project_name"] = merged["project_name"] or file_config.get('project_name')
+    merged["resource_group"] = merged["resource_group"] or file_config.get('resource_group')
+    merged["location"] = file_config.get('location', merged["location"])
+    merged["environment"] = file_config.get('environment', merged["environment"])
+    merged["app_name"] = merged["app_name"] or file_config.get('app_name')
+    merged["redirect_url"] = merged["redirect_url"] or file_config.get('redirect_url')
+    merged["storage_account"] = merged["storage_account"] or file_config.get('storage_account')
+    merged["use_existing_storage"] = merged["use_existing_storage"] or file_config.get('use_existing_storage', False)
+    merged["containers"] = merged["containers"] or tuple(file_config.get('containers', []))
+    merged["container_mode"] = file_config.get('container_mode', merged["container_mode"])
+    merged["migrate_indexed_containers"] = (
+        merged["migrate_indexed_containers"] or file_config.get('migrate_indexed_containers', False)
+    )
+    merged["storage_tier"] = file_config.get('storage_tier', merged["storage_tier"])
+    merged["storage_replication"] = file_config.get('storage_replication', merged["storage_replication"])
+    merged["secret_rotation_months"] = file_config.get('secret_rotation_months', merged["secret_rotation_months"])
+
+    # Remote state config from file
+    if 'remote_state' in file_config:
+        merged["enable_remote_state"] = True
+        rs = file_config['remote_state'] or {}
+        merged["state_storage_account"] = merged["state_storage_account"] or rs.get('storage_account')
+        merged["state_container"] = rs.get('container', merged["state_container"])
+        merged["state_key"] = merged["state_key"] or rs.get('key')
+
+    return merged
+
+
+def build_config(settings: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the template rendering configuration from merged settings.
+
+    Args:
+        settings: Settings keyed like DEFAULT_SETTINGS
+
+    Returns:
+        Configuration dictionary for TerraformTemplateGenerator
+    """
+    s = dict(DEFAULT_SETTINGS)
+    s.update(settings)
+
+    project_name = s["project_name"]
+    app_name = s["app_name"]
+    storage_account = s["storage_account"]
+
+    config = {
+        "project_name": project_name,
+        "resource_group_name": s["resource_group"],
+        "location": s["location"],
+        "environment": s["environment"],
+        "create_app_registration": bool(app_name),
+        "create_storage": bool(storage_account),
+        "use_existing_storage": s["use_existing_storage"],
+        "storage_tier": s["storage_tier"],
+        "storage_replication": s["storage_replication"],
+        "secret_rotation_months": s["secret_rotation_months"],
+        "secret_display_name": "Generated by Fasttrack CLI",
+        "enable_remote_state": s["enable_remote_state"],
+        "state_storage_account": s["state_storage_account"],
+        "state_container": s["state_container"],
+        "state_key": s["state_key"] or f"{project_name}.tfstate"
+    }
+
+    if app_name:
+        config.update({
+            "azuread_app_name": app_name,
+            "redirect_url": s["redirect_url"] or f"https://{app_name}.example.com/auth/callback"
+        })
+
+    if storage_account:
+        containers = s["containers"]
+        config.update({
+            "storage_account_name": storage_account,
+            "storage_containers": list(containers) if containers else [],
+            "container_mode": s["container_mode"],
+            "migrate_indexed_containers": s["migrate_indexed_containers"]
+        })
+
+    return config
+
+
+def config_from_file(config_file: str) -> Dict[str, Any]:
+    """Load a YAML file with its layers and build its template rendering configuration"""
+    return build_config(merge_file_config(load_layered_config([config_file])))
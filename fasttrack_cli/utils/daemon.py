@@ -0,0 +1,483 @@
+"""Long-lived daemon serving CLI requests over a local Unix socket"""
+
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+from collections import deque
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Optional, Dict, Any, Callable
+
+import click
+
+from .cache import get_cache_dir, cache_enabled, cache_bypassed
+
+
+# Requests are single JSON lines: {"command": ..., "args": {...}, "options": {...}, "stream": bool}
+# answered by {"ok": true, "result": ...} or {"ok": false, "error": ..., "errors": [...]}.
+# Streaming requests first receive their output as {"out": text, "err": bool}
+# messages, and {"keepalive": true} while the command runs.
+PROTOCOL_VERSION = 3
+
+# Lines of terraform output returned with plan results
+OUTPUT_TAIL_LINES = 200
+
+# Seconds the client waits for the daemon's next message before running the
+# command itself ($FASTTRACK_DAEMON_TIMEOUT; 0 waits forever)
+DAEMON_TIMEOUT = 30
+
+# Seconds between keepalive messages of a streaming request
+KEEPALIVE_INTERVAL = 5
+
+# Output sink of the request the current thread serves
+_request_output = threading.local()
+
+
+def socket_path() -> Path:
+    """Socket the daemon listens on: $FASTTRACK_SOCKET or <cache dir>/daemon.sock"""
+    path = os.environ.get("FASTTRACK_SOCKET")
+    if path:
+        return Path(path)
+    return get_cache_dir() / "daemon.sock"
+
+
+def daemon_enabled() -> bool:
+    """Commands forward to a running daemon unless --no-daemon or $FASTTRACK_NO_DAEMON is set"""
+    return os.environ.get("FASTTRACK_NO_DAEMON", "") in ("", "0", "false")
+
+
+def daemon_timeout() -> Optional[float]:
+    """Seconds to wait for the daemon's next message: $FASTTRACK_DAEMON_TIMEOUT, None for no limit"""
+    try:
+        seconds = float(os.environ.get("FASTTRACK_DAEMON_TIMEOUT", DAEMON_TIMEOUT))
+    except ValueError:
+        return DAEMON_TIMEOUT
+    return seconds if seconds > 0 else None
+
+
+def set_daemon_enabled(enabled: bool):
+    """Enable or disable forwarding to the daemon for this process"""
+    if enabled:
+        os.environ.pop("FASTTRACK_NO_DAEMON", None)
+    else:
+        os.environ["FASTTRACK_NO_DAEMON"] = "1"
+
+
+class DaemonError(Exception):
+    """A request the daemon rejected; errors holds (path, message) details"""
+
+    def __init__(self, message: str, errors: Optional[list] = None):
+        super().__init__(message)
+        self.errors = errors or []
+
+
+class DaemonState:
+    """
+    Everything the daemon keeps warm between requests.
+
+    The template environment is built once, Azure lookups stay in the
+    in-process session cache, and the terraform probe runs once. Terraform
+    operations on the same directory are serialized; different directories
+    run concurrently.
+    """
+
+    def __init__(self):
+        from .template_generator import TerraformTemplateGenerator
+
+        self.generator = TerraformTemplateGenerator()
+        self.generator.preload()
+        self._terraform_checked = False
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def directory_lock(self, directory: str) -> threading.Lock:
+        """Lock serializing operations on one directory"""
+        from .fleet import normalize_directory
+
+        key = normalize_directory(directory)
+        with self._locks_lock:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
+
+    def require_terraform(self):
+        """Probe for terraform once per daemon instead of once per request"""
+        if not self._terraform_checked:
+            from .terraform_helper import validate_terraform_installation
+            try:
+                validate_terraform_installation()
+            except click.ClickException as e:
+                raise DaemonError(str(e))
+            self._terraform_checked = True
+
+
+def handle_generate(state: DaemonState, args: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Generate one project.
+
+    Args (JSON):
+        output_dir: Output directory
+        config_files: Layered config files, lowest precedence first
+        settings: Command line settings keyed like DEFAULT_SETTINGS
+        skip_validation: Skip the Azure login and existing storage checks
+        force: Rewrite every file regardless of the manifest
+    """
+    from .config_loader import load_layered_config, merge_file_config, build_config
+    from .schema import file_schema, unknown_file_fields, validate_resolved_config
+
+    settings = dict(args.get("settings") or {})
+    config_files = args.get("config_files") or []
+    if config_files:
+        try:
+            file_config = load_layered_config(config_files)
+        except Exception as e:
+            raise DaemonError(f"Error loading config file: {str(e)}")
+        errors = file_schema().validate(file_config)
+        if errors:
+            raise DaemonError("Invalid config file", errors)
+        for path, message in unknown_file_fields(file_config):
+            click.secho(f"⚠️  {path}: {message}, ignored", fg="yellow")
+        settings = merge_file_config(file_config, settings)
+
+    config = build_config(settings)
+    errors = validate_resolved_config(config)
+    if errors:
+        raise DaemonError("Configuration error", errors)
+
+    if not args.get("skip_validation"):
+        from .azure_helper import validate_azure_login, storage_account_exists
+        try:
+            validate_azure_login()
+        except click.ClickException as e:
+            raise DaemonError(str(e))
+        if config.get("create_storage") and config.get("use_existing_storage"):
+            if not storage_account_exists(config["storage_account_name"], config["resource_group_name"]):
+                raise DaemonError(
+                    f"Storage account '{config['storage_account_name']}' does not exist "
+                    f"in resource group '{config['resource_group_name']}'"
+                )
+    state.require_terraform()
+
+    output_dir = args.get("output_dir") or "./terraform-generated"
+    with state.directory_lock(output_dir):
+        try:
+            changed = state.generator.generate(output_dir, config, quiet=True, force=bool(args.get("force")))
+        except click.ClickException as e:
+            raise DaemonError(e.format_message())
+    return {"output_dir": output_dir, "changed_files": changed}
+
+
+def handle_validate(state: DaemonState, args: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate config files.
+
+    Args (JSON):
+        paths: Absolute config files, directories or glob patterns
+        strict: Report unknown keys as errors instead of warnings
+
+    Returns:
+        {file: {"errors": [{"path": ..., "message": ...}, ...], "warnings": [...]}}
+    """
+    from .batch import expand_config_paths
+    from .schema import validate_files
+
+    results = validate_files(expand_config_paths(args.get("paths") or []), strict=bool(args.get("strict")))
+    return {
+        f: {
+            "errors": [{"path": path, "message": message} for path, message in errors],
+            "warnings": [{"path": path, "message": message} for path, message in warnings],
+        }
+        for f, (errors, warnings) in results.items()
+    }
+
+
+def handle_plan(state: DaemonState, args: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run terraform plan in a directory.
+
+    Args (JSON):
+        directory: Terraform configuration directory
+
+    Returns:
+        {"changes": bool, "output": last output lines}
+    """
+    from .terraform_helper import terraform_init, terraform_plan_saved, remove_plan_file, PLAN_FILE
+
+    directory = args.get("directory") or "./terraform-generated"
+    if not os.path.isdir(directory):
+        raise DaemonError(f"Directory not found: {directory}")
+    state.require_terraform()
+
+    lines = deque(maxlen=OUTPUT_TAIL_LINES)
+
+    def on_line(line: str):
+        lines.append(line)
+        click.echo(line)
+
+    with state.directory_lock(directory):
+        if not terraform_init(directory, on_line=on_line):
+            raise DaemonError("Terraform init failed", [("init", "\n".join(lines))])
+        try:
+            changes = terraform_plan_saved(directory, PLAN_FILE, on_line)
+        finally:
+            # Plans are only previews here; saved plans can contain secrets
+            remove_plan_file(directory, PLAN_FILE)
+
+    if changes is None:
+        raise DaemonError("Terraform plan failed", [("plan", "\n".join(lines))])
+    return {"changes": changes, "output": "\n".join(lines)}
+
+
+def handle_output(state: DaemonState, args: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Read terraform outputs.
+
+    Args (JSON):
+        directory: Terraform configuration directory
+        name: Single output to read (default: all outputs as JSON)
+    """
+    from .generation import load_generation_record
+    from .terraform_helper import terraform_output
+
+    directory = args.get("directory") or "./terraform-generated"
+    name = args.get("name")
+    if not os.path.isdir(directory):
+        raise DaemonError(f"Directory not found: {directory}")
+
+    record = load_generation_record(directory)
+    if name and record and name not in record["outputs"]:
+        raise DaemonError(f"Unknown output: {name}", [("name", f"available: {', '.join(record['outputs'])}")])
+
+    with state.directory_lock(directory):
+        success, result = terraform_output(directory, name)
+    if not success:
+        raise DaemonError(f"Failed to get outputs: {result}")
+    return {"output": result}
+
+
+HANDLERS: Dict[str, Callable[[DaemonState, Dict[str, Any]], Dict[str, Any]]] = {
+    "ping": lambda state, args: {"version": PROTOCOL_VERSION, "pid": os.getpid()},
+    "generate": handle_generate,
+    "validate": handle_validate,
+    "plan": handle_plan,
+    "output": handle_output,
+}
+
+
+def dispatch(state: DaemonState, request: Any) -> Dict[str, Any]:
+    """
+    Run one request and build its response.
+
+    Options (JSON):
+        no_cache: Bypass cached Azure lookups and outputs, like --no-cache
+    """
+    if not isinstance(request, dict) or request.get("command") not in HANDLERS:
+        return {"ok": False, "error": f"Unknown command; expected one of: {', '.join(HANDLERS)}", "errors": []}
+    options = request.get("options") or {}
+    try:
+        with cache_bypassed() if options.get("no_cache") else nullcontext():
+            result = HANDLERS[request["command"]](state, request.get("args") or {})
+    except DaemonError as e:
+        return {"ok": False, "error": str(e), "errors": [list(error) for error in e.errors]}
+    except Exception as e:
+        return {"ok": False, "error": f"{type(e).__name__}: {str(e)}", "errors": []}
+    return {"ok": True, "result": result}
+
+
+class _ThreadOutput(io.TextIOBase):
+    """
+    sys.stdout/sys.stderr of the daemon, routing writes by thread.
+
+    Threads serving a request write to that request's sink; every other
+    thread writes to the daemon's own stream.
+    """
+
+    def __init__(self, stream, err: bool):
+        super().__init__()
+        self.stream = stream
+        self.err = err
+
+    @property
+    def encoding(self):
+        return getattr(self.stream, "encoding", "utf-8")
+
+    def _sink(self):
+        return getattr(_request_output, "sink", None)
+
+    def writable(self) -> bool:
+        return True
+
+    def isatty(self) -> bool:
+        return self._sink() is None and self.stream.isatty()
+
+    def write(self, text: str) -> int:
+        # click probes for binary streams with write(b"")
+        if not isinstance(text, str):
+            raise TypeError(f"write() argument must be str, not {type(text).__name__}")
+        sink = self._sink()
+        if sink is None:
+            return self.stream.write(text)
+        if text:
+            sink(text, self.err)
+        return len(text)
+
+    def flush(self):
+        if self._sink() is None:
+            self.stream.flush()
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        self._send_lock = threading.Lock()
+
+    def handle(self):
+        line = self.rfile.readline()
+        try:
+            request = json.loads(line)
+        except ValueError:
+            self._send({"ok": False, "error": "Request is not valid JSON", "errors": []})
+            return
+
+        streaming = isinstance(request, dict) and bool(request.get("stream"))
+        stop = threading.Event()
+        keepalive = threading.Thread(target=self._keepalive, args=(stop,), daemon=True)
+        if streaming:
+            keepalive.start()
+        # Output of requests that do not stream is dropped, never printed by the daemon
+        _request_output.sink = self._forward_output if streaming else (lambda text, err: None)
+        try:
+            response = dispatch(self.server.state, request)
+        finally:
+            _request_output.sink = None
+            stop.set()
+            if streaming:
+                keepalive.join()
+        self._send(response)
+
+    def _send(self, message: Dict[str, Any]):
+        data = (json.dumps(message, default=str) + "\n").encode()
+        with self._send_lock:
+            try:
+                self.wfile.write(data)
+                self.wfile.flush()
+            except OSError:
+                # The client went away; the request still runs to completion
+                pass
+
+    def _forward_output(self, text: str, err: bool):
+        self._send({"out": text, "err": err})
+
+    def _keepalive(self, stop: threading.Event):
+        while not stop.wait(KEEPALIVE_INTERVAL):
+            self._send({"keepalive": True})
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Threaded Unix socket server; one request per connection"""
+
+    daemon_threads = True
+
+    def __init__(self, path: Path, state: DaemonState):
+        self.state = state
+        self.path = Path(path)
+        if self.path.exists():
+            if request(self.path, "ping", timeout=1.0) is not None:
+                raise click.ClickException(f"A daemon is already listening on {self.path}")
+            # Left behind by a daemon that did not shut down cleanly
+            self.path.unlink()
+
+        # Only the owner may connect
+        old_umask = os.umask(0o077)
+        try:
+            super().__init__(str(self.path), _RequestHandler)
+        finally:
+            os.umask(old_umask)
+
+        # Output of request threads goes back to their clients
+        self._stdout, self._stderr = sys.stdout, sys.stderr
+        sys.stdout, sys.stderr = _ThreadOutput(sys.stdout, False), _ThreadOutput(sys.stderr, True)
+
+    def server_close(self):
+        super().server_close()
+        sys.stdout, sys.stderr = self._stdout, self._stderr
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+
+
+def request(path: Path, command: str, args: Optional[Dict[str, Any]] = None,
+            timeout: Optional[float] = None, options: Optional[Dict[str, Any]] = None,
+            on_output: Optional[Callable[[str, bool], None]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Send one request to the daemon.
+
+    Args:
+        path: Daemon socket
+        command: Request command
+        args: Request arguments
+        timeout: Seconds to wait for each message from the daemon (default: no limit)
+        options: Request options (see dispatch)
+        on_output: Called with (text, is_stderr) for the command's output;
+            the request streams when given
+
+    Returns:
+        The response, or None if no daemon is listening or it did not answer in time
+    """
+    message = {"command": command, "args": args or {}, "options": options or {}}
+    if on_output is not None:
+        message["stream"] = True
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(1.0)
+        try:
+            sock.connect(str(path))
+        except OSError:
+            return None
+        sock.settimeout(timeout)
+        sock.sendall((json.dumps(message) + "\n").encode())
+        with sock.makefile("rb") as f:
+            while True:
+                response = json.loads(f.readline())
+                if not isinstance(response, dict):
+                    return None
+                if "ok" in response:
+                    return response
+                if "out" in response and on_output is not None:
+                    on_output(response["out"], bool(response.get("err")))
+    except socket.timeout:
+        click.secho(f"⚠️  Daemon on {path} did not answer within {timeout:g}s", fg="yellow", err=True)
+        return None
+    except (OSError, ValueError):
+        return None
+    finally:
+        sock.close()
+
+
+def forward(command: str, args: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Forward a command to the daemon if one is running.
+
+    --no-cache travels with the request and the command's output is echoed
+    here as the daemon produces it. Profiled commands (--profile) run in
+    this process so the profile covers their work.
+
+    Returns:
+        The daemon's response, or None to run the command in this process
+    """
+    from .profiler import profiling_enabled
+
+    if not daemon_enabled() or profiling_enabled():
+        return None
+    path = socket_path()
+    if not path.exists():
+        return None
+    return request(path, command, args, timeout=daemon_timeout(),
+                   options={"no_cache": not cache_enabled()},
+                   on_output=lambda text, err: click.echo(text, nl=False, err=err))
@@ -0,0 +1,220 @@
+"""Drift detection with refresh-only plans"""
+
+import json
+import os
+import time
+from typing import Dict, Any, List, Optional, TextIO
+
+from .executor import run_command, command_timeout
+from .parallelism import OutputWatcher, choose_parallelism, record_outcome, throttle_backoff
+from .terraform_helper import init_unattended, run_logged_step, remove_plan_file, terraform_env
+
+
+# Saved refresh-only plan, relative to the configuration directory
+DRIFT_PLAN_FILE = os.path.join(".terraform", "fasttrack-drift.tfplan")
+
+# Attribute paths reported per drifted resource
+MAX_ATTRIBUTES = 50
+
+CLEAN = "clean"
+DRIFTED = "drifted"
+ERROR = "error"
+
+
+def changed_attributes(before: Any, after: Any, prefix: str = "") -> List[str]:
+    """
+    Paths of the attributes that differ between two resource states.
+
+    Only paths are reported, never values, so sensitive attributes do not
+    leak into reports.
+    """
+    if before == after:
+        return []
+    if isinstance(before, dict) and isinstance(after, dict):
+        paths = []
+        for key in sorted(set(before) | set(after), key=str):
+            path = f"{prefix}.{key}" if prefix else str(key)
+            paths.extend(changed_attributes(before.get(key), after.get(key), path))
+        return paths
+    if isinstance(before, list) and isinstance(after, list) and len(before) == len(after):
+        paths = []
+        for index, (old, new) in enumerate(zip(before, after)):
+            paths.extend(changed_attributes(old, new, f"{prefix}[{index}]"))
+        return paths
+    return [prefix or "<resource>"]
+
+
+def parse_resource_drift(plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Drifted resources of a `terraform show -json` plan.
+
+    Returns:
+        One dict per resource with its address, actions ("update", "delete")
+        and the changed attribute paths
+    """
+    drifted = []
+    for entry in plan.get("resource_drift") or []:
+        change = entry.get("change") or {}
+        before, after = change.get("before"), change.get("after")
+        attributes = [] if after is None else changed_attributes(before, after)
+        drifted.append({
+            "address": entry.get("address"),
+            "actions": change.get("actions") or [],
+            "attributes": attributes[:MAX_ATTRIBUTES],
+            "truncated": len(attributes) > MAX_ATTRIBUTES,
+        })
+    return drifted
+
+
+def _refresh_only_plan(directory: str, log: TextIO, parallelism: Optional[int], concurrency: int) -> int:
+    """Run the refresh-only plan, backing off while ARM throttles; returns its exit code"""
+    current = choose_parallelism(directory, parallelism, concurrency)
+    attempt = 0
+    while True:
+        watcher = OutputWatcher()
+        returncode = run_logged_step([
+            "terraform", "plan", "-refresh-only", "-input=false", "-lock=false",
+            "-detailed-exitcode", f"-parallelism={current}", f"-out={DRIFT_PLAN_FILE}"
+        ], directory, log, watcher)
+        if returncode in (0, 2):
+            record_outcome(watcher, current)
+            return returncode
+
+        retry = throttle_backoff(watcher, current, attempt)
+        if retry is None:
+            return returncode
+        current, delay = retry
+        log.write(f"# ARM throttling, retrying with -parallelism={current} in {delay:.1f}s\n\n")
+        log.flush()
+        time.sleep(delay)
+        attempt += 1
+
+
+def check_drift(directory: str, log: TextIO, reinit: bool = False, parallelism: Optional[int] = None,
+                concurrency: int = 1) -> Dict[str, Any]:
+    """
+    Run a refresh-only plan in one directory and collect its drift.
+
+    The plan takes no state lock, so drift checks never block applies. A
+    plan that fails because ARM throttled is retried with lower parallelism.
+
+    Args:
+        directory: Terraform configuration directory
+        log: File receiving the output of every step
+        reinit: Run init even if providers and backend are unchanged
+        parallelism: Explicit -parallelism (default: chosen from the resource count)
+        concurrency: Directories of the fleet checked at the same time
+
+    Returns:
+        {"status": CLEAN, DRIFTED or ERROR, "resources": [...], "error": str or None}
+    """
+    result = {"status": ERROR, "resources": [], "error": None}
+
+    if not init_unattended(directory, log, reinit):
+        result["error"] = "terraform init failed"
+        return result
+
+    try:
+        returncode = _refresh_only_plan(directory, log, parallelism, concurrency)
+        if returncode == 0:
+            result["status"] = CLEAN
+            return result
+        if returncode != 2:
+            result["error"] = "terraform plan failed"
+            return result
+
+        show = run_command(
+            ["terraform", "show", "-json", DRIFT_PLAN_FILE],
+            cwd=directory,
+            env=terraform_env(),
+            timeout=command_timeout("terraform", None)
+        )
+    finally:
+        # Plan files can contain sensitive values
+        remove_plan_file(directory, DRIFT_PLAN_FILE)
+
+    if not show.ok:
+        log.write(show.stderr)
+        result["error"] = "terraform show failed"
+        return result
+    try:
+        plan = json.loads(show.stdout)
+    except ValueError:
+        result["error"] = "terraform show returned invalid JSON"
+        return result
+
+    result["resources"] = parse_resource_drift(plan)
+    # Drift can also be limited to outputs, which have no resource entries
+    result["status"] = DRIFTED
+    return result
+
+
+def build_report(results: Dict[str, Dict[str, Any]], display: Dict[str, str],
+                 fleet_results: Dict[str, dict]) -> Dict[str, Any]:
+    """
+    Consolidated drift report of a fleet run.
+
+    Args:
+        results: check_drift() result per normalized directory
+        display: Display name per normalized directory
+        fleet_results: FleetRunner results (status, duration, log file)
+    """
+    directories = []
+    for directory, fleet in fleet_results.items():
+        drift = results.get(directory) or {"status": ERROR, "resources": [], "error": fleet["message"] or fleet["status"]}
+        directories.append({
+            "directory": display[directory],
+            "status": drift["status"],
+            "resources": drift["resources"],
+            "error": drift["error"],
+            "duration": round(fleet["duration"], 2),
+            "log_file": fleet["log_file"],
+        })
+
+    counts = {status: sum(1 for d in directories if d["status"] == status) for status in (CLEAN, DRIFTED, ERROR)}
+    return {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "summary": counts,
+        "directories": directories,
+    }
+
+
+def write_json_report(path: str, report: Dict[str, Any]):
+    """Write the report as JSON"""
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def write_markdown_report(path: str, report: Dict[str, Any]):
+    """Write the report as Markdown"""
+    summary = report["summary"]
+    lines = [
+        "# Drift Report",
+        "",
+        f"Generated {report['generated_at']}: {summary[DRIFTED]} drifted, {summary[CLEAN]} clean, "
+        f"{summary[ERROR]} failed.",
+        "",
+        "| Directory | Status | Drifted resources |",
+        "|-----------|--------|-------------------|",
+    ]
+    for d in report["directories"]:
+        detail = str(len(d["resources"])) if d["status"] == DRIFTED else (d["error"] or "")
+        lines.append(f"| `{d['directory']}` | {d['status']} | {detail} |")
+
+    for d in report["directories"]:
+        if d["status"] != DRIFTED:
+            continue
+        lines.extend(["", f"## `{d['directory']}`", ""])
+        if not d["resources"]:
+            lines.append("- Outputs changed; no resource drift")
+        for resource in d["resources"]:
+            actions = ", ".join(resource["actions"])
+            if "delete" in resource["actions"]:
+                lines.append(f"- `{resource['address']}` ({actions}): deleted outside Terraform")
+                continue
+            attributes = ", ".join(f"`{a}`" for a in resource["attributes"])
+            more = ", ..." if resource["truncated"] else ""
+            lines.append(f"- `{resource['address']}` ({actions}): {attributes}{more}")
+
+    with open(path, 'w') as f:
+        f.write("\n".join(lines) + "\n")
@@ -0,0 +1,414 @@
+"""Asynchronous subprocess execution shared by the az and terraform helpers"""
+
+import asyncio
+import os
+import random
+import re
+import signal
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Optional, TextIO, List
+
+import click
+
+from .profiler import record_subprocess
+
+
+# Called with every output line (without the trailing newline)
+LineCallback = Callable[[str], None]
+
+# Seconds a process gets to exit after SIGTERM before it is killed (graceful
+# commands are never killed)
+KILL_GRACE = 10.0
+
+# How often running commands check for cancellation
+CANCEL_POLL_INTERVAL = 0.1
+
+# Seconds processes left behind by a stopped command may keep its output open
+DRAIN_GRACE = 2.0
+
+# Retry backoff: BACKOFF_BASE * 2^attempt seconds with jitter, at most BACKOFF_MAX
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+
+# Longest output line read from a streamed process
+STREAM_LINE_LIMIT = 16 * 1024 * 1024
+
+# ARM throttling: HTTP 429 and the error codes Azure returns with it
+THROTTLING_PATTERN = re.compile(
+    r"\b429\b|too ?many ?requests|throttl|RequestRateTooLarge|RetryableError", re.IGNORECASE
+)
+
+# Failures that usually succeed on retry
+TRANSIENT_PATTERN = re.compile(
+    r"\b50[234]\b|ServiceUnavailable|GatewayTimeout|BadGateway|connection (?:reset|refused|aborted)"
+    r"|temporarily unavailable|timed? ?out|EOF occurred in violation of protocol|Remote end closed connection",
+    re.IGNORECASE
+)
+
+RETRY_AFTER_PATTERN = re.compile(r"retry[- ]after[:\s]+(\d+)", re.IGNORECASE)
+
+_process_slots: Optional[threading.BoundedSemaphore] = None
+_process_slots_lock = threading.Lock()
+
+# Cancellation event of the fleet run the current thread works for
+_cancel_scope = threading.local()
+
+
+def get_max_processes() -> int:
+    """Child processes allowed at once across all threads: $FASTTRACK_MAX_PROCESSES (default: 16)"""
+    try:
+        return max(1, int(os.environ.get("FASTTRACK_MAX_PROCESSES", "16")))
+    except ValueError:
+        return 16
+
+
+def get_process_slots() -> threading.BoundedSemaphore:
+    """Process-wide semaphore bounding concurrent child processes"""
+    global _process_slots
+    with _process_slots_lock:
+        if _process_slots is None:
+            _process_slots = threading.BoundedSemaphore(get_max_processes())
+        return _process_slots
+
+
+@contextmanager
+def cancellation_scope(event: threading.Event):
+    """
+    Tie the commands this thread runs inside the block to event.
+
+    Setting event stops them and keeps new ones from starting. Fleet
+    commands use one event per run: Ctrl-C reaches the main thread only,
+    and child processes run in their own session, so they never see the
+    terminal's SIGINT themselves.
+    """
+    previous = getattr(_cancel_scope, "event", None)
+    _cancel_scope.event = event
+    try:
+        yield
+    finally:
+        _cancel_scope.event = previous
+
+
+def current_cancel_event() -> Optional[threading.Event]:
+    """Cancellation event of the enclosing cancellation_scope, if any"""
+    return getattr(_cancel_scope, "event", None)
+
+
+def cancellation_requested() -> bool:
+    """True once the enclosing cancellation_scope's event was set"""
+    event = current_cancel_event()
+    return event is not None and event.is_set()
+
+
+def command_timeout(kind: str, default: Optional[float]) -> Optional[float]:
+    """
+    Timeout for one kind of command from $FASTTRACK_<KIND>_TIMEOUT.
+
+    Args:
+        kind: Command kind, e.g. "az" or "terraform"
+        default: Seconds to use when the variable is unset
+
+    Returns:
+        Seconds, or None for no timeout (variable set to 0)
+    """
+    value = os.environ.get(f"FASTTRACK_{kind.upper()}_TIMEOUT")
+    if value is None:
+        return default
+    try:
+        seconds = float(value)
+    except ValueError:
+        return default
+    return seconds if seconds > 0 else None
+
+
+def command_retries(default: int = 3) -> int:
+    """Retries for throttled or transient failures: $FASTTRACK_RETRIES"""
+    try:
+        return max(0, int(os.environ.get("FASTTRACK_RETRIES", default)))
+    except ValueError:
+        return default
+
+
+def classify_failure(output: str) -> Optional[str]:
+    """
+    Classify a failed command's output.
+
+    Returns:
+        "throttled", "transient" or None when a retry is not expected to help
+    """
+    if THROTTLING_PATTERN.search(output):
+        return "throttled"
+    if TRANSIENT_PATTERN.search(output):
+        return "transient"
+    return None
+
+
+def backoff_delay(attempt: int, output: str = "") -> float:
+    """Seconds to wait before retry number attempt (0-based); honours Retry-After hints"""
+    match = RETRY_AFTER_PATTERN.search(output)
+    if match:
+        return min(float(match.group(1)), BACKOFF_MAX)
+    delay = min(BACKOFF_BASE * (2 ** attempt), BACKOFF_MAX)
+    return delay * random.uniform(0.5, 1.0)
+
+
+class CommandResult:
+    """
+    Outcome of a command run by the executor.
+
+    Attributes:
+        returncode: Exit code; -1 if the command could not be started or timed out
+        stdout: Captured stdout (streamed runs: the last output lines)
+        stderr: Captured stderr (streamed runs: merged into stdout)
+        timed_out: The command was killed after exceeding its timeout
+        attempts: Number of times the command was started
+        failure: classify_failure() of the last failed attempt
+        cancelled: The command was interrupted or never started because its cancel event was set
+    """
+
+    def __init__(self, returncode: int, stdout: str = "", stderr: str = "", timed_out: bool = False,
+                 cancelled: bool = False):
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.timed_out = timed_out
+        self.cancelled = cancelled
+        self.attempts = 1
+        self.failure: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+    @property
+    def output(self) -> str:
+        return self.stdout + self.stderr
+
+
+async def _acquire_slot():
+    """Wait for a process slot without blocking the event loop"""
+    slots = get_process_slots()
+    while not slots.acquire(blocking=False):
+        await asyncio.sleep(0.05)
+
+
+def _send(process: asyncio.subprocess.Process, own_group: bool, sig: int):
+    try:
+        if own_group:
+            os.killpg(process.pid, sig)
+        else:
+            process.send_signal(sig)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+async def _exited(process: asyncio.subprocess.Process):
+    """Wait for the process itself to exit; process.wait() also waits for its pipes to close"""
+    while process.returncode is None:
+        await asyncio.sleep(CANCEL_POLL_INTERVAL)
+
+
+async def _terminate(process: asyncio.subprocess.Process, own_group: bool, graceful: bool):
+    """
+    Stop a process and, when it leads its own group, everything it started.
+
+    Graceful commands get SIGINT and as long as they need: terraform then
+    finishes in-flight operations, writes its state and releases the state
+    lock. Others get SIGTERM and are killed after KILL_GRACE seconds.
+    """
+    if process.returncode is not None:
+        return
+    if graceful:
+        _send(process, own_group, signal.SIGINT)
+        await _exited(process)
+        return
+
+    _send(process, own_group, signal.SIGTERM)
+    try:
+        await asyncio.wait_for(_exited(process), KILL_GRACE)
+    except asyncio.TimeoutError:
+        _send(process, own_group, signal.SIGKILL)
+        await _exited(process)
+
+
+async def _drain(collecting: asyncio.Future, process: asyncio.subprocess.Process, own_group: bool):
+    """
+    Read the rest of a stopped command's output.
+
+    Processes it started may still hold the pipe open after it exited; they
+    get DRAIN_GRACE seconds and are then stopped too.
+    """
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        await asyncio.wait({collecting}, timeout=DRAIN_GRACE)
+        if collecting.done():
+            return
+        _send(process, own_group, sig)
+    await asyncio.wait({collecting}, timeout=DRAIN_GRACE)
+
+
+async def _wait_for_cancel(cancel_event: Optional[threading.Event]):
+    if cancel_event is None:
+        # Nothing can cancel this command; only the timeout or the command itself ends the wait
+        await asyncio.Event().wait()
+    while not cancel_event.is_set():
+        await asyncio.sleep(CANCEL_POLL_INTERVAL)
+
+
+async def _run_once(command: List[str], cwd: Optional[str], env: Optional[dict], timeout: Optional[float],
+                    stream: bool, on_line: Optional[LineCallback], log: Optional[TextIO], tail_lines: int,
+                    interactive: bool, graceful: bool,
+                    cancel_event: Optional[threading.Event]) -> CommandResult:
+    started = time.perf_counter()
+    # Non-interactive commands get their own process group so a timeout or
+    # Ctrl-C also stops the processes they started (providers, credential helpers)
+    own_group = not interactive
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            cwd=cwd,
+            env=env,
+            stdin=None if interactive else asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT if stream else asyncio.subprocess.PIPE,
+            start_new_session=own_group,
+            limit=STREAM_LINE_LIMIT,
+        )
+    except Exception as e:
+        record_subprocess(command, started, -1, 0)
+        return CommandResult(-1, "", str(e))
+
+    output_bytes = 0
+    tail = deque(maxlen=tail_lines)
+
+    async def collect():
+        nonlocal output_bytes
+        if not stream:
+            stdout, stderr = await process.communicate()
+            output_bytes = len(stdout) + len(stderr)
+            return stdout.decode(errors="replace"), stderr.decode(errors="replace")
+
+        while True:
+            raw = await process.stdout.readline()
+            if not raw:
+                break
+            output_bytes += len(raw)
+            line = raw.decode(errors="replace")
+            tail.append(line)
+            if log is not None:
+                log.write(line)
+            if on_line is not None:
+                on_line(line.rstrip("\n"))
+        await process.wait()
+        return "".join(tail), ""
+
+    label = " ".join(command[:2])
+    collecting = asyncio.ensure_future(collect())
+    cancel_watch = asyncio.ensure_future(_wait_for_cancel(cancel_event))
+    try:
+        await asyncio.wait({collecting, cancel_watch}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        if collecting.done():
+            stdout, stderr = collecting.result()
+            record_subprocess(command, started, process.returncode, output_bytes)
+            return CommandResult(process.returncode, stdout, stderr)
+
+        cancelled = cancel_watch.done()
+        await _terminate(process, own_group, graceful)
+        # Keep streaming what the command prints while it shuts down
+        await _drain(collecting, process, own_group)
+        record_subprocess(command, started, process.returncode, output_bytes)
+        if cancelled:
+            return CommandResult(process.returncode if graceful else -1, "".join(tail), f"{label} interrupted",
+                                 cancelled=True)
+        return CommandResult(-1, "".join(tail), f"{label} timed out after {timeout:g}s", timed_out=True)
+    except BaseException:
+        # Cancelled (Ctrl-C) or failed while reading: never leave the process running
+        if graceful and process.returncode is None:
+            click.secho(f"⏳ Waiting for {label} to stop cleanly...", fg="yellow", err=True)
+        await _terminate(process, own_group, graceful)
+        if graceful:
+            await _drain(collecting, process, own_group)
+        raise
+    finally:
+        cancel_watch.cancel()
+        if not collecting.done():
+            collecting.cancel()
+        if log is not None:
+            log.flush()
+
+
+async def run_command_async(command: List[str], cwd: Optional[str] = None, env: Optional[dict] = None,
+                            timeout: Optional[float] = None, retries: int = 0, stream: bool = False,
+                            on_line: Optional[LineCallback] = None, log: Optional[TextIO] = None,
+                            tail_lines: int = 200, interactive: bool = False, graceful: bool = False,
+                            on_retry: Optional[Callable[[str, int, float], None]] = None,
+                            cancel_event: Optional[threading.Event] = None) -> CommandResult:
+    """
+    Run a command in a child process.
+
+    Every run holds one of the process-wide slots (see get_max_processes).
+    Failures classified as throttling or transient, and timeouts, are
+    retried with exponential backoff up to retries times.
+
+    Args:
+        command: Command arguments
+        cwd: Working directory
+        env: Process environment (default: inherited)
+        timeout: Seconds before the command (and its process group) is stopped; None waits forever
+        retries: Retries for throttled, transient or timed-out attempts
+        stream: Merge stderr into stdout and hand each line to on_line/log as it arrives,
+            keeping only the last tail_lines lines
+        on_line: Called with every output line when streaming
+        log: File receiving the full output when streaming
+        tail_lines: Number of trailing lines kept when streaming
+        interactive: Keep stdin and the terminal's process group so the command can prompt
+        graceful: On cancellation or timeout send SIGINT and wait for the command to exit
+            instead of killing it (commands that write state)
+        on_retry: Called with (failure kind, attempt, delay) before each retry
+        cancel_event: Setting it stops the command (see graceful) and keeps retries from starting
+
+    Returns:
+        CommandResult of the last attempt
+    """
+    attempt = 0
+    while True:
+        if cancel_event is not None and cancel_event.is_set():
+            return CommandResult(-1, "", f"{' '.join(command[:2])} not started: cancelled", cancelled=True)
+        await _acquire_slot()
+        try:
+            result = await _run_once(command, cwd, env, timeout, stream, on_line, log, tail_lines, interactive,
+                                     graceful, cancel_event)
+        finally:
+            get_process_slots().release()
+
+        result.attempts = attempt + 1
+        if result.ok or result.cancelled:
+            return result
+        result.failure = "transient" if result.timed_out else classify_failure(result.output)
+        if result.failure is None or attempt >= retries:
+            return result
+
+        delay = backoff_delay(attempt, result.output)
+        if on_retry is not None:
+            on_retry(result.failure, attempt + 1, delay)
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+def retry_notice(label: str) -> Callable[[str, int, float], None]:
+    """on_retry callback printing a warning for label to stderr"""
+    def notice(failure: str, attempt: int, delay: float):
+        click.secho(f"⚠️  {label} {failure}, retrying in {delay:.1f}s (retry {attempt})", fg="yellow", err=True)
+    return notice
+
+
+def run_command(command: List[str], **kwargs) -> CommandResult:
+    """
+    Blocking wrapper around run_command_async (same arguments).
+
+    cancel_event defaults to the calling thread's cancellation_scope.
+    """
+    kwargs.setdefault("cancel_event", current_cancel_event())
+    return asyncio.run(run_command_async(command, **kwargs))
@@ -0,0 +1,215 @@
+"""Run Terraform operations across many directories with bounded concurrency"""
+
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, TextIO, Tuple
+
+import click
+
+from .executor import cancellation_scope
+from .profiler import phase
+
+
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+SKIPPED = "skipped"
+CANCELLED = "cancelled"
+
+STATUS_STYLES = {
+    SUCCEEDED: ("✓", "green"),
+    FAILED: ("✗", "red"),
+    SKIPPED: ("-", "yellow"),
+    CANCELLED: ("-", "yellow"),
+}
+
+# A task runs one directory, writing its output to the log, and returns (success, message)
+FleetTask = Callable[[str, TextIO], Tuple[bool, str]]
+
+
+def normalize_directory(directory: str) -> str:
+    """Canonical form used to match directories given in different spellings"""
+    return os.path.normpath(os.path.abspath(directory))
+
+
+def parse_dependencies(specs: List[str], directories: List[str]) -> Dict[str, Set[str]]:
+    """
+    Parse CHILD=PARENT dependency specs.
+
+    Args:
+        specs: Dependency specs; CHILD runs only after PARENT succeeded
+        directories: Directories taking part in the run
+
+    Returns:
+        Mapping of each normalized directory to the directories it waits for
+
+    Raises:
+        click.ClickException: On malformed specs, unknown directories or cycles
+    """
+    known = {normalize_directory(d) for d in directories}
+    dependencies = {d: set() for d in known}
+
+    for spec in specs:
+        if "=" not in spec:
+            raise click.ClickException(f"Invalid dependency '{spec}', expected CHILD=PARENT")
+        child, parent = (normalize_directory(p.strip()) for p in spec.split("=", 1))
+        for d in (child, parent):
+            if d not in known:
+                raise click.ClickException(f"Dependency refers to a directory not in this run: {d}")
+        dependencies[child].add(parent)
+
+    # Reject cycles up front instead of deadlocking later
+    remaining = {d: set(deps) for d, deps in dependencies.items()}
+    while remaining:
+        ready = [d for d, deps in remaining.items() if not deps]
+        if not ready:
+            raise click.ClickException(f"Dependency cycle between: {', '.join(sorted(remaining))}")
+        for d in ready:
+            del remaining[d]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+    return dependencies
+
+
+def log_file_for(directory: str, log_dir: str) -> Path:
+    """Per-directory log file path, unique for every directory"""
+    name = re.sub(r"[^A-Za-z0-9_.-]+", "_", os.path.relpath(normalize_directory(directory))).strip("_.")
+    return Path(log_dir) / f"{name or 'root'}.log"
+
+
+class FleetRunner:
+    """
+    Run a task in many directories on a thread pool.
+
+    Directories start once every directory they depend on has succeeded; if
+    a dependency fails they are skipped. A failure never stops other
+    directories unless fail_fast is set, in which case directories that have
+    not started yet are cancelled.
+
+    On Ctrl-C, directories that have not started are cancelled and running
+    commands are interrupted through the executor (terraform gets SIGINT and
+    stops cleanly); run() returns once every running directory has finished.
+    """
+
+    def __init__(self, directories: List[str], task: FleetTask, concurrency: int = 4,
+                 dependencies: Optional[Dict[str, Set[str]]] = None, log_dir: str = "./fasttrack-logs",
+                 fail_fast: bool = False):
+        self.directories = list(dict.fromkeys(normalize_directory(d) for d in directories))
+        self.display = {normalize_directory(d): d for d in directories}
+        self.task = task
+        self.concurrency = max(1, concurrency)
+        self.dependencies = dependencies or {d: set() for d in self.directories}
+        self.log_dir = log_dir
+        self.fail_fast = fail_fast
+        self.results: Dict[str, dict] = {
+            d: {"status": None, "duration": 0.0, "message": "", "log_file": str(log_file_for(d, log_dir))}
+            for d in self.directories
+        }
+        self._print_lock = threading.Lock()
+        self._cancel: Optional[threading.Event] = None
+
+    def _started(self, directory: str):
+        with self._print_lock:
+            click.echo(f"  ▶  {self.display[directory]}: started")
+
+    def _run_one(self, directory: str) -> Tuple[bool, str]:
+        log_file = Path(self.results[directory]["log_file"])
+        log_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(log_file, "w") as log, phase(self.display[directory], "directory", directory=directory), \
+                cancellation_scope(self._cancel):
+            try:
+                return self.task(directory, log)
+            except Exception as e:
+                log.write(f"\n{str(e)}\n")
+                return False, str(e)
+
+    def _finish(self, directory: str, status: str, message: str = "", duration: float = 0.0):
+        self.results[directory].update({"status": status, "message": message, "duration": duration})
+        icon, fg = STATUS_STYLES[status]
+        detail = f" ({duration:.1f}s)" if status in (SUCCEEDED, FAILED) else ""
+        suffix = f" - {message}" if message else ""
+        with self._print_lock:
+            click.secho(f"  {icon}  {self.display[directory]}: {status}{detail}{suffix}", fg=fg)
+
+    def run(self) -> Dict[str, dict]:
+        """Run every directory and return per-directory results"""
+        pending = list(self.directories)
+        running = {}
+        started_at = {}
+        # A fresh event per run: an interrupted run must not cancel later ones
+        self._cancel = threading.Event()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            try:
+                self._schedule(pool, pending, running, started_at)
+            except KeyboardInterrupt:
+                with self._print_lock:
+                    click.secho(f"\n⏳ Interrupted: stopping {len(running)} running directories cleanly...",
+                                fg="yellow")
+                self._cancel.set()
+                for d in pending:
+                    self._finish(d, CANCELLED, "interrupted")
+                for future, d in running.items():
+                    success, message = future.result()
+                    status = SUCCEEDED if success else CANCELLED
+                    self._finish(d, status, message or "interrupted", time.perf_counter() - started_at[d])
+
+        return self.results
+
+    def _schedule(self, pool: ThreadPoolExecutor, pending: List[str], running: dict, started_at: dict):
+        """Start directories as their dependencies succeed until all have finished"""
+        stop = False
+        while pending or running:
+            # Skip directories whose dependencies can no longer succeed
+            for d in list(pending):
+                blocked = [p for p in self.dependencies.get(d, ()) if self.results[p]["status"] not in (None, SUCCEEDED)]
+                if blocked:
+                    pending.remove(d)
+                    self._finish(d, SKIPPED, f"dependency {self.display[blocked[0]]} did not succeed")
+                elif stop:
+                    pending.remove(d)
+                    self._finish(d, CANCELLED, "fail-fast")
+
+            # Start everything that is ready, up to the concurrency limit
+            for d in list(pending):
+                if len(running) >= self.concurrency:
+                    break
+                if all(self.results[p]["status"] == SUCCEEDED for p in self.dependencies.get(d, ())):
+                    pending.remove(d)
+                    started_at[d] = time.perf_counter()
+                    self._started(d)
+                    running[pool.submit(self._run_one, d)] = d
+
+            if not running:
+                continue
+
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                d = running.pop(future)
+                success, message = future.result()
+                duration = time.perf_counter() - started_at[d]
+                self._finish(d, SUCCEEDED if success else FAILED, message, duration)
+                if not success and self.fail_fast:
+                    stop = True
+
+
+def print_fleet_summary(title: str, results: Dict[str, dict], display: Dict[str, str], elapsed: float):
+    """Print a summary table of a fleet run"""
+    click.echo(f"\n📊 {title}:")
+
+    width = max([len(display[d]) for d in results] + [9])
+    click.echo(f"  {'DIRECTORY'.ljust(width)}  {'STATUS':<10} {'TIME':>8}  LOG")
+    for d, r in results.items():
+        icon, fg = STATUS_STYLES[r["status"]]
+        timing = f"{r['duration']:7.1f}s" if r["status"] in (SUCCEEDED, FAILED) else " " * 8
+        click.secho(f"  {display[d].ljust(width)}  {r['status']:<10} {timing}  {r['log_file']}", fg=fg)
+
+    counts = {}
+    for r in results.values():
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    summary = ", ".join(f"{counts[s]} {s}" for s in (SUCCEEDED, FAILED, SKIPPED, CANCELLED) if s in counts)
+    click.echo(f"\n  {summary} in {elapsed:.1f}s")
@@ -0,0 +1,311 @@
+"""Machine-readable description of a generated directory"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+
+# Written next to the generation manifest
+GENERATION_FILE = os.path.join(".fasttrack", "generation.json")
+GENERATION_VERSION = 1
+
+# Configuration of the last successful apply, written by apply
+APPLIED_FILE = os.path.join(".fasttrack", "applied.json")
+
+# Expected IDs are recorded with this placeholder; the subscription is only known at run time
+SUBSCRIPTION_PLACEHOLDER = "{subscription_id}"
+
+
+def describe_resources(config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    List the Azure resources a configuration manages or references.
+
+    Args:
+        config: Resolved template rendering configuration
+
+    Returns:
+        One dict per resource with its Terraform address, kind, name, resource
+        group, whether Terraform manages it, and its expected Azure ID (None
+        when Azure assigns the ID)
+    """
+    resource_group = config["resource_group_name"]
+    rg_id = f"/subscriptions/{SUBSCRIPTION_PLACEHOLDER}/resourceGroups/{resource_group}"
+    resources = [{
+        "address": "azurerm_resource_group.main",
+        "kind": "resource_group",
+        "name": resource_group,
+        "resource_group": resource_group,
+        "managed": True,
+        "expected_id": rg_id,
+    }]
+
+    if config.get("create_storage"):
+        storage_account = config["storage_account_name"]
+        existing = config.get("use_existing_storage", False)
+        resources.append({
+            "address": "data.azurerm_storage_account.existing" if existing else "azurerm_storage_account.main",
+            "kind": "storage_account",
+            "name": storage_account,
+            "resource_group": resource_group,
+            "managed": not existing,
+            "expected_id": f"{rg_id}/providers/Microsoft.Storage/storageAccounts/{storage_account}",
+        })
+
+        for index, name in enumerate(config.get("storage_containers") or [], start=1):
+            if config.get("container_mode", "indexed") == "for_each":
+                address = f'azurerm_storage_container.containers["{name}"]'
+            else:
+                address = f"azurerm_storage_container.container_{index}"
+            resources.append({
+                "address": address,
+                "kind": "storage_container",
+                "name": name,
+                "resource_group": resource_group,
+                "storage_account": storage_account,
+                "managed": True,
+                "expected_id": f"https://{storage_account}.blob.core.windows.net/{name}",
+            })
+
+    if config.get("create_app_registration"):
+        app_name = config["azuread_app_name"]
+        for address, kind in (("azuread_application.app", "app_registration"),
+                              ("azuread_service_principal.app", "service_principal")):
+            resources.append({
+                "address": address,
+                "kind": kind,
+                "name": app_name,
+                "resource_group": None,
+                "managed": True,
+                "expected_id": None,
+            })
+
+    return resources
+
+
+def expected_resource_id(resource: Dict[str, Any], subscription_id: str) -> Optional[str]:
+    """Expected Azure ID of a described resource in the given subscription"""
+    expected = resource.get("expected_id")
+    if expected is None:
+        return None
+    return expected.replace(SUBSCRIPTION_PLACEHOLDER, subscription_id)
+
+
+def build_generation_record(config: Dict[str, Any], files: List[str], outputs: List[str],
+                            previous_config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Build the sidecar record written next to the generated files.
+
+    Args:
+        config: Resolved template rendering configuration
+        files: Names of the generated files
+        outputs: Names of the Terraform outputs the configuration declares
+        previous_config: Configuration the directory was generated from before this one
+    """
+    return {
+        "version": GENERATION_VERSION,
+        "config": config,
+        "previous_config": previous_config,
+        "files": files,
+        "resources": describe_resources(config),
+        "outputs": outputs,
+    }
+
+
+def generation_record_text(record: Dict[str, Any]) -> str:
+    """Serialized form of a record; stable so unchanged records are not rewritten"""
+    return json.dumps(record, indent=2, sort_keys=True, default=str) + "\n"
+
+
+def load_generation_record(directory: str) -> Optional[Dict[str, Any]]:
+    """Load the sidecar record of a generated directory, if any"""
+    try:
+        with open(Path(directory) / GENERATION_FILE, 'r') as f:
+            record = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if record.get("version") != GENERATION_VERSION:
+        return None
+    return record
+
+
+def record_applied(directory: str):
+    """Remember the generated configuration as applied; the baseline of targeted plans"""
+    record = load_generation_record(directory)
+    if record is None:
+        return
+    path = Path(directory) / APPLIED_FILE
+    try:
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(generation_record_text({"version": GENERATION_VERSION, "config": record["config"]}))
+    except OSError:
+        pass
+
+
+def record_destroyed(directory: str):
+    """Remember that the resources were destroyed, so no applied configuration is left"""
+    path = Path(directory) / APPLIED_FILE
+    try:
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(generation_record_text({"version": GENERATION_VERSION, "config": None, "destroyed": True}))
+    except OSError:
+        pass
+
+
+def load_applied_record(directory: str) -> Optional[Dict[str, Any]]:
+    """
+    Record of the last successful apply or destroy, if any.
+
+    Returns:
+        {"config": applied configuration} after an apply, or
+        {"config": None, "destroyed": True} after a destroy
+    """
+    try:
+        with open(Path(directory) / APPLIED_FILE, 'r') as f:
+            applied = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if applied.get("version") != GENERATION_VERSION:
+        return None
+    return applied
+
+
+def _load_hcl(path: Path) -> Optional[Dict[str, Any]]:
+    """Parse an HCL file with python-hcl2 if it is installed"""
+    try:
+        import hcl2
+    except ImportError:
+        return None
+    with open(path, 'r') as f:
+        return hcl2.load(f)
+
+
+def _unquote(value: Any) -> Any:
+    """Strip the quotes newer python-hcl2 versions keep around strings and block labels"""
+    if isinstance(value, str) and len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1]
+    if isinstance(value, list):
+        return [_unquote(v) for v in value]
+    return value
+
+
+def _hcl2_blocks(parsed: Dict[str, Any], block_type: str, labels: int = 1) -> Dict[str, Any]:
+    """Flatten python-hcl2's list of single-key dicts for one block type, keyed by unquoted labels"""
+    def unquote_labels(block: Dict[str, Any], depth: int) -> Dict[str, Any]:
+        if depth == 0:
+            return block
+        return {_unquote(k): unquote_labels(v, depth - 1) for k, v in block.items()}
+
+    blocks = {}
+    for entry in parsed.get(block_type, []):
+        for key, value in unquote_labels(entry, labels).items():
+            if labels > 1:
+                # Several resources of one type arrive as separate entries
+                blocks.setdefault(key, {}).update(value)
+            else:
+                blocks[key] = value
+    return blocks
+
+
+def _config_from_hcl2(variables: Dict[str, Any], main: Dict[str, Any]) -> Dict[str, Any]:
+    defaults = {name: _unquote(body.get("default")) for name, body in _hcl2_blocks(variables, "variable").items()}
+    resources = _hcl2_blocks(main, "resource", labels=2)
+    data = _hcl2_blocks(main, "data", labels=2)
+
+    containers = resources.get("azurerm_storage_container", {})
+    if "containers" in containers:
+        container_mode = "for_each"
+        storage_containers = list(defaults.get("storage_containers") or [])
+    else:
+        container_mode = "indexed"
+        numbered = sorted(
+            (int(key.split("_")[1]), _unquote(body.get("name"))) for key, body in containers.items()
+            if re.fullmatch(r"container_\d+", key)
+        )
+        storage_containers = [name for _, name in numbered]
+
+    return {
+        "resource_group_name": defaults.get("resource_group_name"),
+        "storage_account_name": defaults.get("storage_account_name"),
+        "create_storage": bool(defaults.get("storage_account_name")),
+        "use_existing_storage": "existing" in data.get("azurerm_storage_account", {}),
+        "container_mode": container_mode,
+        "storage_containers": storage_containers,
+        "create_app_registration": "app" in resources.get("azuread_application", {}),
+        "azuread_app_name": defaults.get("azuread_app_name"),
+    }
+
+
+def _variable_default(content: str, name: str) -> Optional[str]:
+    match = re.search(rf'variable\s+"{name}"\s*\{{[^}}]*?default\s+=\s+"([^"]*)"', content)
+    return match.group(1) if match else None
+
+
+def _config_from_text(variables: str, main: str) -> Dict[str, Any]:
+    """Minimal parse of the HCL the templates render, used without python-hcl2"""
+    config = {
+        "resource_group_name": _variable_default(variables, "resource_group_name"),
+        "storage_account_name": _variable_default(variables, "storage_account_name"),
+        "use_existing_storage": re.search(r'data\s+"azurerm_storage_account"\s+"existing"', main) is not None,
+        "container_mode": "indexed",
+        "storage_containers": [],
+        "create_app_registration": re.search(r'resource\s+"azuread_application"\s+"app"', main) is not None,
+        "azuread_app_name": _variable_default(variables, "azuread_app_name"),
+    }
+    config["create_storage"] = bool(config["storage_account_name"])
+
+    if re.search(r'resource\s+"azurerm_storage_container"\s+"containers"', main):
+        config["container_mode"] = "for_each"
+        match = re.search(r'variable\s+"storage_containers"\s*\{[^}]*?default\s+=\s+\[(.*?)\]', variables, re.DOTALL)
+        if match:
+            config["storage_containers"] = re.findall(r'"([^"]*)"', match.group(1))
+    else:
+        numbered = re.findall(
+            r'resource\s+"azurerm_storage_container"\s+"container_(\d+)"\s*\{\s*name\s+=\s+"([^"]+)"', main
+        )
+        config["storage_containers"] = [name for _, name in sorted(numbered, key=lambda m: int(m[0]))]
+
+    return config
+
+
+def parse_generated_config(directory: str) -> Dict[str, Any]:
+    """
+    Recover the resource-related configuration from a directory's HCL files.
+
+    Used for directories generated before the sidecar existed. Parses with
+    python-hcl2 when installed and falls back to a minimal parser of the HCL
+    the templates render.
+
+    Raises:
+        ValueError: If variables.tf is missing or has no resource group
+    """
+    vars_file = Path(directory) / "variables.tf"
+    main_file = Path(directory) / "main.tf"
+    if not vars_file.exists():
+        raise ValueError("variables.tf not found")
+
+    variables = _load_hcl(vars_file)
+    if variables is not None:
+        main = _load_hcl(main_file) if main_file.exists() else {}
+        config = _config_from_hcl2(variables, main)
+    else:
+        main = main_file.read_text() if main_file.exists() else ""
+        config = _config_from_text(vars_file.read_text(), main)
+
+    if not config["resource_group_name"]:
+        raise ValueError("Could not find resource_group_name in variables.tf")
+    return config
+
+
+def load_generated_resources(directory: str) -> List[Dict[str, Any]]:
+    """
+    Resources of a generated directory, from the sidecar or by parsing its HCL.
+
+    Raises:
+        ValueError: If there is no sidecar and the HCL cannot be parsed
+    """
+    record = load_generation_record(directory)
+    if record is not None:
+        return record["resources"]
+    return describe_resources(parse_generated_config(directory))
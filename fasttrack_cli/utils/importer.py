@@ -0,0 +1,108 @@
+"""Discover existing Azure resources and adopt them with Terraform import blocks"""
+
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+
+from .azure_helper import (
+    resources_exist,
+    resource_key,
+    find_app_registration,
+    find_service_principal,
+    list_storage_containers
+)
+
+
+IMPORTS_FILE = "imports.tf"
+
+# (Terraform resource address, Azure resource ID) for one resource to import
+ImportTarget = Tuple[str, str]
+
+
+def discover_imports(resources: List[Dict[str, Any]]) -> Tuple[List[ImportTarget], List[str]]:
+    """
+    Find every managed resource that already exists in Azure.
+
+    Resource group and storage account are resolved with one batched lookup
+    and all containers with a single listing of the storage account.
+
+    Args:
+        resources: Resources of the directory, from load_generated_resources()
+
+    Returns:
+        Tuple of (resources to import, resources that do not exist yet)
+    """
+    keys = {
+        r["address"]: resource_key(r["kind"], r["name"], r["resource_group"])
+        for r in resources if r["kind"] in ("resource_group", "storage_account")
+    }
+    existing = resources_exist(list(keys.values())) if keys else {}
+
+    imports = []
+    missing = []
+    containers_by_account = {}
+    apps = {}
+
+    for r in resources:
+        kind = r["kind"]
+        if kind in ("resource_group", "storage_account"):
+            resource_id = existing[keys[r["address"]]]
+            if not resource_id:
+                missing.append(f"{kind.replace('_', ' ')} {r['name']}")
+            elif r["managed"]:
+                # An existing account referenced through a data source is never imported
+                imports.append((r["address"], resource_id))
+
+        elif kind == "storage_container":
+            account = r["storage_account"]
+            account_key = resource_key("storage_account", account, r["resource_group"])
+            if account not in containers_by_account:
+                # Containers of a missing account cannot exist; otherwise list them all at once
+                listed = list_storage_containers(account, r["resource_group"]) if existing.get(account_key) else None
+                containers_by_account[account] = set(listed or [])
+            if r["name"] in containers_by_account[account]:
+                imports.append((r["address"], r["expected_id"]))
+            else:
+                missing.append(f"container {r['name']}")
+
+        elif kind == "app_registration":
+            apps[r["name"]] = find_app_registration(r["name"])
+            if apps[r["name"]]:
+                imports.append((r["address"], f"/applications/{apps[r['name']]['id']}"))
+            else:
+                missing.append(f"app registration {r['name']}")
+
+        elif kind == "service_principal":
+            app = apps.get(r["name"]) or find_app_registration(r["name"])
+            sp_id = find_service_principal(app["appId"]) if app else None
+            if sp_id:
+                imports.append((r["address"], sp_id))
+            else:
+                missing.append(f"service principal for {r['name']}")
+
+    return imports, missing
+
+
+def write_imports_file(directory: str, imports: List[ImportTarget]) -> Optional[Path]:
+    """
+    Write imports.tf with one import block per resource.
+
+    A stale imports.tf is removed when there is nothing to import.
+
+    Returns:
+        Path of the written file, or None if nothing needed importing
+    """
+    path = Path(directory) / IMPORTS_FILE
+    if not imports:
+        if path.exists():
+            path.unlink()
+        return None
+
+    blocks = [
+        "# Generated by `fasttrack init-import`: adopts existing Azure resources on the next plan/apply.\n"
+        "# Import blocks are idempotent; delete this file once the import has been applied."
+    ]
+    for address, resource_id in imports:
+        blocks.append(f'import {{\n  to = {address}\n  id = "{resource_id}"\n}}')
+
+    path.write_text("\n\n".join(blocks) + "\n")
+    return path
@@ -0,0 +1,235 @@
+"""Terraform -parallelism sizing and backoff on ARM throttling"""
+
+import json
+import math
+import re
+import threading
+import time
+from typing import Optional
+
+from .cache import get_cache_dir, cache_enabled, write_json_atomic
+from .executor import THROTTLING_PATTERN, LineCallback, backoff_delay, command_retries, cancellation_requested
+from .generation import load_generated_resources
+
+
+# Terraform's own default
+DEFAULT_PARALLELISM = 10
+MIN_PARALLELISM = 2
+MAX_PARALLELISM = 50
+
+# One concurrent operation per this many resources above the default
+RESOURCES_PER_OPERATION = 8
+
+# Concurrent ARM operations a fleet run spreads across its directories
+FLEET_BUDGET = 64
+
+# Learned ceiling after throttling; ARM refills its request buckets within the hour
+CEILING_FILE = "parallelism.json"
+CEILING_TTL = 3600
+
+# Ceiling raise after a run without throttling
+CEILING_STEP = 2
+
+PLAN_SUMMARY_PATTERN = re.compile(r"Plan: (\d+) to add, (\d+) to change, (\d+) to destroy")
+
+ANSI_PATTERN = re.compile(r"\x1b\[[0-9;]*m")
+
+# First line of a diagnostic, boxed ("│ Error: ...") or plain
+DIAGNOSTIC_PATTERN = re.compile(r"^(?:│\s*)?(?:Error|Warning):")
+
+# Source snippet and location lines inside a diagnostic box, which quote configuration
+DIAGNOSTIC_CONTEXT_PATTERN = re.compile(r"^(?:\d+:|with\s|on\s)")
+
+# Throttling as reported by the Azure SDKs, recognized outside diagnostic blocks too
+ARM_THROTTLING_PATTERN = re.compile(r"StatusCode[=:]\s*429\b|\bRetryableError\b")
+
+_controller: Optional["ThrottleController"] = None
+_controller_lock = threading.Lock()
+
+
+def auto_parallelism(resource_count: int, concurrency: int = 1) -> int:
+    """
+    Parallelism for a run touching resource_count resources.
+
+    Small configurations keep Terraform's default; large ones get one
+    operation per RESOURCES_PER_OPERATION resources up to MAX_PARALLELISM.
+    Fleet runs split FLEET_BUDGET between the directories running at once.
+    """
+    value = max(DEFAULT_PARALLELISM, min(MAX_PARALLELISM, math.ceil(resource_count / RESOURCES_PER_OPERATION)))
+    if concurrency > 1:
+        value = min(value, max(MIN_PARALLELISM, FLEET_BUDGET // concurrency))
+    return value
+
+
+def resource_count(directory: str) -> int:
+    """Resources a generated directory manages, from its sidecar or HCL; 0 if unknown"""
+    try:
+        resources = load_generated_resources(directory)
+    except (OSError, ValueError):
+        return 0
+    count = sum(1 for r in resources if r["managed"])
+    if any(r["kind"] == "app_registration" for r in resources):
+        # Client secret and its rotation timer
+        count += 2
+    return count
+
+
+class ThrottleController:
+    """
+    Process-wide parallelism ceiling, lowered when ARM throttles.
+
+    Throttling halves the ceiling; every run without throttling raises it by
+    CEILING_STEP until it no longer limits anything. The ceiling is kept in
+    the cache directory for CEILING_TTL seconds so the next command starts
+    from it too.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.ceiling: Optional[int] = self._load()
+
+    def _path(self):
+        return get_cache_dir() / CEILING_FILE
+
+    def _load(self) -> Optional[int]:
+        if not cache_enabled():
+            return None
+        try:
+            with open(self._path(), 'r') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if saved.get("expires", 0) < time.time():
+            return None
+        return saved.get("ceiling")
+
+    def _save(self):
+        if not cache_enabled():
+            return
+        try:
+            write_json_atomic(self._path(), {"ceiling": self.ceiling, "expires": time.time() + CEILING_TTL}, 0o644)
+        except OSError:
+            pass
+
+    def limit(self, parallelism: int) -> int:
+        """parallelism capped by the current ceiling"""
+        with self._lock:
+            return parallelism if self.ceiling is None else min(parallelism, self.ceiling)
+
+    def throttled(self, parallelism: int) -> int:
+        """Record throttling of a run with parallelism; returns the lowered ceiling"""
+        with self._lock:
+            lowered = max(MIN_PARALLELISM, parallelism // 2)
+            self.ceiling = lowered if self.ceiling is None else min(self.ceiling, lowered)
+            self._save()
+            return self.ceiling
+
+    def succeeded(self, parallelism: int):
+        """Record a run with parallelism that was not throttled"""
+        with self._lock:
+            if self.ceiling is None or parallelism < self.ceiling:
+                return
+            self.ceiling += CEILING_STEP
+            if self.ceiling >= MAX_PARALLELISM:
+                self.ceiling = None
+            self._save()
+
+
+def get_throttle_controller() -> ThrottleController:
+    """Throttle controller shared by every thread of this process"""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = ThrottleController()
+        return _controller
+
+
+class OutputWatcher:
+    """
+    Line callback watching streamed terraform output.
+
+    Counts throttling errors and remembers the plan summary, passing every
+    line on to on_line. Only diagnostics (Error:/Warning: blocks) and the
+    Azure SDKs' StatusCode=429/RetryableError forms count; plan bodies and
+    the plan summary quote configuration values such as "throttle-logs".
+
+    Attributes:
+        throttled: Number of lines reporting throttling
+        last_throttle: The last such line (may carry a Retry-After hint)
+        planned_changes: Resources the last plan adds, changes or destroys; None before a plan
+    """
+
+    def __init__(self, on_line: Optional[LineCallback] = None):
+        self.on_line = on_line
+        self.throttled = 0
+        self.last_throttle = ""
+        self.planned_changes: Optional[int] = None
+        self._in_box = False
+
+    def _is_throttling(self, text: str) -> bool:
+        if DIAGNOSTIC_PATTERN.match(text):
+            self._in_box = text.startswith("│")
+            return THROTTLING_PATTERN.search(text) is not None
+        if self._in_box and text.startswith("│"):
+            detail = text[1:].strip()
+            return not DIAGNOSTIC_CONTEXT_PATTERN.match(detail) and THROTTLING_PATTERN.search(detail) is not None
+        self._in_box = False
+        # Indented lines are plan bodies and snippets
+        return not text[:1].isspace() and ARM_THROTTLING_PATTERN.search(text) is not None
+
+    def __call__(self, line: str):
+        text = ANSI_PATTERN.sub("", line)
+        match = PLAN_SUMMARY_PATTERN.match(text)
+        if match:
+            self.planned_changes = sum(int(n) for n in match.groups())
+        elif self._is_throttling(text):
+            self.throttled += 1
+            self.last_throttle = text
+        if self.on_line is not None:
+            self.on_line(line)
+
+
+def choose_parallelism(directory: str, requested: Optional[int] = None, concurrency: int = 1,
+                       changes: Optional[int] = None) -> int:
+    """
+    Parallelism for a plan, apply or destroy in directory.
+
+    Args:
+        directory: Terraform configuration directory
+        requested: Explicit --parallelism, used as-is
+        concurrency: Directories running at the same time
+        changes: Changes in the saved plan; defaults to the resource count of the configuration
+    """
+    if requested:
+        return requested
+    count = changes if changes is not None else resource_count(directory)
+    return get_throttle_controller().limit(auto_parallelism(count, concurrency))
+
+
+def record_outcome(watcher: OutputWatcher, parallelism: int):
+    """Feed a successful run into the throttle controller"""
+    controller = get_throttle_controller()
+    if watcher.throttled:
+        # The provider's own retries got through this time; go easier next time
+        controller.throttled(parallelism)
+    else:
+        controller.succeeded(parallelism)
+
+
+def throttle_backoff(watcher: OutputWatcher, parallelism: int, attempt: int) -> Optional[tuple[int, float]]:
+    """
+    Retry plan after a failed run.
+
+    Args:
+        watcher: Watcher of the failed run
+        parallelism: Parallelism of the failed run
+        attempt: Retries made so far
+
+    Returns:
+        (lowered parallelism, seconds to wait), or None if the run was not
+        throttled, retries ($FASTTRACK_RETRIES) are used up or the command is
+        being cancelled
+    """
+    if not watcher.throttled or attempt >= command_retries() or cancellation_requested():
+        return None
+    return get_throttle_controller().throttled(parallelism), backoff_delay(attempt, watcher.last_throttle)
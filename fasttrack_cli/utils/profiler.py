@@ -0,0 +1,197 @@
+"""Phase and subprocess timing with Chrome trace-event export"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, List, Tuple
+
+import click
+
+
+# Slowest subprocesses listed in the summary
+SUMMARY_SUBPROCESSES = 15
+
+_profiler: Optional["Profiler"] = None
+
+
+def profiling_enabled() -> bool:
+    """Profiling is on with --profile or $FASTTRACK_PROFILE"""
+    return os.environ.get("FASTTRACK_PROFILE", "") not in ("", "0", "false")
+
+
+def set_profiling_enabled(enabled: bool):
+    """
+    Enable or disable profiling for this process and the processes it spawns.
+
+    The setting travels through the environment so batch worker processes
+    record their own events.
+    """
+    if enabled:
+        os.environ["FASTTRACK_PROFILE"] = "1"
+    else:
+        os.environ.pop("FASTTRACK_PROFILE", None)
+
+
+class Profiler:
+    """
+    Collects timed events in Chrome trace-event format.
+
+    Timestamps are wall-clock microseconds so events recorded by worker
+    processes line up with the parent's when merged; durations are measured
+    with the monotonic clock.
+    """
+
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._current: Optional[Tuple[str, float, float]] = None
+
+    def _add(self, name: str, category: str, start: float, duration: float, args: Dict[str, Any]):
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": int(start * 1_000_000),
+            "dur": int(duration * 1_000_000),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": args,
+        }
+        with self._lock:
+            self.events.append(event)
+
+    @contextmanager
+    def phase(self, name: str, category: str = "phase", **args):
+        """Time the enclosed block as one event"""
+        start = time.time()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add(name, category, start, time.perf_counter() - started, args)
+
+    def start_phase(self, name: str):
+        """End the current sequential phase, if any, and start the next one"""
+        self.end_phase()
+        self._current = (name, time.time(), time.perf_counter())
+
+    def end_phase(self):
+        """End the current sequential phase"""
+        if self._current is not None:
+            name, start, started = self._current
+            self._current = None
+            self._add(name, "phase", start, time.perf_counter() - started, {})
+
+    def record_subprocess(self, command: List[str], started: float, exit_code: int, output_bytes: int,
+                          category: str = "subprocess"):
+        """
+        Record a finished command.
+
+        Args:
+            command: Command arguments
+            started: time.perf_counter() when the command started
+            exit_code: Exit code (-1 if it could not be started)
+            output_bytes: Size of the captured output
+            category: Event category
+        """
+        duration = time.perf_counter() - started
+        self._add(" ".join(command[:3]), category, time.time() - duration, duration, {
+            "command": " ".join(command),
+            "exit_code": exit_code,
+            "output_bytes": output_bytes,
+        })
+
+    def add_events(self, events: List[Dict[str, Any]]):
+        """Merge events recorded elsewhere, e.g. by a worker process"""
+        with self._lock:
+            self.events.extend(events)
+
+    def take_events(self) -> List[Dict[str, Any]]:
+        """Remove and return every recorded event"""
+        with self._lock:
+            events, self.events = self.events, []
+        return events
+
+    def trace(self) -> Dict[str, Any]:
+        """Trace-event document for chrome://tracing or Perfetto"""
+        self.end_phase()
+        with self._lock:
+            events = sorted(self.events, key=lambda e: e["ts"])
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_trace(self, path: str):
+        """Write the trace-event JSON file"""
+        with open(path, 'w') as f:
+            json.dump(self.trace(), f)
+
+    def print_summary(self):
+        """Print phase totals and the slowest commands to stderr"""
+        self.end_phase()
+        with self._lock:
+            events = list(self.events)
+        if not events:
+            return
+
+        phases: Dict[str, List[float]] = {}
+        for event in events:
+            if event["cat"] == "phase":
+                phases.setdefault(event["name"], []).append(event["dur"] / 1_000_000)
+
+        click.echo("\n⏱️  Profile:", err=True)
+        if phases:
+            width = max(len(name) for name in phases)
+            click.echo(f"  {'PHASE'.ljust(width)}  {'COUNT':>5} {'TOTAL':>9} {'MAX':>9}", err=True)
+            for name, durations in sorted(phases.items(), key=lambda p: -sum(p[1])):
+                click.echo(f"  {name.ljust(width)}  {len(durations):>5} {sum(durations):8.2f}s "
+                           f"{max(durations):8.2f}s", err=True)
+
+        commands = sorted((e for e in events if e["cat"] in ("subprocess", "az")), key=lambda e: -e["dur"])
+        if commands:
+            click.echo(f"\n  {'COMMAND':<50} {'TIME':>9} {'EXIT':>5} {'OUTPUT':>9}", err=True)
+            for event in commands[:SUMMARY_SUBPROCESSES]:
+                command = event["args"]["command"]
+                if len(command) > 50:
+                    command = command[:47] + "..."
+                click.echo(f"  {command:<50} {event['dur'] / 1_000_000:8.2f}s {event['args']['exit_code']:>5} "
+                           f"{event['args']['output_bytes'] / 1024:7.1f}KB", err=True)
+            if len(commands) > SUMMARY_SUBPROCESSES:
+                rest = sum(e["dur"] for e in commands[SUMMARY_SUBPROCESSES:]) / 1_000_000
+                click.echo(f"  ... {len(commands) - SUMMARY_SUBPROCESSES} more commands ({rest:.2f}s)", err=True)
+
+
+def get_profiler() -> Profiler:
+    """Profiler shared by the whole process"""
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler()
+    return _profiler
+
+
+@contextmanager
+def phase(name: str, category: str = "phase", **args):
+    """Time the enclosed block when profiling is enabled; only "phase" events are summarized"""
+    if not profiling_enabled():
+        yield
+        return
+    with get_profiler().phase(name, category, **args):
+        yield
+
+
+def start_phase(name: str):
+    """
+    Start the next step of a command when profiling is enabled.
+
+    Steps run one after another, so each call ends the previous step; the
+    last one ends when the summary is printed.
+    """
+    if profiling_enabled():
+        get_profiler().start_phase(name)
+
+
+def record_subprocess(command: List[str], started: float, exit_code: int, output_bytes: int,
+                      category: str = "subprocess"):
+    """Record a finished command when profiling is enabled (see Profiler.record_subprocess)"""
+    if profiling_enabled():
+        get_profiler().record_subprocess(command, started, exit_code, output_bytes, category)
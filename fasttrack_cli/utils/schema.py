@@ -0,0 +1,344 @@
+"""Declarative configuration schema, compiled once and applied to many configs"""
+
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Callable, Tuple, Union
+
+from .config_loader import load_layered_config, merge_file_config, build_config
+
+
+# (field path, message) for one validation problem
+SchemaError = Tuple[str, str]
+
+# A compiled check receives the field value and the whole document
+Check = Callable[[Any, Dict[str, Any]], Optional[str]]
+
+STORAGE_ACCOUNT_PATTERN = r"^[a-z0-9]+$"
+CONTAINER_NAME_PATTERN = r"^[a-z0-9](?!.*--)[a-z0-9-]{1,61}[a-z0-9]$"
+
+
+class Field:
+    """
+    Declarative description of one configuration field.
+
+    Args:
+        type: Accepted Python type(s); None values are treated as unset
+        required: The field must be set
+        required_if: Key of another field; the field must be set when that one is truthy
+        choices: Allowed values
+        pattern: Regular expression string values must match
+        pattern_message: Error message when the pattern does not match
+        min_length: Minimum string length
+        max_length: Maximum string length
+        minimum: Minimum numeric value
+        items: Field describing every list item
+        unique: List items must be unique
+        fields: Schema of a nested mapping
+        requires: {key: value} other fields must hold when this field is truthy
+        source: Path of the field in YAML config files, for error reporting
+    """
+
+    def __init__(self, type: Union[type, Tuple[type, ...], None] = None, required: bool = False,
+                 required_if: Optional[str] = None, choices: Optional[Tuple[Any, ...]] = None,
+                 pattern: Optional[str] = None, pattern_message: Optional[str] = None,
+                 min_length: Optional[int] = None, max_length: Optional[int] = None,
+                 minimum: Optional[float] = None, items: Optional["Field"] = None, unique: bool = False,
+                 fields: Optional[Dict[str, "Field"]] = None, requires: Optional[Dict[str, Any]] = None,
+                 source: Optional[str] = None):
+        self.type = type
+        self.required = required
+        self.required_if = required_if
+        self.choices = choices
+        self.pattern = pattern
+        self.pattern_message = pattern_message
+        self.min_length = min_length
+        self.max_length = max_length
+        self.minimum = minimum
+        self.items = items
+        self.unique = unique
+        self.fields = fields
+        self.requires = requires
+        self.source = source
+
+
+# Keys accepted in YAML configuration files
+FILE_SCHEMA = {
+    "project_name": Field(str),
+    "resource_group": Field(str),
+    "location": Field(str),
+    "environment": Field(str),
+    "app_name": Field(str),
+    "redirect_url": Field(str),
+    "storage_account": Field(str),
+    "use_existing_storage": Field(bool),
+    "containers": Field(list, items=Field(str)),
+    "container_mode": Field(str, choices=("indexed", "for_each")),
+    "migrate_indexed_containers": Field(bool),
+    "storage_tier": Field(str, choices=("Standard", "Premium")),
+    "storage_replication": Field(str, choices=("LRS", "GRS", "RAGRS", "ZRS")),
+    "secret_rotation_months": Field(int, minimum=1),
+    "remote_state": Field(dict, fields={
+        "storage_account": Field(str),
+        "container": Field(str),
+        "key": Field(str),
+    }),
+    "extends": Field((str, list), items=Field(str)),
+    # Documented in older config examples; generate takes these from the command line
+    "output_dir": Field(str),
+    "enable_remote_state": Field(bool),
+    "state_storage_account": Field(str),
+    "state_container": Field(str),
+    "state_key": Field(str),
+    "state_resource_group": Field(str),
+    "skip_validation": Field(bool),
+    "dry_run": Field(bool),
+}
+
+# Rules for the resolved configuration passed to the templates
+CONFIG_SCHEMA = {
+    "project_name": Field(str, required=True),
+    "resource_group_name": Field(str, required=True, source="resource_group"),
+    "location": Field(str, required=True),
+    "environment": Field(str, required=True),
+    "storage_account_name": Field(
+        str, required_if="create_storage", min_length=3, max_length=24,
+        pattern=STORAGE_ACCOUNT_PATTERN, pattern_message="must be lowercase alphanumeric only",
+        source="storage_account"
+    ),
+    "storage_containers": Field(
+        list, unique=True, source="containers",
+        items=Field(str, pattern=CONTAINER_NAME_PATTERN,
+                    pattern_message="must be 3-63 lowercase letters, digits or single hyphens")
+    ),
+    "container_mode": Field(str, choices=("indexed", "for_each")),
+    "migrate_indexed_containers": Field(bool, requires={"container_mode": "for_each"}),
+    "azuread_app_name": Field(str, required_if="create_app_registration", source="app_name"),
+    "redirect_url": Field(str, required_if="create_app_registration"),
+    "state_storage_account": Field(str, required_if="enable_remote_state", source="remote_state.storage_account"),
+    "state_container": Field(str, required_if="enable_remote_state", source="remote_state.container"),
+    "state_key": Field(str, required_if="enable_remote_state", source="remote_state.key"),
+}
+
+
+def _as_tuple(types: Union[type, Tuple[type, ...]]) -> Tuple[type, ...]:
+    return types if isinstance(types, tuple) else (types,)
+
+
+def _type_name(types: Union[type, Tuple[type, ...]]) -> str:
+    names = {str: "string", bool: "boolean", int: "integer", list: "list", dict: "mapping"}
+    return " or ".join(names.get(t, t.__name__) for t in _as_tuple(types))
+
+
+def _compile_field(field: Field) -> List[Check]:
+    """Turn a Field into the checks that apply to a set value"""
+    checks = []
+
+    if field.type is not None:
+        expected = _as_tuple(field.type)
+        # bool is a subclass of int, but `true` is never a valid month count
+        strict_bool = bool not in expected
+
+        def check_type(value, doc):
+            if not isinstance(value, expected) or (strict_bool and isinstance(value, bool)):
+                name = _type_name(expected)
+                return f"must be {'an' if name[0] in 'aeiou' else 'a'} {name}"
+        checks.append(check_type)
+
+    if field.choices is not None:
+        choices = field.choices
+        checks.append(lambda value, doc: None if value in choices else f"must be one of: {', '.join(map(str, choices))}")
+
+    if field.min_length is not None or field.max_length is not None:
+        low, high = field.min_length or 0, field.max_length
+
+        def check_length(value, doc):
+            if len(value) < low or (high is not None and len(value) > high):
+                return f"must be {low}-{high} characters" if high is not None else f"must be at least {low} characters"
+        checks.append(check_length)
+
+    if field.pattern is not None:
+        regex = re.compile(field.pattern)
+        message = field.pattern_message or f"must match {field.pattern}"
+        checks.append(lambda value, doc: None if regex.match(value) else message)
+
+    if field.minimum is not None:
+        minimum = field.minimum
+        checks.append(lambda value, doc: None if value >= minimum else f"must be at least {minimum}")
+
+    if field.unique:
+        def check_unique(value, doc):
+            duplicates = sorted((v for v, n in Counter(value).items() if n > 1), key=str)
+            if duplicates:
+                return f"duplicate entries: {', '.join(map(str, duplicates))}"
+        checks.append(check_unique)
+
+    if field.requires:
+        requires = field.requires
+
+        def check_requires(value, doc):
+            for key, expected_value in requires.items():
+                if value and doc.get(key) != expected_value:
+                    return f"requires {key} '{expected_value}'"
+        checks.append(check_requires)
+
+    return checks
+
+
+class CompiledSchema:
+    """
+    A schema compiled into plain check functions.
+
+    Compiling resolves regexes, choices and nested schemas once, so
+    validating thousands of documents only runs the checks.
+
+    Args:
+        schema: Mapping of field name to Field
+        allow_unknown: Accept keys the schema does not describe
+        use_source_paths: Report errors under each Field's source path
+    """
+
+    def __init__(self, schema: Dict[str, Field], allow_unknown: bool = True, use_source_paths: bool = False):
+        self.allow_unknown = allow_unknown
+        self.known = set(schema)
+        self.fields = []
+        for name, field in schema.items():
+            path = (field.source or name) if use_source_paths else name
+            nested = CompiledSchema(field.fields, allow_unknown) if field.fields else None
+            items = _compile_field(field.items) if field.items else None
+            self.fields.append((name, path, field, _compile_field(field), items, nested))
+
+    def unknown_fields(self, doc: Any, prefix: str = "") -> List[SchemaError]:
+        """Keys of doc, and of its nested mappings, that the schema does not describe"""
+        if not isinstance(doc, dict):
+            return []
+        unknown = [(f"{prefix}{key}", "unknown field") for key in doc if key not in self.known]
+        for name, path, field, checks, items, nested in self.fields:
+            if nested:
+                unknown.extend(nested.unknown_fields(doc.get(name), f"{prefix}{path}."))
+        return unknown
+
+    def validate(self, doc: Any, prefix: str = "") -> List[SchemaError]:
+        """Validate one document and return every error found"""
+        if not isinstance(doc, dict):
+            return [(prefix or "<root>", "must be a mapping")]
+
+        errors = [] if self.allow_unknown else self.unknown_fields(doc, prefix)
+
+        for name, path, field, checks, items, nested in self.fields:
+            full_path = f"{prefix}{path}"
+            value = doc.get(name)
+
+            if value is None or value == "":
+                if field.required or (field.required_if and doc.get(field.required_if)):
+                    reason = f" when {field.required_if} is set" if field.required_if else ""
+                    errors.append((full_path, f"is required{reason}"))
+                continue
+
+            field_errors = [message for message in (check(value, doc) for check in checks) if message]
+            errors.extend((full_path, message) for message in field_errors)
+            if field_errors:
+                continue
+
+            if items and isinstance(value, list):
+                for index, item in enumerate(value):
+                    for check in items:
+                        message = check(item, doc)
+                        if message:
+                            errors.append((f"{full_path}[{index}]", message))
+                            break
+            if nested:
+                errors.extend(nested.validate(value, f"{full_path}."))
+
+        return errors
+
+
+_file_schema: Optional[CompiledSchema] = None
+_config_schema: Optional[CompiledSchema] = None
+_source_config_schema: Optional[CompiledSchema] = None
+
+
+def file_schema() -> CompiledSchema:
+    """
+    Compiled schema for YAML configuration files.
+
+    Unknown keys are not errors (see unknown_file_fields); a key added in a
+    newer release or a typo in an optional one is reported as a warning.
+    """
+    global _file_schema
+    if _file_schema is None:
+        _file_schema = CompiledSchema(FILE_SCHEMA)
+    return _file_schema
+
+
+def unknown_file_fields(file_config: Any) -> List[SchemaError]:
+    """Keys of a parsed YAML configuration file that generate ignores"""
+    return file_schema().unknown_fields(file_config)
+
+
+def config_schema(use_source_paths: bool = False) -> CompiledSchema:
+    """Compiled schema for resolved configurations"""
+    global _config_schema, _source_config_schema
+    if use_source_paths:
+        if _source_config_schema is None:
+            _source_config_schema = CompiledSchema(CONFIG_SCHEMA, use_source_paths=True)
+        return _source_config_schema
+    if _config_schema is None:
+        _config_schema = CompiledSchema(CONFIG_SCHEMA)
+    return _config_schema
+
+
+def validate_resolved_config(config: Dict[str, Any]) -> List[SchemaError]:
+    """Validate a resolved configuration (the dict build_config() returns)"""
+    return config_schema().validate(config)
+
+
+def validate_file_config(file_config: Any, strict: bool = False) -> List[SchemaError]:
+    """
+    Validate a parsed YAML configuration file.
+
+    Structural errors in the file are reported first; the configuration it
+    resolves to is only checked once the file itself is well-formed. Paths
+    refer to the keys of the file.
+
+    Args:
+        file_config: Parsed YAML configuration, layers already merged
+        strict: Report unknown keys as errors
+    """
+    errors = file_schema().validate(file_config)
+    if strict:
+        errors = unknown_file_fields(file_config) + errors
+    if errors:
+        return errors
+    return config_schema(use_source_paths=True).validate(build_config(merge_file_config(file_config)))
+
+
+def validate_files(config_files: List[Union[str, Path]],
+                   strict: bool = False) -> Dict[str, Tuple[List[SchemaError], List[SchemaError]]]:
+    """
+    Validate many configuration files in one call.
+
+    Each file is validated together with the layers it extends.
+
+    Args:
+        config_files: YAML configuration files
+        strict: Report unknown keys as errors instead of warnings
+
+    Returns:
+        Mapping of each file to its (errors, warnings); no errors means valid
+    """
+    results = {}
+    for config_file in config_files:
+        try:
+            file_config = load_layered_config([str(config_file)])
+        except Exception as e:
+            results[str(config_file)] = ([("<file>", f"could not be loaded: {str(e)}")], [])
+            continue
+        warnings = [] if strict else unknown_file_fields(file_config)
+        results[str(config_file)] = (validate_file_config(file_config, strict), warnings)
+    return results
+
+
+def format_errors(errors: List[SchemaError]) -> str:
+    """Render errors as one '; '-separated line"""
+    return "; ".join(f"{path} {message}" for path, message in errors)
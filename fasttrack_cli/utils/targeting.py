@@ -0,0 +1,130 @@
+"""Targeted plans from the difference between two generated configurations"""
+
+import hashlib
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+
+from .generation import describe_resources, load_generation_record, load_applied_record
+from .template_generator import load_manifest
+
+
+# Settings that are rendered into every resource (names, tags) or change the
+# shape of the configuration (resource sets, moved blocks, backend); a change
+# to any of them needs a full plan
+STRUCTURAL_KEYS = {
+    "project_name",
+    "resource_group_name",
+    "location",
+    "environment",
+    "create_app_registration",
+    "create_storage",
+    "use_existing_storage",
+    "storage_account_name",
+    "container_mode",
+    "migrate_indexed_containers",
+    "enable_remote_state",
+    "state_storage_account",
+    "state_container",
+    "state_key",
+}
+
+# Settings that only affect these resources
+KEY_TARGETS = {
+    "azuread_app_name": ["azuread_application.app", "azuread_service_principal.app"],
+    "redirect_url": ["azuread_application.app"],
+    "secret_rotation_months": ["time_rotating.client_secret", "azuread_application_password.client_secret"],
+    "secret_display_name": ["azuread_application_password.client_secret"],
+    "storage_tier": ["azurerm_storage_account.main"],
+    "storage_replication": ["azurerm_storage_account.main"],
+}
+
+
+def _container_addresses(config: Dict[str, Any]) -> Dict[str, str]:
+    return {r["address"]: r["name"] for r in describe_resources(config) if r["kind"] == "storage_container"}
+
+
+def affected_addresses(old: Dict[str, Any], new: Dict[str, Any]) -> Tuple[Optional[List[str]], str]:
+    """
+    Resource addresses a configuration change affects.
+
+    Added, removed and renamed containers are targeted individually; in
+    indexed mode removing a container renumbers the ones after it, which
+    are then targeted as well.
+
+    Args:
+        old: Configuration the directory was last applied (or generated) with
+        new: Current configuration
+
+    Returns:
+        (sorted addresses, description of the change), or (None, reason) when
+        the change is structural and needs a full plan
+    """
+    changed = sorted(key for key in set(old) | set(new) if old.get(key) != new.get(key))
+    targets = set()
+    for key in changed:
+        if key == "storage_containers":
+            old_containers, new_containers = _container_addresses(old), _container_addresses(new)
+            targets.update(address for address in set(old_containers) | set(new_containers)
+                           if old_containers.get(address) != new_containers.get(address))
+        elif key in KEY_TARGETS:
+            targets.update(KEY_TARGETS[key])
+        elif key in STRUCTURAL_KEYS:
+            return None, f"{key} changed"
+        else:
+            return None, f"unrecognized setting {key} changed"
+    return sorted(targets), ", ".join(changed)
+
+
+def _unmanaged_changes(directory: str) -> Optional[str]:
+    """
+    Why the directory's configuration is not exactly what generate wrote.
+
+    Returns:
+        A reason, or None if every generated file is unchanged and there are
+        no other Terraform files (e.g. imports.tf from init-import)
+    """
+    manifest = load_manifest(directory)
+    if manifest is None:
+        return "no generation manifest"
+    files = manifest.get("files", {})
+    for file_name, expected in files.items():
+        try:
+            content = (Path(directory) / file_name).read_bytes()
+        except OSError:
+            return f"{file_name} is missing"
+        if hashlib.sha256(content).hexdigest() != expected:
+            return f"{file_name} was edited"
+
+    extra = sorted(path.name for pattern in ("*.tf", "*.tf.json") for path in Path(directory).glob(pattern)
+                   if path.name not in files)
+    if extra:
+        return f"{', '.join(extra)} not written by generate"
+    return None
+
+
+def plan_targets(directory: str) -> Tuple[Optional[List[str]], str]:
+    """
+    Addresses a targeted plan of a generated directory should cover.
+
+    The baseline is the configuration of the last successful apply, or the
+    configuration generate replaced when no apply has been recorded. After
+    a destroy there is no baseline.
+
+    Returns:
+        (sorted addresses, description of the change), or (None, reason) when
+        a full plan is needed; an empty list means nothing changed
+    """
+    record = load_generation_record(directory)
+    if record is None:
+        return None, "no generation record"
+    reason = _unmanaged_changes(directory)
+    if reason is not None:
+        return None, reason
+
+    applied = load_applied_record(directory)
+    if applied is not None and applied.get("destroyed"):
+        return None, "resources were destroyed since the last apply"
+    baseline = (applied or {}).get("config") or record.get("previous_config")
+    if baseline is None:
+        return None, "no previous configuration recorded"
+    return affected_addresses(baseline, record["config"])
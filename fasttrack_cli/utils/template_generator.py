@@ -1,110 +1,354 @@
 """Terraform template generator using Jinja2"""
 
+import hashlib
+import json
 import os
+import re
+import time
 from pathlib import Path
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from typing import Optional, Dict, List, Tuple
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache, select_autoescape
 import click
 
+from .cache import get_cache_dir
+from .generation import GENERATION_FILE, build_generation_record, generation_record_text, load_generation_record
+from .schema import validate_resolved_config, format_errors
+
+
+TEMPLATE_NAMES = [
+    "main.tf.j2",
+    "variables.tf.j2",
+    "data.tf.j2",
+    "outputs.tf.j2",
+    "backend.tf.j2",
+    "moved.tf.j2",
+]
+
+
+MANIFEST_DIR = ".fasttrack"
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def _hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def hash_config(config: dict) -> str:
+    """Stable content hash of a rendering configuration"""
+    return _hash_text(json.dumps(config, sort_keys=True, default=str))
+
+
+def load_manifest(output_dir: str) -> Optional[dict]:
+    """Load the generation manifest of an output directory, if any"""
+    manifest_file = Path(output_dir) / MANIFEST_DIR / MANIFEST_FILE
+    try:
+        with open(manifest_file, 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def get_bytecode_cache() -> Optional[FileSystemBytecodeCache]:
+    """
+    Persistent Jinja bytecode cache shared by every CLI invocation.
+
+    Jinja keys each entry on the template name and checks it against a hash of
+    the template source, so editing a template invalidates its entry. Returns
+    None when the cache directory cannot be created.
+    """
+    try:
+        return FileSystemBytecodeCache(directory=str(get_cache_dir("templates")))
+    except OSError:
+        return None
+
 
 class TerraformTemplateGenerator:
     """Generate Terraform configuration files from templates"""
 
-    def __init__(self):
+    def __init__(self, bytecode_cache: bool = True):
         template_dir = Path(__file__).parent.parent / "templates"
         self.env = Environment(
             loader=FileSystemLoader(str(template_dir)),
             autoescape=select_autoescape(),
             trim_blocks=True,
-            lstrip_blocks=True
+            lstrip_blocks=True,
+            bytecode_cache=get_bytecode_cache() if bytecode_cache else None
         )
+        self._template_hashes = None
 
-    def generate(self, output_dir: str, config: dict):
+    def preload(self):
+        """Compile every template up front so forked workers inherit them"""
+        for template_name in TEMPLATE_NAMES:
+            self.env.get_template(template_name)
+        self.template_hashes()
+
+    def template_hashes(self) -> Dict[str, str]:
+        """Content hashes of every template source"""
+        if self._template_hashes is None:
+            self._template_hashes = {
+                name: _hash_text(self.env.loader.get_source(self.env, name)[0])
+                for name in TEMPLATE_NAMES
+            }
+        return self._template_hashes
+
+    @staticmethod
+    def output_files(config: dict) -> List[Tuple[str, str]]:
+        """(template, output file) pairs rendered for a configuration"""
+        files = [
+            ("main.tf.j2", "main.tf"),
+            ("variables.tf.j2", "variables.tf"),
+            ("data.tf.j2", "data.tf"),
+            ("outputs.tf.j2", "outputs.tf"),
+        ]
+
+        # Generate backend.tf if remote state is enabled
+        if config.get("enable_remote_state"):
+            files.append(("backend.tf.j2", "backend.tf"))
+
+        # Generate moved.tf when migrating state from numbered container resources
+        if config.get("migrate_indexed_containers") and config.get("storage_containers"):
+            files.append(("moved.tf.j2", "moved.tf"))
+
+        return files
+
+    def generate(self, output_dir: str, config: dict, quiet: bool = False, force: bool = False) -> List[str]:
         """
         Generate Terraform files from templates.
 
+        Rendering is skipped entirely when the manifest shows that the
+        configuration, templates and generated files are all unchanged, and
+        files whose rendered content is identical are never rewritten.
+
         Args:
             output_dir: Directory to write generated files
             config: Configuration dictionary for template rendering
+            quiet: Suppress the status line (used by batch generation)
+            force: Re-render and rewrite every file regardless of the manifest
+
+        Returns:
+            Names of the files that were written or removed
         """
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
 
-        # Generate main.tf
-        self._render_template("main.tf.j2", output_path / "main.tf", config)
+        files = self.output_files(config)
+        config_hash = hash_config(config)
+        template_hashes = {name: self.template_hashes()[name] for name, _ in files}
+        manifest = load_manifest(output_dir)
 
-        # Generate variables.tf
-        self._render_template("variables.tf.j2", output_path / "variables.tf", config)
+        if not force and self._is_up_to_date(output_path, manifest, config_hash, template_hashes, files):
+            if not quiet:
+                click.secho(f"✓ Terraform configuration up to date in: {output_dir}", fg="green")
+            return []
 
-        # Generate data.tf
-        self._render_template("data.tf.j2", output_path / "data.tf", config)
+        previous = load_generation_record(output_dir)
+        render_config = config
+        if ("moved.tf.j2", "moved.tf") in files:
+            render_config = dict(config, indexed_containers=self._indexed_containers(output_dir, config, previous))
 
-        # Generate outputs.tf
-        self._render_template("outputs.tf.j2", output_path / "outputs.tf", config)
+        changed = []
+        file_hashes = {}
+        outputs = []
+        for template_name, file_name in files:
+            content = self._render_template(template_name, render_config)
+            file_hashes[file_name] = _hash_text(content)
+            if self._write_if_changed(output_path / file_name, content, force):
+                changed.append(file_name)
+            if file_name == "outputs.tf":
+                outputs = re.findall(r'^output\s+"([^"]+)"', content, re.MULTILINE)
 
-        # Generate backend.tf if remote state is enabled
-        if config.get("enable_remote_state"):
-            self._render_template("backend.tf.j2", output_path / "backend.tf", config)
+        # Remove files generated previously that this configuration no longer needs
+        if manifest:
+            for file_name in manifest.get("files", {}):
+                stale = output_path / file_name
+                if file_name not in file_hashes and stale.exists():
+                    stale.unlink()
+                    changed.append(file_name)
+
+        # Sidecar describing the directory for init-import, output and fleet tooling
+        (output_path / MANIFEST_DIR).mkdir(exist_ok=True)
+        # Keep the configuration this one replaces so apply can target what changed
+        previous_config = None
+        if previous is not None:
+            previous_config = previous["config"] if previous["config"] != config else previous.get("previous_config")
+        record = build_generation_record(config, [file_name for _, file_name in files], outputs, previous_config)
+        self._write_if_changed(output_path / GENERATION_FILE, generation_record_text(record))
+
+        self._write_manifest(output_path, {
+            "version": MANIFEST_VERSION,
+            "config_hash": config_hash,
+            "templates": template_hashes,
+            "files": file_hashes,
+        })
+
+        if not quiet:
+            if changed:
+                click.secho(f"✓ Terraform configuration generated in: {output_dir}", fg="green")
+                click.echo(f"  Changed: {', '.join(changed)}")
+            else:
+                click.secho(f"✓ Terraform configuration up to date in: {output_dir}", fg="green")
 
-        click.secho(f"✓ Terraform configuration generated in: {output_dir}", fg="green")
+        return changed
 
-    def _render_template(self, template_name: str, output_file: Path, config: dict):
+    @staticmethod
+    def _indexed_containers(output_dir: str, config: dict, previous: Optional[dict]) -> List[Tuple[int, str]]:
+        """
+        Map the numbered container resources of the last indexed generation.
+
+        container_N was generated from the N-th entry of the list in use at the
+        time, so the mapping comes from the recorded configuration, not the
+        current order. for_each addresses containers by name, so reordering is
+        safe; adding or removing containers in the same run is refused.
+
+        Args:
+            output_dir: Directory being generated
+            config: Configuration being rendered
+            previous: Generation record already in the directory, if any
+
+        Returns:
+            (index, container name) pairs for moved.tf
+
+        Raises:
+            click.ClickException: If no indexed generation is recorded or it
+                holds different containers than the current configuration
+        """
+        candidates = [previous["config"], previous.get("previous_config")] if previous else []
+        indexed = next((c for c in candidates if c and c.get("container_mode", "indexed") == "indexed"), None)
+        if indexed is None:
+            raise click.ClickException(
+                f"Cannot migrate indexed containers: {output_dir} has no recorded indexed generation. "
+                f"Generate it with --container-mode indexed first."
+            )
+
+        previous_containers = indexed.get("storage_containers") or []
+        if sorted(previous_containers) != sorted(config["storage_containers"]):
+            raise click.ClickException(
+                f"Cannot migrate indexed containers: {output_dir} was generated with different containers "
+                f"({', '.join(previous_containers) or 'none'}). Migrate with those containers first, "
+                f"then add or remove containers."
+            )
+        return list(enumerate(previous_containers, start=1))
+
+    def _is_up_to_date(self, output_path: Path, manifest: Optional[dict], config_hash: str,
+                       template_hashes: Dict[str, str], files: List[Tuple[str, str]]) -> bool:
+        """Check the manifest and on-disk files against the current inputs"""
+        if not manifest:
+            return False
+        if manifest.get("config_hash") != config_hash or manifest.get("templates") != template_hashes:
+            return False
+
+        recorded = manifest.get("files", {})
+        if set(recorded) != {file_name for _, file_name in files}:
+            return False
+        if not (output_path / GENERATION_FILE).exists():
+            return False
+
+        for file_name, file_hash in recorded.items():
+            try:
+                content = (output_path / file_name).read_text()
+            except OSError:
+                return False
+            if _hash_text(content) != file_hash:
+                return False
+
+        return True
+
+    def render(self, template_name: str, config: dict) -> str:
+        """Render a single template to a string"""
+        return self._render_template(template_name, config)
+
+    def _render_template(self, template_name: str, config: dict) -> str:
         """Render a single template file"""
         template = self.env.get_template(template_name)
-        content = template.render(**config)
+        return template.render(**config)
+
+    @staticmethod
+    def _write_if_changed(output_file: Path, content: str, force: bool = False) -> bool:
+        """Write content unless the file already holds it; returns True if written"""
+        if not force and output_file.exists():
+            try:
+                if output_file.read_text() == content:
+                    return False
+            except OSError:
+                pass
 
         with open(output_file, 'w') as f:
             f.write(content)
+        return True
+
+    @staticmethod
+    def _write_manifest(output_path: Path, manifest: dict):
+        manifest_dir = output_path / MANIFEST_DIR
+        manifest_dir.mkdir(exist_ok=True)
+        tmp_file = manifest_dir / f"{MANIFEST_FILE}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_file, manifest_dir / MANIFEST_FILE)
+
+
+def measure_render_latency(config: dict, iterations: int = 20) -> Dict[str, float]:
+    """
+    Measure template render latency in the three states the CLI can be in.
+
+    - cold: fresh environment, templates compiled from source
+    - warm: fresh environment, templates loaded from the bytecode cache
+    - hot:  one environment reused, templates already in memory
+
+    Args:
+        config: Configuration dictionary to render
+        iterations: Number of runs per state
+
+    Returns:
+        Median latency in milliseconds per state
+    """
+    def render_all(generator):
+        for template_name, _ in generator.output_files(config):
+            generator._render_template(template_name, config)
+
+    def median_ms(samples):
+        samples = sorted(samples)
+        return samples[len(samples) // 2] * 1000
+
+    # Make sure the bytecode cache holds the current templates
+    TerraformTemplateGenerator().preload()
+
+    results = {}
+    for state in ("cold", "warm"):
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            render_all(TerraformTemplateGenerator(bytecode_cache=(state == "warm")))
+            samples.append(time.perf_counter() - start)
+        results[state] = median_ms(samples)
+
+    generator = TerraformTemplateGenerator()
+    render_all(generator)
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        render_all(generator)
+        samples.append(time.perf_counter() - start)
+    results["hot"] = median_ms(samples)
+
+    return results
 
 
 def validate_config(config: dict) -> tuple[bool, str]:
     """
     Validate configuration dictionary.
 
+    Compatibility wrapper around the compiled schema in utils/schema.py,
+    which reports every error with its field path.
+
     Args:
         config: Configuration to validate
 
     Returns:
         Tuple of (is_valid, error_message)
     """
-    required_fields = [
-        "project_name",
-        "resource_group_name",
-        "location",
-        "environment"
-    ]
-
-    for field in required_fields:
-        if field not in config or not config[field]:
-            return False, f"Missing required field: {field}"
-
-    if config.get("create_storage"):
-        if not config.get("storage_account_name"):
-            return False, "storage_account_name is required when create_storage is True"
-
-        # Validate storage account name (3-24 chars, lowercase alphanumeric)
-        storage_name = config["storage_account_name"]
-        if not (3 <= len(storage_name) <= 24):
-            return False, "storage_account_name must be 3-24 characters"
-        if not storage_name.isalnum() or not storage_name.islower():
-            return False, "storage_account_name must be lowercase alphanumeric only"
-
-        # Warn if using existing storage but storage account may not exist
-        if config.get("use_existing_storage") and not config.get("skip_validation"):
-            # This is just a validation check - actual existence check would require Azure SDK
-            pass  # We'll add a warning in the CLI instead
-
-    if config.get("create_app_registration"):
-        if not config.get("azuread_app_name"):
-            return False, "azuread_app_name is required when create_app_registration is True"
-        if not config.get("redirect_url"):
-            return False, "redirect_url is required when create_app_registration is True"
-
-    if config.get("enable_remote_state"):
-        if not config.get("state_storage_account"):
-            return False, "state_storage_account is required when enable_remote_state is True"
-        if not config.get("state_container"):
-            return False, "state_container is required when enable_remote_state is True"
-        if not config.get("state_key"):
-            return False, "state_key is required when enable_remote_state is True"
-
-    return True, ""
+    errors = validate_resolved_config(config)
+    return not errors, format_errors(errors)
@@ -1,16 +1,155 @@
 """Terraform helper functions"""
 
-import subprocess
 import os
+import platform
+import re
+import hashlib
+import json
 import click
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from decimal import Decimal
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Optional, TextIO, List
+
+from .cache import get_cache_dir, cache_enabled, file_lock, write_json_atomic
+from .executor import run_command, command_timeout, command_retries, retry_notice
+from .generation import record_applied
+from .parallelism import OutputWatcher, choose_parallelism, record_outcome, throttle_backoff
+from .profiler import phase
+
+
+# Lines of output kept in memory for error reporting by streaming commands
+TAIL_LINES = 200
+
+# Seconds `terraform version` may take
+VERSION_TIMEOUT = 60
+
+# Called with every output line (without the trailing newline)
+LineCallback = Callable[[str], None]
+
+# Saved plan written by apply, relative to the configuration directory
+PLAN_FILE = os.path.join(".terraform", "fasttrack.tfplan")
+
+# Fingerprint of the inputs of the last successful init
+INIT_FINGERPRINT_FILE = os.path.join(".terraform", "fasttrack-init.json")
+
+# Non-sensitive `terraform output -json` values of the state they were read from,
+# keyed on lineage and serial
+OUTPUT_CACHE_FILE = os.path.join(".terraform", "fasttrack-outputs.json")
+
+# Seconds cached outputs of a remote backend are used without pulling the state
+# ($FASTTRACK_OUTPUT_CACHE_TTL; 0 checks the serial on every call)
+OUTPUT_CACHE_TTL = 60
+
+# Providers served from the local mirror once it is warmed
+MIRRORED_PROVIDERS = "registry.terraform.io/hashicorp/*"
+
+
+def plugin_cache_dir() -> Path:
+    """Shared provider plugin cache used by every terraform invocation"""
+    return get_cache_dir("terraform-plugins")
+
+
+def provider_mirror_dir() -> Path:
+    """Local filesystem provider mirror filled by `fasttrack providers warm --mirror`"""
+    return get_cache_dir("terraform-mirror")
+
+
+def mirror_cli_config_file() -> Path:
+    """Terraform CLI config that installs providers from the local mirror"""
+    return get_cache_dir() / "terraform-mirror.tfrc"
+
+
+def write_mirror_cli_config() -> Path:
+    """Write the CLI config routing hashicorp providers to the local mirror"""
+    config_file = mirror_cli_config_file()
+    mirror = json.dumps(str(provider_mirror_dir()))
+    cache = json.dumps(str(plugin_cache_dir()))
+    config_file.write_text(
+        f"plugin_cache_dir = {cache}\n"
+        f"\n"
+        f"provider_installation {{\n"
+        f"  filesystem_mirror {{\n"
+        f"    path    = {mirror}\n"
+        f"    include = [\"{MIRRORED_PROVIDERS}\"]\n"
+        f"  }}\n"
+        f"  direct {{\n"
+        f"    exclude = [\"{MIRRORED_PROVIDERS}\"]\n"
+        f"  }}\n"
+        f"}}\n"
+    )
+    return config_file
+
+
+def terraform_env(use_mirror: bool = True) -> dict:
+    """
+    Environment for terraform subprocesses.
+
+    Every directory shares one provider plugin cache instead of downloading
+    its own copy. Once the mirror has been warmed, providers install from it
+    so init works offline. Settings already present in the environment win;
+    $FASTTRACK_PROVIDER_MIRROR=0 turns the mirror off.
+
+    Args:
+        use_mirror: Route provider installs through the local mirror if warmed
+    """
+    env = os.environ.copy()
+    try:
+        env.setdefault("TF_PLUGIN_CACHE_DIR", str(plugin_cache_dir()))
+        # New directories have no lock file yet; without this Terraform 1.4+
+        # downloads providers again instead of using the cache
+        env.setdefault("TF_PLUGIN_CACHE_MAY_BREAK_DEPENDENCY_LOCK_FILE", "true")
+
+        if use_mirror and mirror_enabled():
+            env.setdefault("TF_CLI_CONFIG_FILE", str(mirror_cli_config_file()))
+    except OSError:
+        # No writable cache directory: fall back to per-directory downloads
+        pass
+    return env
+
+
+# Provider entries of a dependency lock file: source address and selected version
+LOCKED_PROVIDER_PATTERN = re.compile(r'provider\s+"([^"]+)"\s*\{[^}]*?\bversion\s*=\s*"([^"]+)"')
+
+# Entries of a required_providers block: name = { source, version } or the legacy name = "constraint"
+REQUIRED_PROVIDER_PATTERN = re.compile(r'([A-Za-z][\w-]*)\s*=\s*(?:\{([^}]*)\}|"([^"]*)")')
+
+# One version constraint, e.g. "~> 3.0" or ">= 2.47"
+VERSION_CONSTRAINT_PATTERN = re.compile(r"^(=|!=|>=|<=|>|<|~>)?\s*v?(\d+(?:\.\d+){0,2})$")
+
+# Terraform platform names of Python's machine names
+PLATFORM_ARCHITECTURES = {"x86_64": "amd64", "amd64": "amd64", "aarch64": "arm64", "arm64": "arm64", "i386": "386"}
+
+
+@contextmanager
+def plugin_cache_lock():
+    """
+    Serialize operations that write to the shared plugin cache.
+
+    Terraform does not guarantee that concurrent inits can safely share a
+    plugin cache directory, so provider installs take this lock (see
+    install_providers).
+    """
+    try:
+        lock_path = get_cache_dir() / "terraform-plugins.lock"
+    except OSError:
+        # No cache directory; run unlocked
+        yield
+        return
+    with file_lock(lock_path):
+        yield
 
 
 def run_terraform_command(command: list, cwd: str) -> tuple[bool, str]:
     """
     Execute Terraform command.
 
+    Stopped after $FASTTRACK_TERRAFORM_TIMEOUT seconds if set; throttled or
+    transient failures (e.g. reading remote state) are retried.
+
     Args:
         command: List of command arguments
         cwd: Working directory
@@ -18,28 +157,374 @@ def run_terraform_command(command: list, cwd: str) -> tuple[bool, str]:
     Returns:
         Tuple of (success, output)
     """
+    result = run_command(
+        command,
+        cwd=cwd,
+        env=terraform_env(),
+        timeout=command_timeout("terraform", None),
+        retries=command_retries(),
+        on_retry=retry_notice(" ".join(command[:2]))
+    )
+    if result.ok:
+        return True, result.output
+    return False, result.stderr or f"{' '.join(command[:2])} failed with exit code {result.returncode}"
+
+
+def stream_process(command: list, cwd: str, on_line: Optional[LineCallback] = None,
+                   log: Optional[TextIO] = None, tail_lines: int = TAIL_LINES,
+                   env: Optional[dict] = None, interactive: bool = False) -> tuple[int, str]:
+    """
+    Execute a command, handing each output line over as it arrives.
+
+    stdout and stderr are merged. Only the last tail_lines lines are kept in
+    memory, so long applies stream with bounded memory. The command is
+    stopped after $FASTTRACK_TERRAFORM_TIMEOUT seconds if set.
+
+    Timeouts and cancellation (Ctrl-C, fleet cancellation) interrupt
+    terraform with SIGINT and wait for it to exit on its own, so it can
+    write its state and release the state lock; it is never killed.
+
+    Args:
+        command: List of command arguments
+        cwd: Working directory
+        on_line: Called with every output line
+        log: File receiving the full output
+        tail_lines: Number of trailing lines to return
+        env: Process environment (default: terraform_env())
+        interactive: The command may prompt on the terminal
+
+    Returns:
+        Tuple of (exit code, last output lines); the exit code is -1 if the
+        command could not be started or timed out
+    """
+    result = run_command(
+        command,
+        cwd=cwd,
+        env=env if env is not None else terraform_env(),
+        timeout=command_timeout("terraform", None),
+        stream=True,
+        on_line=on_line,
+        log=log,
+        tail_lines=tail_lines,
+        interactive=interactive,
+        graceful=True
+    )
+    if result.stderr:
+        # Could not start or timed out
+        if on_line is not None:
+            on_line(result.stderr)
+        if log is not None:
+            log.write(result.stderr + "\n")
+            log.flush()
+        return result.returncode, result.stdout + result.stderr
+    return result.returncode, result.stdout
+
+
+def stream_terraform_command(command: list, cwd: str, on_line: Optional[LineCallback] = None,
+                             log: Optional[TextIO] = None, tail_lines: int = TAIL_LINES,
+                             interactive: bool = False) -> tuple[bool, str]:
+    """
+    Execute Terraform command with streamed output (see stream_process).
+
+    Returns:
+        Tuple of (success, last output lines)
+    """
+    returncode, tail = stream_process(command, cwd, on_line, log, tail_lines, interactive=interactive)
+    return returncode == 0, tail
+
+
+def echo_lines(log: Optional[TextIO] = None) -> LineCallback:
+    """Line callback that echoes to the terminal and optionally tees into a log file"""
+    def on_line(line: str):
+        click.echo(line)
+        if log is not None:
+            log.write(line + "\n")
+            log.flush()
+    return on_line
+
+
+def _hcl_blocks(text: str, pattern: str) -> list:
+    """Return the full text of every block whose header matches pattern"""
+    blocks = []
+    for match in re.finditer(pattern + r'\s*\{', text):
+        depth = 0
+        for i in range(match.end() - 1, len(text)):
+            if text[i] == "{":
+                depth += 1
+            elif text[i] == "}":
+                depth -= 1
+                if depth == 0:
+                    blocks.append(text[match.start():i + 1])
+                    break
+    return blocks
+
+
+def init_fingerprint(directory: str) -> str:
+    """
+    Hash everything `terraform init` depends on.
+
+    Covers required_providers and backend blocks in every .tf file, the whole
+    backend.tf and the dependency lock file.
+    """
+    digest = hashlib.sha256()
+    terraform_dir = Path(directory)
+
+    for tf_file in sorted(terraform_dir.glob("*.tf")):
+        try:
+            text = tf_file.read_text()
+        except OSError:
+            continue
+        if tf_file.name == "backend.tf":
+            blocks = [text]
+        else:
+            blocks = _hcl_blocks(text, r'\brequired_providers') + _hcl_blocks(text, r'\bbackend\s+"[^"]*"')
+        for block in blocks:
+            digest.update(f"{tf_file.name}\0{block}\0".encode("utf-8"))
+
+    lock_file = terraform_dir / ".terraform.lock.hcl"
+    if lock_file.exists():
+        digest.update(b"lock\0" + lock_file.read_bytes())
+
+    return digest.hexdigest()
+
+
+def init_is_current(directory: str) -> bool:
+    """True if the directory was initialized with the current providers, backend and lock file"""
     try:
-        result = subprocess.run(
-            command,
-            capture_output=True,
-            text=True,
-            cwd=cwd,
-            check=True
-        )
-        return True, result.stdout + result.stderr
+        with open(os.path.join(directory, INIT_FINGERPRINT_FILE), 'r') as f:
+            recorded = json.load(f).get("fingerprint")
+    except (OSError, ValueError):
+        return False
+    return recorded == init_fingerprint(directory)
+
+
+def record_init(directory: str):
+    """Remember the fingerprint of a successful init"""
+    # Init may have switched the backend the cached outputs came from
+    invalidate_output_cache(directory)
+    path = os.path.join(directory, INIT_FINGERPRINT_FILE)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({"fingerprint": init_fingerprint(directory)}, f)
+    except OSError:
+        pass
+
+
+def _version_parts(version: str) -> Optional[List[int]]:
+    """Numeric parts of a release version; None for pre-releases"""
+    match = re.fullmatch(r"v?(\d+(?:\.\d+){0,2})", version.strip())
+    return [int(part) for part in match.group(1).split(".")] if match else None
+
+
+def _padded(parts: List[int]) -> tuple:
+    return tuple(parts + [0] * (3 - len(parts)))
+
+
+def version_satisfies(version: str, constraints: str) -> bool:
+    """
+    Check a provider version against a Terraform version constraint string.
+
+    Supports =, !=, >, >=, <, <= and ~> joined by commas; an empty string
+    allows any release. Pre-release versions never match.
+    """
+    candidate = _version_parts(version)
+    if candidate is None:
+        return False
+    current = _padded(candidate)
+    for constraint in filter(None, (c.strip() for c in constraints.split(","))):
+        match = VERSION_CONSTRAINT_PATTERN.match(constraint)
+        if not match:
+            return False
+        operator, parts = match.group(1) or "=", [int(p) for p in match.group(2).split(".")]
+        bound = _padded(parts)
+        if operator == "~>":
+            # ~> 3.1 allows 3.x from 3.1 up; ~> 3.1.2 allows 3.1.x from 3.1.2 up
+            prefix = [parts[0] + 1] if len(parts) == 1 else parts[:-2] + [parts[-2] + 1]
+            if not bound <= current < _padded(prefix):
+                return False
+        elif not {
+            "=": current == bound, "!=": current != bound,
+            ">": current > bound, ">=": current >= bound,
+            "<": current < bound, "<=": current <= bound,
+        }[operator]:
+            return False
+    return True
+
+
+def _provider_address(source: str) -> str:
+    """Fully qualified provider source address"""
+    parts = source.strip().lower().split("/")
+    if len(parts) == 1:
+        parts = ["hashicorp"] + parts
+    if len(parts) == 2:
+        parts = ["registry.terraform.io"] + parts
+    return "/".join(parts)
+
+
+def provider_requirements(directory: str) -> dict:
+    """
+    Providers directory needs, with the versions init may install.
+
+    Returns:
+        {source address: version constraint}; the versions pinned in the
+        dependency lock file, or without one the required_providers
+        constraints of the configuration
+    """
+    try:
+        locked = LOCKED_PROVIDER_PATTERN.findall(Path(directory, ".terraform.lock.hcl").read_text())
+    except OSError:
+        locked = []
+    if locked:
+        return {source: f"= {version}" for source, version in locked}
+
+    requirements = {}
+    for tf_file in sorted(Path(directory).glob("*.tf")):
+        try:
+            text = tf_file.read_text()
+        except OSError:
+            continue
+        for block in _hcl_blocks(text, r'\brequired_providers'):
+            body = block[block.index("{") + 1:-1]
+            for name, attributes, legacy in REQUIRED_PROVIDER_PATTERN.findall(body):
+                source = re.search(r'\bsource\s*=\s*"([^"]+)"', attributes)
+                version = re.search(r'\bversion\s*=\s*"([^"]*)"', attributes)
+                requirements[_provider_address(source.group(1) if source else name)] = (
+                    version.group(1) if version else legacy
+                )
+    return requirements
 
-    except subprocess.CalledProcessError as e:
-        return False, e.stderr or str(e)
-    except Exception as e:
-        return False, str(e)
 
+def _terraform_platform() -> Optional[str]:
+    """Terraform's name for this platform, e.g. linux_amd64"""
+    architecture = PLATFORM_ARCHITECTURES.get(platform.machine().lower())
+    return f"{platform.system().lower()}_{architecture}" if architecture else None
+
+
+def _available_versions(root: Path, source: str) -> List[str]:
+    """
+    Versions of a provider under root built for this platform.
+
+    Reads both the unpacked layout of the plugin cache
+    (<source>/<version>/<os>_<arch>/) and the packed layout `terraform
+    providers mirror` writes (<source>/terraform-provider-<type>_<version>_<os>_<arch>.zip).
+    """
+    provider_dir = root / source
+    target = _terraform_platform() or "*_*"
+    versions = {path.parent.name for path in provider_dir.glob(f"*/{target}")}
+    prefix = f"terraform-provider-{source.rsplit('/', 1)[-1]}_"
+    for archive in provider_dir.glob(f"{prefix}*_{target}.zip"):
+        versions.add(archive.name[len(prefix):].split("_")[0])
+    return sorted(versions)
+
+
+def providers_available(root: Path, requirements: dict) -> bool:
+    """True if root holds a version of every required provider that meets its constraint"""
+    return bool(requirements) and all(
+        any(version_satisfies(version, constraint) for version in _available_versions(root, source))
+        for source, constraint in requirements.items()
+    )
+
+
+def providers_cached(directory: str, cache_dir: Path) -> bool:
+    """True if cache_dir holds providers meeting every requirement of the directory (see provider_requirements)"""
+    return providers_available(cache_dir, provider_requirements(directory))
+
+
+def mirror_serves(directory: str) -> bool:
+    """
+    True if the local mirror holds every hashicorp provider directory needs.
+
+    The mirror CLI config excludes hashicorp providers from the registry, so
+    init through it fails when a provider was bumped after the mirror was
+    filled; such directories install from the registry instead.
+    """
+    mirrored = MIRRORED_PROVIDERS[:-1]
+    requirements = {source: constraint for source, constraint in provider_requirements(directory).items()
+                    if source.startswith(mirrored)}
+    return not requirements or providers_available(provider_mirror_dir(), requirements)
+
+
+def mirror_enabled() -> bool:
+    """True if init goes through the local mirror (warmed, not turned off, no CLI config of the user's)"""
+    if os.environ.get("FASTTRACK_PROVIDER_MIRROR", "1") in ("0", "false") or "TF_CLI_CONFIG_FILE" in os.environ:
+        return False
+    try:
+        return mirror_cli_config_file().exists()
+    except OSError:
+        return False
+
+
+def init_env(directory: str) -> tuple[dict, bool]:
+    """
+    Environment for installing the providers of directory.
+
+    Returns:
+        Tuple of (environment, True if the mirror is enabled but lacks a
+        provider version the directory needs, so the registry is used)
+    """
+    stale_mirror = mirror_enabled() and not mirror_serves(directory)
+    return terraform_env(use_mirror=not stale_mirror), stale_mirror
+
+
+def install_providers(directory: str, run: Callable[[list], tuple[bool, str]],
+                      env: Optional[dict] = None) -> tuple[bool, str]:
+    """
+    Put the providers directory needs into the shared plugin cache.
+
+    Only this step holds plugin_cache_lock: a backend-less init installs
+    missing providers into the cache, so the full init that follows just
+    links cached ones and inits of different directories run concurrently.
+    Skipped when the cache already holds every locked provider version, or
+    for directories without a lock file a version meeting each
+    required_providers constraint, and when there is no shared cache.
+
+    Args:
+        directory: Terraform configuration directory
+        run: Runs a terraform command in directory, returning (success, output)
+        env: Environment the commands run with (default: terraform_env())
+
+    Returns:
+        Tuple of (success, output of the install init)
+    """
+    cache_dir = (env if env is not None else terraform_env()).get("TF_PLUGIN_CACHE_DIR")
+    if not cache_dir or providers_cached(directory, Path(cache_dir)):
+        return True, ""
+    with plugin_cache_lock():
+        # Another directory may have installed them while we waited
+        if providers_cached(directory, Path(cache_dir)):
+            return True, ""
+        return run(["terraform", "init", "-input=false", "-backend=false"])
+
+
+def terraform_init(directory: str, on_line: Optional[LineCallback] = None, force: bool = False) -> bool:
+    """
+    Initialize Terraform in directory; output is shown only on failure unless on_line is given.
+
+    Init is skipped when providers, backend and lock file are unchanged since
+    the last successful init. force always re-runs it.
+    """
+    if not force and init_is_current(directory):
+        click.secho("✓ Terraform already initialized (providers and backend unchanged)", fg="green")
+        return True
 
-def terraform_init(directory: str) -> bool:
-    """Initialize Terraform in directory"""
     click.echo("Initializing Terraform...")
-    success, output = run_terraform_command(["terraform", "init"], directory)
+    env, stale_mirror = init_env(directory)
+    if stale_mirror:
+        click.secho("⚠️  Provider mirror lacks a required provider version; installing from the registry "
+                    "(run `fasttrack providers warm --mirror` to refresh it)", fg="yellow")
+
+    def run(command):
+        returncode, output = stream_process(command, directory, on_line, env=env)
+        return returncode == 0, output
+
+    success, output = install_providers(directory, run, env)
+    if success:
+        success, output = run(["terraform", "init", "-input=false"])
 
     if success:
+        # Init may have updated the lock file, so fingerprint afterwards
+        record_init(directory)
         click.secho("✓ Terraform initialized successfully", fg="green")
     else:
         click.secho(f"✗ Terraform init failed: {output}", fg="red")
@@ -47,12 +532,10 @@ def terraform_init(directory: str) -> bool:
     return success
 
 
-def terraform_validate(directory: str) -> bool:
+def terraform_validate(directory: str, on_line: Optional[LineCallback] = None) -> bool:
     """Run terraform validate"""
     click.echo("Validating Terraform configuration...")
-    success, output = run_terraform_command(["terraform", "validate"], directory)
-
-    click.echo(output)
+    success, _ = stream_terraform_command(["terraform", "validate"], directory, on_line or echo_lines())
 
     if success:
         click.secho("✓ Terraform configuration is valid", fg="green")
@@ -62,12 +545,10 @@ def terraform_validate(directory: str) -> bool:
     return success
 
 
-def terraform_plan(directory: str) -> bool:
-    """Run terraform plan"""
+def terraform_plan(directory: str, on_line: Optional[LineCallback] = None) -> bool:
+    """Run terraform plan, streaming its output (to the terminal unless on_line is given)"""
     click.echo("Running Terraform plan...")
-    success, output = run_terraform_command(["terraform", "plan"], directory)
-
-    click.echo(output)
+    success, _ = stream_terraform_command(["terraform", "plan", "-input=false"], directory, on_line or echo_lines())
 
     if success:
         click.secho("✓ Terraform plan completed", fg="green")
@@ -77,17 +558,67 @@ def terraform_plan(directory: str) -> bool:
     return success
 
 
-def terraform_apply(directory: str, auto_approve: bool = False) -> bool:
-    """Run terraform apply"""
+def terraform_plan_saved(directory: str, plan_file: str = PLAN_FILE, on_line: Optional[LineCallback] = None,
+                         extra_args: Optional[List[str]] = None) -> Optional[bool]:
+    """
+    Run terraform plan with -detailed-exitcode and save the plan to plan_file.
+
+    Args:
+        directory: Terraform configuration directory
+        plan_file: Plan file path, relative to directory
+        on_line: Called with every output line (default: echo to the terminal)
+        extra_args: Additional plan arguments, e.g. -target options
+
+    Returns:
+        True if the plan has changes, False if there is nothing to do, None on failure
+    """
+    click.echo("Running Terraform plan...")
+    command = ["terraform", "plan", "-input=false", "-detailed-exitcode", f"-out={plan_file}"] + (extra_args or [])
+    returncode, _ = stream_process(command, directory, on_line or echo_lines())
+
+    # -detailed-exitcode: 0 = no changes, 1 = error, 2 = changes present
+    if returncode == 0:
+        click.secho("✓ No changes. Infrastructure is up to date.", fg="green")
+        return False
+    if returncode == 2:
+        click.secho("✓ Terraform plan completed", fg="green")
+        return True
+
+    click.secho("✗ Terraform plan failed", fg="red")
+    return None
+
+
+def remove_plan_file(directory: str, plan_file: str = PLAN_FILE):
+    """Delete a saved plan; plan files can contain sensitive values"""
+    try:
+        os.remove(os.path.join(directory, plan_file))
+    except OSError:
+        pass
+
+
+def terraform_apply(directory: str, auto_approve: bool = False, on_line: Optional[LineCallback] = None,
+                    plan_file: Optional[str] = None, parallelism: Optional[int] = None) -> bool:
+    """
+    Run terraform apply, streaming its output (to the terminal unless on_line is given).
+
+    With plan_file, the saved plan is applied as-is: Terraform neither
+    re-plans nor asks for approval. parallelism sets -parallelism.
+    """
     click.echo("Applying Terraform configuration...")
 
-    command = ["terraform", "apply"]
-    if auto_approve:
+    command = ["terraform", "apply", "-input=false"]
+    if parallelism:
+        command.append(f"-parallelism={parallelism}")
+    if plan_file:
+        command.append(plan_file)
+    elif auto_approve:
         command.append("-auto-approve")
 
-    success, output = run_terraform_command(command, directory)
-
-    click.echo(output)
+    # Without a plan or -auto-approve, terraform asks for confirmation itself
+    interactive = not plan_file and not auto_approve
+    success, _ = stream_terraform_command(command, directory, on_line or echo_lines(), interactive=interactive)
+    # Even a failed apply may have changed the state
+    invalidate_output_cache(directory)
 
     if success:
         click.secho("✓ Terraform apply completed successfully", fg="green")
@@ -97,17 +628,23 @@ def terraform_apply(directory: str, auto_approve: bool = False) -> bool:
     return success
 
 
-def terraform_destroy(directory: str, auto_approve: bool = False) -> bool:
-    """Run terraform destroy"""
-    click.echo("Destroying Terraform-managed resources...")
+def terraform_destroy(directory: str, on_line: Optional[LineCallback] = None,
+                      parallelism: Optional[int] = None) -> bool:
+    """
+    Run terraform destroy without prompting, streaming its output (to the terminal unless on_line is given).
 
-    command = ["terraform", "destroy"]
-    if auto_approve:
-        command.append("-auto-approve")
+    Callers confirm with the user first: terraform's own "Enter a value:"
+    prompt has no trailing newline and would never show up in the
+    line-by-line stream.
+    """
+    click.echo("Destroying Terraform-managed resources...")
 
-    success, output = run_terraform_command(command, directory)
+    command = ["terraform", "destroy", "-input=false", "-auto-approve"]
+    if parallelism:
+        command.append(f"-parallelism={parallelism}")
 
-    click.echo(output)
+    success, _ = stream_terraform_command(command, directory, on_line or echo_lines())
+    invalidate_output_cache(directory)
 
     if success:
         click.secho("✓ Terraform destroy completed", fg="green")
@@ -118,38 +655,213 @@ def terraform_destroy(directory: str, auto_approve: bool = False) -> bool:
 
 
 def terraform_output(directory: str, output_name: Optional[str] = None) -> tuple[bool, str]:
-    """Get terraform output"""
-    command = ["terraform", "output"]
-    if output_name:
-        command.extend(["-raw", output_name])
+    """
+    Get terraform output.
+
+    All outputs are fetched once with `terraform output -json` and cached
+    against the state's lineage and serial, so reading many single outputs
+    costs one terraform run (see cached_outputs). Sensitive outputs are
+    never cached and always read live.
+
+    Returns:
+        Tuple of (success, all outputs as JSON, or the raw value of output_name)
+    """
+    success, outputs = cached_outputs(directory, None if output_name is None else [output_name])
+    if not success:
+        return False, outputs
+
+    if output_name is None:
+        return True, json.dumps(outputs, indent=2)
+    if output_name not in outputs:
+        return False, f'Output "{output_name}" not found'
+    return _raw_output_value(output_name, outputs[output_name]["value"])
+
+
+def _raw_output_value(name: str, value) -> tuple[bool, str]:
+    """Format a value like `terraform output -raw` does"""
+    if isinstance(value, bool):
+        return True, "true" if value else "false"
+    if isinstance(value, (str, int)):
+        return True, str(value)
+    if isinstance(value, float):
+        return True, _format_number(value)
+    if value is None:
+        return False, f'Output "{name}" is null'
+    return False, f'Output "{name}" is not a string, number or bool; omit --output-name to get it as JSON'
+
+
+def _format_number(value: float) -> str:
+    """A JSON number the way Terraform prints it: no exponent, no trailing zeros"""
+    text = format(Decimal(repr(value)), "f")
+    if "." in text:
+        text = text.rstrip("0").rstrip(".")
+    return text
+
+
+def _backend_type(directory: str) -> str:
+    """Backend the directory was initialized with ("local" when none)"""
+    try:
+        with open(os.path.join(directory, ".terraform", "terraform.tfstate"), 'r') as f:
+            backend = json.load(f).get("backend") or {}
+    except (OSError, ValueError):
+        return "local"
+    return backend.get("type") or "local"
+
+
+def _local_state_path(directory: str) -> Path:
+    """State file of the selected workspace for the local backend"""
+    try:
+        workspace = Path(directory, ".terraform", "environment").read_text().strip() or "default"
+    except OSError:
+        workspace = "default"
+    if workspace == "default":
+        return Path(directory) / "terraform.tfstate"
+    return Path(directory) / "terraform.tfstate.d" / workspace / "terraform.tfstate"
+
+
+def _load_output_cache(directory: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(directory, OUTPUT_CACHE_FILE), 'r') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    # Caches without the list of sensitive names may hold sensitive values
+    if not isinstance(cache.get("sensitive"), list):
+        return None
+    return cache
+
+
+def _write_output_cache(directory: str, backend: str, identity: list, outputs: dict):
+    """Cache the non-sensitive outputs; sensitive ones are recorded by name only"""
+    try:
+        write_json_atomic(Path(directory) / OUTPUT_CACHE_FILE, {
+            "backend": backend,
+            "state": identity,
+            "checked_at": time.time(),
+            "outputs": {name: o for name, o in outputs.items() if not o.get("sensitive")},
+            "sensitive": sorted(name for name, o in outputs.items() if o.get("sensitive")),
+        })
+    except OSError:
+        pass
+
+
+def _from_cache(directory: str, cache: dict, names: Optional[List[str]]) -> tuple[bool, Any]:
+    """Cached outputs, fetched live instead when a requested one is sensitive"""
+    wanted = cache["sensitive"] if names is None else names
+    if set(wanted) & set(cache["sensitive"]):
+        return _fetch_outputs(directory)
+    return True, cache["outputs"]
+
+
+def invalidate_output_cache(directory: str):
+    """Forget cached outputs, e.g. after apply, destroy or import"""
+    try:
+        os.remove(os.path.join(directory, OUTPUT_CACHE_FILE))
+    except OSError:
+        pass
+
+
+def _output_cache_ttl() -> float:
+    try:
+        return float(os.environ.get("FASTTRACK_OUTPUT_CACHE_TTL", OUTPUT_CACHE_TTL))
+    except ValueError:
+        return OUTPUT_CACHE_TTL
+
+
+def cached_outputs(directory: str, names: Optional[List[str]] = None) -> tuple[bool, Any]:
+    """
+    Outputs of a directory, as `terraform output -json` reports them.
+
+    With the local backend the lineage and serial are read from the state
+    file, so cached outputs are served without running terraform until the
+    state changes. With a remote backend they are used for
+    OUTPUT_CACHE_TTL seconds; after that `terraform state pull` checks the
+    serial and supplies the outputs itself when it changed. Apply, destroy,
+    import and init through the CLI drop the cache.
+
+    Sensitive values are never written to the cache: when one of names is
+    sensitive the outputs are fetched live.
+
+    Args:
+        directory: Terraform configuration directory
+        names: Outputs the caller needs (default: all of them)
+
+    Returns:
+        Tuple of (success, {name: {"sensitive", "type", "value"}} or error message)
+    """
+    if not os.path.isdir(os.path.join(directory, ".terraform")) or not cache_enabled():
+        return _fetch_outputs(directory)
+
+    backend = _backend_type(directory)
+    cache = _load_output_cache(directory)
+    if cache is not None and cache.get("backend") != backend:
+        cache = None
+
+    if backend == "local":
+        try:
+            with open(_local_state_path(directory), 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            # No state yet; let terraform report it
+            return _fetch_outputs(directory)
+        identity = [state.get("lineage"), state.get("serial")]
+        if cache is not None and cache.get("state") == identity:
+            return _from_cache(directory, cache, names)
+        success, outputs = _fetch_outputs(directory)
     else:
-        command.append("-json")
+        if cache is not None and time.time() - cache.get("checked_at", 0) < _output_cache_ttl():
+            return _from_cache(directory, cache, names)
+        success, pulled = run_terraform_command(["terraform", "state", "pull"], directory)
+        try:
+            state = json.loads(pulled) if success else None
+        except ValueError:
+            state = None
+        if state is None:
+            return _fetch_outputs(directory)
+        identity = [state.get("lineage"), state.get("serial")]
+        # The pulled state carries every value, sensitive ones included
+        outputs = {
+            name: {"sensitive": o.get("sensitive", False), "type": o.get("type"), "value": o.get("value")}
+            for name, o in (state.get("outputs") or {}).items()
+        }
+        success = True
+
+    if success:
+        _write_output_cache(directory, backend, identity, outputs)
+    return success, outputs
+
+
+def _fetch_outputs(directory: str) -> tuple[bool, Any]:
+    """Run `terraform output -json`"""
+    success, output = run_terraform_command(["terraform", "output", "-json"], directory)
+    if not success:
+        return False, output
+    try:
+        return True, json.loads(output)
+    except ValueError:
+        return False, f"Unexpected terraform output: {output.strip()[:200]}"
 
-    return run_terraform_command(command, directory)
+
+def terraform_version() -> Optional[str]:
+    """First line of `terraform version`, or None if terraform cannot be run"""
+    result = run_command(["terraform", "version"], env=terraform_env(), timeout=VERSION_TIMEOUT)
+    if not result.ok:
+        return None
+    return result.stdout.split('\n')[0]
 
 
 def check_terraform_installed() -> bool:
     """Check if Terraform is installed"""
-    try:
-        result = subprocess.run(
-            ["terraform", "version"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return True
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        return False
+    return terraform_version() is not None
 
 
 def terraform_import(directory: str, resource_address: str, resource_id: str) -> bool:
     """Import existing resource into Terraform state"""
     click.echo(f"Importing {resource_address}...")
 
-    command = ["terraform", "import", resource_address, resource_id]
-    success, output = run_terraform_command(command, directory)
-
-    click.echo(output)
+    command = ["terraform", "import", "-input=false", resource_address, resource_id]
+    success, _ = stream_terraform_command(command, directory, echo_lines())
+    invalidate_output_cache(directory)
 
     if success:
         click.secho(f"✓ Resource imported successfully", fg="green")
@@ -159,6 +871,150 @@ def terraform_import(directory: str, resource_address: str, resource_id: str) ->
     return success
 
 
+def run_logged_step(command: list, directory: str, log: TextIO, on_line: Optional[LineCallback] = None,
+                    env: Optional[dict] = None) -> int:
+    """Run one step of an unattended run, writing the command and its output to log"""
+    log.write(f"$ {' '.join(command)}\n")
+    with phase(command[1], directory=directory):
+        returncode, _ = stream_process(command, directory, on_line, log=log, env=env)
+    log.write("\n")
+    log.flush()
+    return returncode
+
+
+def init_unattended(directory: str, log: TextIO, reinit: bool = False) -> bool:
+    """Run init for an unattended run unless providers and backend are unchanged since the last one"""
+    if not reinit and init_is_current(directory):
+        return True
+    env, stale_mirror = init_env(directory)
+    if stale_mirror:
+        log.write("# Provider mirror lacks a required provider version; installing from the registry\n")
+
+    def run(command):
+        return run_logged_step(command, directory, log, env=env) == 0, ""
+
+    installed, _ = install_providers(directory, run, env)
+    if not installed or not run(["terraform", "init", "-input=false"])[0]:
+        return False
+    record_init(directory)
+    return True
+
+
+def terraform_apply_unattended(directory: str, log: TextIO, reinit: bool = False,
+                               parallelism: Optional[int] = None, concurrency: int = 1) -> tuple[bool, str]:
+    """
+    Run init, validate, plan and apply without prompting, logging all output.
+
+    The plan is saved and applied as-is; directories without changes skip
+    the apply. A plan or apply that fails because ARM throttled is planned
+    and applied again with lower parallelism.
+
+    Used by fleet commands, which report progress per directory instead of
+    echoing terraform output to the terminal.
+
+    Args:
+        directory: Terraform configuration directory
+        log: File receiving the output of every step
+        reinit: Run init even if providers and backend are unchanged
+        parallelism: Explicit -parallelism (default: chosen from the resource and change counts)
+        concurrency: Directories of the fleet running at the same time
+
+    Returns:
+        Tuple of (success, name of the failed step or "")
+    """
+    def run_step(command, on_line=None):
+        return run_logged_step(command, directory, log, on_line)
+
+    if not init_unattended(directory, log, reinit):
+        return False, "terraform init failed"
+    if run_step(["terraform", "validate"]) != 0:
+        return False, "terraform validate failed"
+
+    current = choose_parallelism(directory, parallelism, concurrency)
+    attempt = 0
+    while True:
+        watcher = OutputWatcher()
+        plan_command = ["terraform", "plan", "-input=false", "-detailed-exitcode", f"-parallelism={current}",
+                        f"-out={PLAN_FILE}"]
+        returncode = run_step(plan_command, watcher)
+        if returncode == 0:
+            remove_plan_file(directory)
+            record_outcome(watcher, current)
+            record_applied(directory)
+            return True, "no changes"
+
+        if returncode == 2:
+            current = choose_parallelism(directory, parallelism, concurrency, watcher.planned_changes)
+            # Apply exactly the saved plan instead of planning (and refreshing) again
+            returncode = run_step(["terraform", "apply", "-input=false", f"-parallelism={current}", PLAN_FILE],
+                                  watcher)
+            remove_plan_file(directory)
+            invalidate_output_cache(directory)
+            if returncode == 0:
+                record_outcome(watcher, current)
+                record_applied(directory)
+                return True, ""
+            failed = "terraform apply failed"
+        else:
+            remove_plan_file(directory)
+            failed = "terraform plan failed"
+
+        retry = throttle_backoff(watcher, current, attempt)
+        if retry is None:
+            return False, failed
+        # Stay at the lowered value for the rest of this run
+        current, delay = retry
+        parallelism = current
+        log.write(f"# {failed}: ARM throttling, retrying with -parallelism={current} in {delay:.1f}s\n\n")
+        log.flush()
+        time.sleep(delay)
+        attempt += 1
+
+
+def warm_provider_cache(main_tf: str, mirror: bool = False, platforms: Optional[List[str]] = None,
+                        on_line: Optional[LineCallback] = None) -> tuple[bool, str]:
+    """
+    Download the providers required by main_tf into the shared plugin cache.
+
+    Providers are fetched from the registry even when the mirror is enabled,
+    so warming also picks up provider versions the mirror does not have yet.
+
+    Args:
+        main_tf: Terraform configuration declaring required_providers
+        mirror: Also fill the local filesystem mirror and route installs through it
+        platforms: Platforms to mirror, e.g. linux_amd64 (default: current platform)
+        on_line: Called with every output line
+
+    Returns:
+        Tuple of (success, last output lines)
+    """
+    # Only the terraform block matters; resources would need their variables
+    blocks = _hcl_blocks(main_tf, r'(?m)^terraform')
+    env = terraform_env(use_mirror=False)
+
+    work_dir = tempfile.mkdtemp(prefix="fasttrack-providers-")
+    try:
+        Path(work_dir, "main.tf").write_text("\n\n".join(blocks) + "\n")
+
+        with plugin_cache_lock():
+            returncode, output = stream_process(
+                ["terraform", "init", "-input=false", "-backend=false"], work_dir, on_line, env=env
+            )
+        if returncode != 0 or not mirror:
+            return returncode == 0, output
+
+        command = ["terraform", "providers", "mirror"]
+        for platform in platforms or []:
+            command.append(f"-platform={platform}")
+        command.append(str(provider_mirror_dir()))
+        returncode, output = stream_process(command, work_dir, on_line, env=env)
+        if returncode == 0:
+            write_mirror_cli_config()
+        return returncode == 0, output
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
 def validate_terraform_installation():
     """Validate Terraform installation and raise exception if not found"""
     if not check_terraform_installed():
@@ -10,9 +10,14 @@ setup(
         "click>=8.0.0",
         "jinja2>=3.0.0",
         "pyyaml>=6.0",
-        "azure-cli-core>=2.40.0",
         "colorama>=0.4.0",
     ],
+    extras_require={
+        # Runs az commands in-process instead of spawning the `az` executable
+        "azure": ["azure-cli>=2.40.0"],
+        # Parses directories generated before .fasttrack/generation.json existed
+        "hcl": ["python-hcl2>=4.3.0"],
+    },
     entry_points={
         "console_scripts": [
             "fasttrack=fasttrack_cli.cli:cli",
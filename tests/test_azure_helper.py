@@ -0,0 +1,180 @@
+"""az invoker selection and run_az_command result handling"""
+
+import json
+import logging
+import sys
+import threading
+
+import pytest
+
+from fasttrack_cli.utils import azure_helper
+
+
+class FakeAzCli:
+    """Stands in for azure-cli's default CLI context"""
+
+    def __init__(self, exit_code=0, stdout="", logged=None, error=None, block=None, started=None):
+        self.exit_code = exit_code
+        self.stdout = stdout
+        self.logged = logged
+        self.block = block
+        self.started = started
+        self.result = type("Result", (), {"error": error})()
+        self.calls = []
+
+    def invoke(self, args, out_file):
+        self.calls.append(args)
+        if self.started is not None:
+            self.started.set()
+        if self.block is not None:
+            self.block.wait()
+        out_file.write(self.stdout)
+        if self.logged:
+            # azure-cli reports failures through its "cli.*" loggers
+            logging.getLogger("cli.azure.cli.core").error(self.logged)
+        if self.exit_code == "exit":
+            raise SystemExit(2)
+        return self.exit_code
+
+
+@pytest.fixture(autouse=True)
+def az_state(monkeypatch, tmp_path):
+    """Fresh invoker selection and no real az for every test"""
+    monkeypatch.setenv("FASTTRACK_CACHE_DIR", str(tmp_path))
+    monkeypatch.delenv("FASTTRACK_AZ", raising=False)
+    monkeypatch.delenv("FASTTRACK_AZ_BACKEND", raising=False)
+    monkeypatch.delenv("FASTTRACK_AZ_TIMEOUT", raising=False)
+    monkeypatch.setattr(azure_helper, "_az_invoker", None)
+    monkeypatch.setattr(azure_helper, "_az_cli", None)
+    monkeypatch.setattr(azure_helper, "_inprocess_abandoned", False)
+
+
+def use_fake_cli(monkeypatch, fake):
+    monkeypatch.setattr(azure_helper, "_load_az_cli", lambda: fake)
+
+
+def test_auto_backend_runs_in_process_when_azure_cli_is_installed(monkeypatch):
+    use_fake_cli(monkeypatch, FakeAzCli())
+    assert azure_helper.get_az_invoker() is azure_helper._inprocess_invoker
+
+
+def test_auto_backend_uses_subprocess_without_azure_cli(monkeypatch):
+    use_fake_cli(monkeypatch, None)
+    assert azure_helper.get_az_invoker() is azure_helper._subprocess_invoker
+
+
+def test_inprocess_backend_falls_back_to_subprocess_without_azure_cli(monkeypatch):
+    use_fake_cli(monkeypatch, None)
+    azure_helper.set_az_backend("inprocess")
+    assert azure_helper.get_az_invoker() is azure_helper._subprocess_invoker
+
+
+def test_az_executable_override_selects_subprocess(monkeypatch):
+    use_fake_cli(monkeypatch, FakeAzCli())
+    monkeypatch.setenv("FASTTRACK_AZ", "/opt/az-wrapper")
+    assert azure_helper.get_az_invoker() is azure_helper._subprocess_invoker
+
+
+def test_subprocess_backend_is_honoured(monkeypatch):
+    use_fake_cli(monkeypatch, FakeAzCli())
+    azure_helper.set_az_backend("subprocess")
+    assert azure_helper.get_az_invoker() is azure_helper._subprocess_invoker
+
+
+def test_set_az_invoker_replaces_selection():
+    def invoker(args):
+        return 0, "", ""
+
+    azure_helper.set_az_invoker(invoker)
+    assert azure_helper.get_az_invoker() is invoker
+
+
+def test_run_az_command_parses_json_and_strips_az():
+    seen = []
+
+    def invoker(args):
+        seen.append(args)
+        return 0, json.dumps({"id": "sub-1"}), ""
+
+    azure_helper.set_az_invoker(invoker)
+    assert azure_helper.run_az_command(["az", "account", "show"]) == (True, {"id": "sub-1"}, None)
+    assert seen == [["account", "show"]]
+
+
+@pytest.mark.parametrize("stdout, expected", [
+    ("not json", {"output": "not json"}),
+    ("", {}),
+])
+def test_run_az_command_non_json_output(stdout, expected):
+    azure_helper.set_az_invoker(lambda args: (0, stdout, ""))
+    assert azure_helper.run_az_command(["az", "group", "delete"]) == (True, expected, None)
+
+
+def test_run_az_command_reports_stderr_on_failure():
+    azure_helper.set_az_invoker(lambda args: (1, "", "ERROR: Please run 'az login'"))
+    assert azure_helper.run_az_command(["az", "account", "show"]) == (False, None, "ERROR: Please run 'az login'")
+
+
+def test_run_az_command_describes_failure_without_stderr():
+    azure_helper.set_az_invoker(lambda args: (3, "", ""))
+    success, result, error = azure_helper.run_az_command(["az", "group", "show", "-n", "rg"])
+    assert not success and result is None
+    assert error == "az group show -n rg failed with exit code 3"
+
+
+def test_broken_inprocess_call_falls_back_to_subprocess(monkeypatch):
+    def broken(args):
+        raise RuntimeError("command table failed to load")
+
+    monkeypatch.setattr(azure_helper, "_inprocess_invoker", broken)
+    monkeypatch.setattr(azure_helper, "_subprocess_invoker", lambda args: (0, '{"name": "rg"}', ""))
+    azure_helper.set_az_invoker(broken)
+    assert azure_helper.run_az_command(["az", "group", "show"]) == (True, {"name": "rg"}, None)
+
+
+def test_inprocess_invoker_captures_output_and_logged_errors(monkeypatch):
+    fake = FakeAzCli(exit_code=1, stdout="[]", logged="(AuthorizationFailed) denied")
+    use_fake_cli(monkeypatch, fake)
+    assert azure_helper._inprocess_invoker(["group", "list"]) == (1, "[]", "ERROR: (AuthorizationFailed) denied")
+    assert fake.calls == [["group", "list"]]
+
+
+def test_inprocess_invoker_captures_only_its_own_thread(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    use_fake_cli(monkeypatch, FakeAzCli(exit_code=1, logged="(ResourceNotFound) missing", block=release,
+                                        started=started))
+    stderr_before = sys.stderr
+    results = []
+    caller = threading.Thread(target=lambda: results.append(azure_helper._inprocess_invoker(["group", "show"])))
+    caller.start()
+    assert started.wait(5)
+
+    # Another thread logs while the az call runs; sys.stderr is never swapped
+    logging.getLogger("cli.other").error("fleet worker warning")
+    assert sys.stderr is stderr_before
+    release.set()
+    caller.join()
+    assert results == [(1, "", "ERROR: (ResourceNotFound) missing")]
+
+
+def test_inprocess_invoker_reports_result_error_and_exit_code(monkeypatch):
+    use_fake_cli(monkeypatch, FakeAzCli(exit_code="exit", error="the following arguments are required: --name"))
+    assert azure_helper._inprocess_invoker(["group", "show"]) == (
+        2, "", "the following arguments are required: --name")
+
+
+def test_inprocess_invoker_times_out_and_switches_to_subprocess(monkeypatch):
+    release = threading.Event()
+    use_fake_cli(monkeypatch, FakeAzCli(stdout="{}", block=release))
+    monkeypatch.setenv("FASTTRACK_AZ_TIMEOUT", "0.2")
+    assert azure_helper.get_az_invoker() is azure_helper._inprocess_invoker
+    try:
+        exit_code, stdout, stderr = azure_helper._inprocess_invoker(["account", "show"])
+    finally:
+        release.set()
+    assert (exit_code, stdout) == (-1, "")
+    assert stderr == "az account show timed out after 0.2s"
+    assert azure_helper.get_az_invoker() is azure_helper._subprocess_invoker
+
+    azure_helper.set_az_invoker(None)
+    assert azure_helper.get_az_invoker() is azure_helper._subprocess_invoker
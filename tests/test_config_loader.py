@@ -0,0 +1,107 @@
+"""Layered config files: extends chains, precedence and the layer cache"""
+
+import pytest
+
+from fasttrack_cli.utils import config_loader
+from fasttrack_cli.utils.config_loader import load_layered_config, merge_file_config
+
+
+@pytest.fixture
+def parsed(monkeypatch, tmp_path):
+    """Fresh layer cache; returns the list of files parsed from YAML"""
+    monkeypatch.setenv("FASTTRACK_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.delenv("FASTTRACK_NO_CACHE", raising=False)
+    monkeypatch.setattr(config_loader, "_layer_cache", None)
+    files = []
+    load = config_loader.load_config_file
+
+    def counting_load(config_file):
+        files.append(config_file.rsplit("/", 1)[-1])
+        return load(config_file)
+
+    monkeypatch.setattr(config_loader, "load_config_file", counting_load)
+    return files
+
+
+@pytest.fixture
+def layers(tmp_path):
+    """base <- env/prod <- app, each overriding part of the one it extends"""
+    (tmp_path / "env").mkdir()
+    (tmp_path / "base.yaml").write_text(
+        "location: eastus\nstorage_tier: Standard\ncontainers: [logs]\n"
+        "remote_state:\n  container: tfstate\n  storage_account: basestate\n"
+    )
+    (tmp_path / "env" / "prod.yaml").write_text(
+        "extends: ../base.yaml\nlocation: westeurope\nremote_state:\n  storage_account: prodstate\n"
+    )
+    (tmp_path / "app.yaml").write_text(
+        "extends: env/prod.yaml\nproject_name: app\nresource_group: app-rg\ncontainers: [data, backups]\n"
+    )
+    return tmp_path
+
+
+def test_extends_chain_merges_base_first(parsed, layers):
+    assert load_layered_config([str(layers / "app.yaml")]) == {
+        "project_name": "app",
+        "resource_group": "app-rg",
+        "location": "westeurope",
+        "storage_tier": "Standard",
+        "containers": ["data", "backups"],
+        "remote_state": {"container": "tfstate", "storage_account": "prodstate"},
+    }
+
+
+def test_later_files_override_earlier_ones(parsed, layers):
+    (layers / "override.yaml").write_text("storage_tier: Premium\nextends: base.yaml\n")
+    merged = load_layered_config([str(layers / "app.yaml"), str(layers / "override.yaml")])
+    assert merged["storage_tier"] == "Premium"
+    # base is applied once, at its first position, so it does not undo env/prod
+    assert merged["location"] == "westeurope"
+
+    settings = merge_file_config(merged, {"project_name": "from-cli", "location": "eastus"})
+    assert (settings["project_name"], settings["location"]) == ("from-cli", "westeurope")
+
+
+@pytest.mark.parametrize("files", [
+    {"a.yaml": "extends: b.yaml\n", "b.yaml": "extends: a.yaml\n"},
+    {"a.yaml": "extends: [b.yaml]\n", "b.yaml": "extends: c.yaml\n", "c.yaml": "extends: b.yaml\n"},
+    {"a.yaml": "extends: a.yaml\n"},
+])
+def test_circular_extends_is_rejected(parsed, tmp_path, files):
+    for name, text in files.items():
+        (tmp_path / name).write_text(text)
+    with pytest.raises(ValueError, match="Circular extends"):
+        load_layered_config([str(tmp_path / "a.yaml")])
+
+
+def test_missing_parent_is_an_error(parsed, tmp_path):
+    (tmp_path / "a.yaml").write_text("extends: nowhere.yaml\n")
+    with pytest.raises(OSError):
+        load_layered_config([str(tmp_path / "a.yaml")])
+
+
+def test_layers_are_parsed_once_and_cached_on_disk(parsed, layers, monkeypatch):
+    first = load_layered_config([str(layers / "app.yaml")])
+    assert sorted(parsed) == ["app.yaml", "base.yaml", "prod.yaml"]
+
+    assert load_layered_config([str(layers / "app.yaml")]) == first
+    # A new process starts with an empty memory cache but reads the entries on disk
+    monkeypatch.setattr(config_loader, "_layer_cache", None)
+    assert load_layered_config([str(layers / "app.yaml")]) == first
+    assert len(parsed) == 3
+
+
+def test_changed_parent_layer_invalidates_the_merge(parsed, layers):
+    load_layered_config([str(layers / "app.yaml")])
+    base = layers / "base.yaml"
+    base.write_text(base.read_text().replace("Standard", "Premium"))
+
+    merged = load_layered_config([str(layers / "app.yaml")])
+    assert merged["storage_tier"] == "Premium" and merged["location"] == "westeurope"
+    assert parsed.count("base.yaml") == 2 and parsed.count("app.yaml") == 1
+
+
+def test_cached_merge_is_not_shared_with_callers(parsed, layers):
+    merged = load_layered_config([str(layers / "app.yaml")])
+    merged["remote_state"]["storage_account"] = "changed"
+    assert load_layered_config([str(layers / "app.yaml")])["remote_state"]["storage_account"] == "prodstate"
@@ -0,0 +1,93 @@
+"""Daemon requests: forwarded options, streamed output and timeouts"""
+
+import threading
+from contextlib import contextmanager
+
+import click
+import pytest
+
+from fasttrack_cli.utils import daemon
+from fasttrack_cli.utils.cache import cache_enabled
+
+
+class FakeState:
+    """DaemonState without the template environment"""
+
+
+@contextmanager
+def running_server(path):
+    # Started inside the test: pytest swaps sys.stdout between setup and call,
+    # which would undo the daemon's output routing
+    server = daemon.DaemonServer(path, FakeState())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+@pytest.fixture
+def server(monkeypatch, tmp_path):
+    monkeypatch.delenv("FASTTRACK_NO_CACHE", raising=False)
+    with running_server(tmp_path / "daemon.sock") as server:
+        yield server
+
+
+def add_handler(monkeypatch, name, handler):
+    monkeypatch.setitem(daemon.HANDLERS, name, handler)
+
+
+def test_no_cache_option_applies_to_the_request_only(server, monkeypatch):
+    add_handler(monkeypatch, "cache", lambda state, args: {"cache": cache_enabled()})
+    bypassed = daemon.request(server.path, "cache", options={"no_cache": True}, timeout=5)
+    normal = daemon.request(server.path, "cache", timeout=5)
+    assert bypassed == {"ok": True, "result": {"cache": False}}
+    assert normal == {"ok": True, "result": {"cache": True}}
+
+
+def test_output_streams_to_the_client_not_the_daemon(monkeypatch, tmp_path, capsys):
+    def noisy(state, args):
+        click.echo("Initializing Terraform...")
+        click.secho("⚠️  retrying", err=True)
+        return {}
+
+    add_handler(monkeypatch, "noisy", noisy)
+    received = []
+    with running_server(tmp_path / "daemon.sock") as server:
+        response = daemon.request(server.path, "noisy", timeout=5,
+                                  on_output=lambda text, err: received.append((text, err)))
+        # Without streaming the output is dropped
+        dropped = daemon.request(server.path, "noisy", timeout=5)
+    assert response == dropped == {"ok": True, "result": {}}
+    assert received == [("Initializing Terraform...\n", False), ("⚠️  retrying\n", True)]
+    captured = capsys.readouterr()
+    assert "Initializing" not in captured.out and "retrying" not in captured.err
+
+
+def test_unresponsive_daemon_times_out(server, monkeypatch):
+    release = threading.Event()
+    add_handler(monkeypatch, "stuck", lambda state, args: release.wait() and {})
+    try:
+        assert daemon.request(server.path, "stuck", timeout=0.3) is None
+    finally:
+        release.set()
+
+
+def test_keepalives_hold_long_streaming_requests_open(server, monkeypatch):
+    monkeypatch.setattr(daemon, "KEEPALIVE_INTERVAL", 0.1)
+    done = threading.Event()
+    add_handler(monkeypatch, "slow", lambda state, args: {"finished": done.wait(0.6)} if not done.is_set() else {})
+    response = daemon.request(server.path, "slow", timeout=0.3, on_output=lambda text, err: None)
+    assert response == {"ok": True, "result": {"finished": False}}
+
+
+def test_forward_skips_the_daemon_when_profiling(server, monkeypatch):
+    monkeypatch.setenv("FASTTRACK_SOCKET", str(server.path))
+    monkeypatch.delenv("FASTTRACK_NO_DAEMON", raising=False)
+    monkeypatch.setenv("FASTTRACK_PROFILE", "1")
+    assert daemon.forward("ping", {}) is None
+    monkeypatch.delenv("FASTTRACK_PROFILE")
+    assert daemon.forward("ping", {})["ok"]
@@ -0,0 +1,140 @@
+"""run_command against stub executables that sleep or fail on cue"""
+
+import os
+import threading
+import time
+
+import pytest
+
+from fasttrack_cli.utils import executor
+from fasttrack_cli.utils.executor import cancellation_scope, run_command
+
+
+def stub(tmp_path, name, body):
+    """Write an executable shell script and return its path"""
+    path = tmp_path / name
+    path.write_text("#!/bin/sh\n" + body + "\n")
+    path.chmod(0o755)
+    return str(path)
+
+
+def fails_until(tmp_path, succeed_on, message):
+    """Stub printing message and exiting 1 until its succeed_on-th run"""
+    counter = tmp_path / "count"
+    return stub(tmp_path, "flaky", f"""
+n=$(( $(cat {counter} 2>/dev/null || echo 0) + 1 )); echo $n > {counter}
+if [ $n -lt {succeed_on} ]; then echo "{message}" >&2; exit 1; fi
+echo ok
+""")
+
+
+def alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(executor, "backoff_delay", lambda attempt, output="": 0)
+
+
+def test_success_captures_output(tmp_path):
+    result = run_command([stub(tmp_path, "ok", 'echo out; echo err >&2')])
+    assert result.ok and result.attempts == 1
+    assert (result.stdout, result.stderr) == ("out\n", "err\n")
+
+
+def test_timeout_stops_the_process_group(tmp_path):
+    pid_file = tmp_path / "child.pid"
+    command = stub(tmp_path, "hang", f"sleep 30 & echo $! > {pid_file}; wait")
+    started = time.perf_counter()
+    result = run_command([command], timeout=0.5)
+    assert time.perf_counter() - started < 10
+    assert result.timed_out and result.returncode == -1
+    assert "timed out after 0.5s" in result.stderr
+    child = int(pid_file.read_text())
+    deadline = time.time() + 5
+    while alive(child) and time.time() < deadline:
+        time.sleep(0.05)
+    assert not alive(child)
+
+
+@pytest.mark.parametrize("message, failure", [
+    ("ERROR: (TooManyRequests) Status 429", "throttled"),
+    ("ERROR: 503 ServiceUnavailable", "transient"),
+])
+def test_retryable_failures_are_retried(tmp_path, message, failure):
+    retries = []
+    result = run_command([fails_until(tmp_path, 3, message)], retries=3,
+                         on_retry=lambda kind, attempt, delay: retries.append((kind, attempt)))
+    assert result.ok and result.attempts == 3
+    assert retries == [(failure, 1), (failure, 2)]
+
+
+def test_retries_are_bounded(tmp_path):
+    result = run_command([fails_until(tmp_path, 10, "Too many requests")], retries=2)
+    assert not result.ok
+    assert result.attempts == 3 and result.failure == "throttled"
+
+
+def test_hard_failure_is_not_retried(tmp_path):
+    retries = []
+    result = run_command([fails_until(tmp_path, 3, "ERROR: (AuthorizationFailed) denied")], retries=3,
+                         on_retry=lambda *args: retries.append(args))
+    assert result.returncode == 1 and result.attempts == 1
+    assert result.failure is None and retries == []
+
+
+def test_timed_out_attempts_are_retried(tmp_path):
+    command = stub(tmp_path, "slow_once", f"""
+if [ ! -f {tmp_path}/ran ]; then touch {tmp_path}/ran; sleep 30; fi
+echo done""")
+    result = run_command([command], timeout=0.5, retries=1)
+    assert result.ok and result.attempts == 2
+
+
+def test_process_slots_bound_concurrency(tmp_path, monkeypatch):
+    monkeypatch.setattr(executor, "_process_slots", threading.BoundedSemaphore(2))
+    running = tmp_path / "running"
+    running.mkdir()
+    counts = tmp_path / "counts"
+    command = stub(tmp_path, "count", f"""
+touch {running}/$$; ls {running} | wc -l >> {counts}; sleep 0.3; rm {running}/$$""")
+
+    threads = [threading.Thread(target=run_command, args=([command],)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seen = [int(line) for line in counts.read_text().split()]
+    assert len(seen) == 5 and max(seen) <= 2
+
+
+def test_cancellation_scope_interrupts_and_stays_scoped(tmp_path):
+    event = threading.Event()
+    threading.Timer(0.3, event.set).start()
+    started = time.perf_counter()
+    with cancellation_scope(event):
+        result = run_command([stub(tmp_path, "hang", "sleep 30")], retries=3)
+        assert result.cancelled and result.attempts == 1
+        assert run_command([stub(tmp_path, "never", "echo started")]).cancelled
+    assert time.perf_counter() - started < 10
+
+    # Commands outside the interrupted scope still run
+    assert run_command([stub(tmp_path, "later", "echo fine")]).ok
+
+
+def test_graceful_cancellation_waits_for_a_clean_exit(tmp_path):
+    command = stub(tmp_path, "terraform", """
+trap 'echo state saved; exit 0' INT
+echo running
+while :; do sleep 0.1; done""")
+    event = threading.Event()
+    threading.Timer(0.5, event.set).start()
+    with cancellation_scope(event):
+        result = run_command([command], stream=True, graceful=True)
+    assert result.cancelled and result.returncode == 0
+    assert "state saved" in result.stdout
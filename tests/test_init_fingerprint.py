@@ -0,0 +1,117 @@
+"""terraform init is skipped while providers, backend and lock file are unchanged"""
+
+import json
+import os
+import sys
+
+import pytest
+
+from fasttrack_cli.utils.terraform_helper import init_is_current, record_init, terraform_init
+
+MAIN_TF = """terraform {
+  required_providers {
+    azurerm = {
+      source  = "hashicorp/azurerm"
+      version = "~> 3.0"
+    }
+  }
+}
+
+resource "azurerm_resource_group" "main" {
+  name     = "demo-rg"
+  location = "eastus"
+}
+"""
+
+BACKEND_TF = """terraform {
+  backend "azurerm" {
+    storage_account_name = "demostate"
+    container_name       = "tfstate"
+    key                  = "demo.tfstate"
+  }
+}
+"""
+
+LOCK = """provider "registry.terraform.io/hashicorp/azurerm" {
+  version     = "3.117.0"
+  constraints = "~> 3.0"
+}
+"""
+
+STUB = """#!{python}
+import json, sys
+with open({log!r}, "a") as f:
+    f.write(json.dumps(sys.argv[1:]) + "\\n")
+"""
+
+
+@pytest.fixture
+def work(monkeypatch, tmp_path):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    log = tmp_path / "terraform-calls.log"
+    terraform = bin_dir / "terraform"
+    terraform.write_text(STUB.format(python=sys.executable, log=str(log)))
+    terraform.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FASTTRACK_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setenv("FASTTRACK_RETRIES", "0")
+
+    directory = tmp_path / "work"
+    directory.mkdir()
+    (directory / "main.tf").write_text(MAIN_TF)
+    (directory / "backend.tf").write_text(BACKEND_TF)
+    (directory / ".terraform.lock.hcl").write_text(LOCK)
+    return directory
+
+
+@pytest.fixture
+def full_inits(work, tmp_path):
+    """Number of full (backend) inits the stub terraform has run"""
+    log = tmp_path / "terraform-calls.log"
+
+    def count():
+        if not log.exists():
+            return 0
+        calls = [json.loads(line) for line in log.read_text().splitlines()]
+        return calls.count(["init", "-input=false"])
+    return count
+
+
+def test_unchanged_directory_skips_init(work, full_inits):
+    assert terraform_init(str(work))
+    assert terraform_init(str(work))
+    assert full_inits() == 1
+
+    assert terraform_init(str(work), force=True)
+    assert full_inits() == 2
+
+
+def test_resource_changes_keep_init_current(work):
+    record_init(str(work))
+    (work / "main.tf").write_text(MAIN_TF.replace('"demo-rg"', '"renamed-rg"'))
+    (work / "outputs.tf").write_text('output "rg" {\n  value = azurerm_resource_group.main.name\n}\n')
+    assert init_is_current(str(work))
+
+
+@pytest.mark.parametrize("file_name, old, new", [
+    ("main.tf", '"~> 3.0"', '"~> 4.0"'),
+    ("main.tf", "required_providers {", 'required_providers {\n    random = { source = "hashicorp/random" }'),
+    ("backend.tf", '"demo.tfstate"', '"other.tfstate"'),
+    (".terraform.lock.hcl", '"3.117.0"', '"3.118.0"'),
+])
+def test_init_inputs_force_init(work, full_inits, file_name, old, new):
+    assert terraform_init(str(work))
+    path = work / file_name
+    path.write_text(path.read_text().replace(old, new))
+    assert not init_is_current(str(work))
+    assert terraform_init(str(work))
+    assert full_inits() == 2
+
+
+def test_backend_block_outside_backend_tf_forces_init(work):
+    (work / "backend.tf").unlink()
+    (work / "state.tf").write_text(BACKEND_TF)
+    record_init(str(work))
+    (work / "state.tf").write_text(BACKEND_TF.replace('"azurerm"', '"local"', 1))
+    assert not init_is_current(str(work))
@@ -0,0 +1,108 @@
+"""Cached terraform outputs against a local state file and a stub terraform"""
+
+import json
+import os
+import sys
+
+import pytest
+
+from fasttrack_cli.utils.terraform_helper import OUTPUT_CACHE_FILE, cached_outputs, terraform_output
+
+STUB = """#!{python}
+import json, sys
+with open({log!r}, "a") as f:
+    f.write(json.dumps(sys.argv[1:]) + "\\n")
+if sys.argv[1:] == ["output", "-json"]:
+    with open("terraform.tfstate") as f:
+        state = json.load(f)
+    print(json.dumps({{name: {{"sensitive": o.get("sensitive", False), "type": o["type"], "value": o["value"]}}
+                      for name, o in state["outputs"].items()}}))
+else:
+    sys.exit(1)
+"""
+
+
+class Workspace:
+    """Initialized directory with a local state file"""
+
+    def __init__(self, tmp_path):
+        self.path = tmp_path / "work"
+        (self.path / ".terraform").mkdir(parents=True)
+        self.log = tmp_path / "terraform-calls.log"
+        self.serial = 0
+
+    def write_state(self, **outputs):
+        self.serial += 1
+        (self.path / "terraform.tfstate").write_text(json.dumps({
+            "version": 4,
+            "lineage": "4b1c-lineage",
+            "serial": self.serial,
+            "outputs": outputs,
+        }))
+
+    def fetches(self):
+        return self.log.read_text().count('"output"') if self.log.exists() else 0
+
+    def cache_text(self):
+        return (self.path / OUTPUT_CACHE_FILE).read_text()
+
+
+@pytest.fixture
+def work(monkeypatch, tmp_path):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    workspace = Workspace(tmp_path)
+    terraform = bin_dir / "terraform"
+    terraform.write_text(STUB.format(python=sys.executable, log=str(workspace.log)))
+    terraform.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FASTTRACK_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setenv("FASTTRACK_RETRIES", "0")
+    monkeypatch.delenv("FASTTRACK_NO_CACHE", raising=False)
+    monkeypatch.delenv("FASTTRACK_TERRAFORM_TIMEOUT", raising=False)
+    return workspace
+
+
+def plain(value):
+    return {"type": "string", "value": value}
+
+
+def test_outputs_are_served_from_cache_after_the_first_read(work):
+    work.write_state(resource_group_name=plain("demo-rg"), storage_account_name=plain("demostg"))
+    assert terraform_output(str(work.path), "resource_group_name") == (True, "demo-rg")
+    assert terraform_output(str(work.path), "storage_account_name") == (True, "demostg")
+    success, outputs = cached_outputs(str(work.path))
+    assert success and set(outputs) == {"resource_group_name", "storage_account_name"}
+    assert work.fetches() == 1
+
+
+def test_serial_change_invalidates_the_cache(work):
+    work.write_state(resource_group_name=plain("demo-rg"))
+    assert terraform_output(str(work.path), "resource_group_name") == (True, "demo-rg")
+    work.write_state(resource_group_name=plain("renamed-rg"))
+    assert terraform_output(str(work.path), "resource_group_name") == (True, "renamed-rg")
+    assert work.fetches() == 2
+
+
+def test_sensitive_values_are_never_cached(work):
+    work.write_state(client_id=plain("app-id"),
+                     client_secret={"type": "string", "value": "s3cr3t-value", "sensitive": True})
+    assert terraform_output(str(work.path), "client_id") == (True, "app-id")
+    cache = json.loads(work.cache_text())
+    assert cache["sensitive"] == ["client_secret"] and "client_secret" not in cache["outputs"]
+    assert "s3cr3t-value" not in work.cache_text()
+
+    # Sensitive outputs are always read live
+    assert terraform_output(str(work.path), "client_secret") == (True, "s3cr3t-value")
+    assert terraform_output(str(work.path), "client_id") == (True, "app-id")
+    assert work.fetches() == 2
+    assert "s3cr3t-value" not in work.cache_text()
+
+
+def test_legacy_cache_without_sensitive_names_is_ignored(work):
+    work.write_state(resource_group_name=plain("demo-rg"))
+    (work.path / OUTPUT_CACHE_FILE).write_text(json.dumps({
+        "backend": "local", "state": ["4b1c-lineage", 1], "outputs": {"resource_group_name": plain("stale")},
+    }))
+    assert terraform_output(str(work.path), "resource_group_name") == (True, "demo-rg")
+    assert work.fetches() == 1
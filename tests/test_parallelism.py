@@ -0,0 +1,104 @@
+"""Parallelism sizing, throttling detection and the learned ceiling"""
+
+import json
+import time
+
+import pytest
+
+from fasttrack_cli.utils import parallelism
+from fasttrack_cli.utils.parallelism import (
+    CEILING_FILE, MAX_PARALLELISM, MIN_PARALLELISM, OutputWatcher, ThrottleController, auto_parallelism,
+)
+
+
+@pytest.mark.parametrize("resources, concurrency, expected", [
+    (0, 1, 10),
+    (80, 1, 10),
+    (200, 1, 25),
+    (10000, 1, MAX_PARALLELISM),
+    (10000, 4, 16),
+    (10000, 100, MIN_PARALLELISM),
+    (0, 32, MIN_PARALLELISM),
+    (0, 2, 10),
+])
+def test_auto_parallelism_clamps(resources, concurrency, expected):
+    assert auto_parallelism(resources, concurrency) == expected
+
+
+def watch(*lines):
+    watcher = OutputWatcher()
+    for line in lines:
+        watcher(line)
+    return watcher
+
+
+@pytest.mark.parametrize("lines", [
+    ["│ Error: creating Storage Container: unexpected status 429 (429 Too Many Requests)"],
+    ["Error: retrieving Resource Group: StatusCode=429"],
+    ["│ Error: creating Storage Account", "│", "│ TooManyRequests: retry after 30 seconds"],
+    ["2026-10-17T10:00:00 [DEBUG] provider: RetryableError: StatusCode=429"],
+])
+def test_diagnostics_reporting_throttling_are_counted(lines):
+    watcher = watch(*lines)
+    assert watcher.throttled == 1
+    assert watcher.last_throttle == lines[-1]
+
+
+@pytest.mark.parametrize("lines", [
+    ['  + resource "azurerm_storage_container" "containers" {', '      + name = "throttle-429-logs"'],
+    ['      + name = "TooManyRequests"'],
+    ["│ Error: Invalid value", "│", '│   on main.tf line 429, in resource "x" "y":',
+     '│  429:   name = "TooManyRequests"'],
+    ["Plan: 429 to add, 0 to change, 0 to destroy."],
+    ['azurerm_storage_container.containers["429"]: Creating...'],
+])
+def test_configuration_values_are_not_throttling(lines):
+    assert watch(*lines).throttled == 0
+
+
+def test_plan_summary_is_recorded():
+    assert watch("No changes.").planned_changes is None
+    assert watch("\x1b[1mPlan:\x1b[0m 3 to add, 1 to change, 2 to destroy.").planned_changes == 6
+
+
+@pytest.fixture
+def cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv("FASTTRACK_CACHE_DIR", str(tmp_path))
+    monkeypatch.delenv("FASTTRACK_NO_CACHE", raising=False)
+    return tmp_path
+
+
+def test_throttling_halves_and_persists_the_ceiling(cache_dir):
+    controller = ThrottleController()
+    assert controller.ceiling is None and controller.limit(40) == 40
+    assert controller.throttled(40) == 20
+    assert controller.throttled(40) == 20
+    assert controller.throttled(3) == MIN_PARALLELISM
+
+    # The next command starts from the saved ceiling
+    assert ThrottleController().limit(40) == MIN_PARALLELISM
+
+
+def test_ceiling_rises_after_unthrottled_runs_and_lifts(cache_dir):
+    controller = ThrottleController()
+    controller.throttled(90)
+    assert controller.ceiling == 45
+    controller.succeeded(10)
+    assert controller.ceiling == 45
+    controller.succeeded(45)
+    assert controller.ceiling == 47
+    controller.succeeded(47)
+    controller.succeeded(49)
+    assert controller.ceiling is None
+    assert ThrottleController().ceiling is None
+
+
+def test_saved_ceiling_expires(cache_dir):
+    (cache_dir / CEILING_FILE).write_text(json.dumps({"ceiling": 4, "expires": time.time() - 1}))
+    assert ThrottleController().ceiling is None
+
+
+def test_ceiling_is_not_persisted_without_the_cache(cache_dir, monkeypatch):
+    monkeypatch.setattr(parallelism, "cache_enabled", lambda: False)
+    ThrottleController().throttled(20)
+    assert not (cache_dir / CEILING_FILE).exists()
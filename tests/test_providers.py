@@ -0,0 +1,139 @@
+"""Provider requirements, the shared plugin cache and the local mirror"""
+
+import pytest
+
+from fasttrack_cli.utils import terraform_helper
+from fasttrack_cli.utils.terraform_helper import (
+    init_env, install_providers, mirror_serves, provider_requirements, version_satisfies,
+)
+
+PLATFORM = "linux_amd64"
+
+MAIN_TF = """terraform {
+  required_providers {
+    azurerm = {
+      source  = "hashicorp/azurerm"
+      version = "~> 3.0"
+    }
+    time = {
+      source = "hashicorp/time"
+    }
+    random = ">= 3.5, != 3.6.0"
+  }
+}
+
+resource "azurerm_resource_group" "main" {
+  name     = "demo-rg"
+  location = "eastus"
+}
+"""
+
+LOCK = """provider "registry.terraform.io/hashicorp/azurerm" {
+  version     = "3.117.0"
+  constraints = "~> 3.0"
+  hashes = [
+    "h1:abc=",
+  ]
+}
+"""
+
+AZURERM = "registry.terraform.io/hashicorp/azurerm"
+TIME = "registry.terraform.io/hashicorp/time"
+RANDOM = "registry.terraform.io/hashicorp/random"
+
+
+@pytest.mark.parametrize("version, constraints, expected", [
+    ("3.117.0", "", True),
+    ("3.117.0", "~> 3.0", True),
+    ("4.0.0", "~> 3.0", False),
+    ("2.99.0", "~> 3.0", False),
+    ("3.1.9", "~> 3.1.2", True),
+    ("3.2.0", "~> 3.1.2", False),
+    ("1.9.0", "~> 1", True),
+    ("2.0.0", "~> 1", False),
+    ("3.6.0", ">= 3.5, != 3.6.0", False),
+    ("3.6.1", ">= 3.5, != 3.6.0", True),
+    ("0.9.1", "< 0.10", True),
+    ("0.10.0", "<= 0.9.1", False),
+    ("3.117.0", "3.117.0", True),
+    ("3.117.0", "= 3.116.0", False),
+    ("4.0.0-beta1", ">= 3.0", False),
+    ("3.117.0", "=> 3.0", False),
+])
+def test_version_constraints(version, constraints, expected):
+    assert version_satisfies(version, constraints) is expected
+
+
+@pytest.fixture
+def work(monkeypatch, tmp_path):
+    monkeypatch.setattr(terraform_helper, "_terraform_platform", lambda: PLATFORM)
+    monkeypatch.setenv("FASTTRACK_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.delenv("TF_PLUGIN_CACHE_DIR", raising=False)
+    monkeypatch.delenv("TF_CLI_CONFIG_FILE", raising=False)
+    monkeypatch.delenv("FASTTRACK_PROVIDER_MIRROR", raising=False)
+    directory = tmp_path / "work"
+    directory.mkdir()
+    (directory / "main.tf").write_text(MAIN_TF)
+    return directory
+
+
+def cache_provider(source, version, platform=PLATFORM):
+    (terraform_helper.plugin_cache_dir() / source / version / platform).mkdir(parents=True)
+
+
+def mirror_provider(source, version):
+    provider_dir = terraform_helper.provider_mirror_dir() / source
+    provider_dir.mkdir(parents=True, exist_ok=True)
+    (provider_dir / f"terraform-provider-{source.rsplit('/', 1)[-1]}_{version}_{PLATFORM}.zip").write_bytes(b"")
+
+
+def test_requirements_come_from_the_lock_file_or_the_configuration(work):
+    assert provider_requirements(str(work)) == {AZURERM: "~> 3.0", TIME: "", RANDOM: ">= 3.5, != 3.6.0"}
+    (work / ".terraform.lock.hcl").write_text(LOCK)
+    assert provider_requirements(str(work)) == {AZURERM: "= 3.117.0"}
+
+
+def install(work):
+    runs = []
+    success, _ = install_providers(str(work), lambda command: runs.append(command) or (True, ""))
+    return success, runs
+
+
+def test_install_is_skipped_when_the_cache_meets_the_constraints(work):
+    cache_provider(AZURERM, "3.116.0")
+    cache_provider(TIME, "0.9.1")
+    cache_provider(RANDOM, "3.6.0")
+    cache_provider(RANDOM, "3.6.2", "darwin_arm64")
+    # random has no usable version: 3.6.0 is excluded, 3.6.2 is another platform
+    assert install(work) == (True, [["terraform", "init", "-input=false", "-backend=false"]])
+
+    cache_provider(RANDOM, "3.6.2")
+    assert install(work) == (True, [])
+
+
+def test_install_follows_the_locked_version(work):
+    (work / ".terraform.lock.hcl").write_text(LOCK)
+    cache_provider(AZURERM, "3.116.0")
+    assert install(work)[1] != []
+    cache_provider(AZURERM, "3.117.0")
+    assert install(work) == (True, [])
+
+
+def test_stale_mirror_falls_back_to_the_registry(work):
+    (work / ".terraform.lock.hcl").write_text(LOCK)
+    terraform_helper.write_mirror_cli_config()
+    mirror_provider(AZURERM, "3.116.0")
+    assert not mirror_serves(str(work))
+    env, stale = init_env(str(work))
+    assert stale and "TF_CLI_CONFIG_FILE" not in env
+
+    mirror_provider(AZURERM, "3.117.0")
+    env, stale = init_env(str(work))
+    assert not stale and env["TF_CLI_CONFIG_FILE"] == str(terraform_helper.mirror_cli_config_file())
+
+
+def test_mirror_is_not_consulted_when_turned_off(work, monkeypatch):
+    terraform_helper.write_mirror_cli_config()
+    monkeypatch.setenv("FASTTRACK_PROVIDER_MIRROR", "0")
+    env, stale = init_env(str(work))
+    assert not stale and "TF_CLI_CONFIG_FILE" not in env
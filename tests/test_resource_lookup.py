@@ -0,0 +1,136 @@
+"""Batched resource existence lookups against a stub az returning canned JSON"""
+
+import json
+import sys
+
+import pytest
+
+from fasttrack_cli.utils import azure_helper
+from fasttrack_cli.utils.azure_helper import resource_key, resources_exist
+
+SUBSCRIPTION = {"id": "sub-1", "tenantId": "tenant-1", "name": "Test"}
+
+RG_ID = "/subscriptions/sub-1/resourceGroups/Demo-RG"
+SA_ID = "/subscriptions/sub-1/resourceGroups/Demo-RG/providers/Microsoft.Storage/storageAccounts/DemoStg"
+
+RG_ROW = {"id": RG_ID, "name": "Demo-RG", "type": "microsoft.resources/subscriptions/resourcegroups",
+          "resourceGroup": "Demo-RG"}
+SA_ROW = {"id": SA_ID, "name": "DemoStg", "type": "Microsoft.Storage/storageAccounts", "resourceGroup": "Demo-RG"}
+
+STUB = """#!{python}
+import json, sys
+args = sys.argv[1:]
+with open({log!r}, "a") as f:
+    f.write(json.dumps(args) + "\\n")
+with open({config!r}) as f:
+    config = json.load(f)
+
+if args[:2] == ["account", "show"]:
+    print(json.dumps(config["account"]))
+elif args[:2] == ["graph", "query"]:
+    if config["graph"] == "fail":
+        sys.stderr.write("ERROR: 'graph' is misspelled or not recognized by the system.\\n")
+        sys.exit(2)
+    page = int(args[args.index("--skip-token") + 1]) if "--skip-token" in args else 0
+    print(json.dumps(config["graph"][page]))
+elif "show" in args:
+    name = args[args.index("--name") + 1]
+    if name not in config["show"]:
+        sys.stderr.write("ERROR: (ResourceNotFound) not found\\n")
+        sys.exit(3)
+    print(json.dumps(config["show"][name]))
+else:
+    sys.exit(1)
+"""
+
+
+class StubAz:
+    """Stub az executable configured with canned responses"""
+
+    def __init__(self, tmp_path):
+        self.config_file = tmp_path / "az-config.json"
+        self.log_file = tmp_path / "az-calls.log"
+        self.path = tmp_path / "az"
+        self.path.write_text(STUB.format(python=sys.executable, log=str(self.log_file),
+                                         config=str(self.config_file)))
+        self.path.chmod(0o755)
+        self.configure()
+
+    def configure(self, graph=None, show=None):
+        self.config_file.write_text(json.dumps({"account": SUBSCRIPTION, "graph": graph or [{"data": []}],
+                                                "show": show or {}}))
+
+    def calls(self, *prefix):
+        if not self.log_file.exists():
+            return []
+        calls = [json.loads(line) for line in self.log_file.read_text().splitlines()]
+        return [args for args in calls if args[:len(prefix)] == list(prefix)]
+
+
+@pytest.fixture
+def az(monkeypatch, tmp_path):
+    stub = StubAz(tmp_path)
+    monkeypatch.setenv("FASTTRACK_AZ", str(stub.path))
+    monkeypatch.setenv("FASTTRACK_AZ_BACKEND", "subprocess")
+    monkeypatch.setenv("FASTTRACK_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setenv("AZURE_CONFIG_DIR", str(tmp_path / "azure"))
+    monkeypatch.setenv("FASTTRACK_RETRIES", "0")
+    monkeypatch.delenv("FASTTRACK_NO_CACHE", raising=False)
+    monkeypatch.setattr(azure_helper, "_az_invoker", None)
+    monkeypatch.setattr(azure_helper, "_session_cache", None)
+    return stub
+
+
+RG = resource_key("resource_group", "demo-rg")
+SA = resource_key("storage_account", "demostg", "demo-rg")
+MISSING = resource_key("storage_account", "nosuchstg", "demo-rg")
+
+
+def test_data_response_matches_case_insensitively(az):
+    az.configure(graph=[{"data": [RG_ROW, SA_ROW]}])
+    assert resources_exist([RG, SA, MISSING]) == {RG: RG_ID, SA: SA_ID, MISSING: None}
+    query = az.calls("graph", "query")
+    assert len(query) == 1
+    assert "'demostg', 'nosuchstg'" in query[0][query[0].index("-q") + 1]
+
+
+def test_bare_list_response(az):
+    az.configure(graph=[[RG_ROW, SA_ROW]])
+    assert resources_exist([RG, SA]) == {RG: RG_ID, SA: SA_ID}
+
+
+def test_skip_token_paging(az):
+    az.configure(graph=[{"data": [RG_ROW], "skip_token": "1"}, {"data": [SA_ROW]}])
+    assert resources_exist([RG, SA]) == {RG: RG_ID, SA: SA_ID}
+    pages = az.calls("graph", "query")
+    assert len(pages) == 2
+    assert "--skip-token" not in pages[0] and pages[1][pages[1].index("--skip-token") + 1] == "1"
+
+
+def test_falls_back_to_show_when_graph_fails(az):
+    az.configure(graph="fail", show={"demo-rg": RG_ID, "demostg": SA_ID})
+    assert resources_exist([RG, SA, MISSING]) == {RG: RG_ID, SA: SA_ID, MISSING: None}
+    assert len(az.calls("group", "show")) == 1
+    assert len(az.calls("storage", "account", "show")) == 2
+
+
+def test_one_graph_call_for_many_keys_and_cached_wrappers(az):
+    names = [f"stg{i}" for i in range(5)]
+    rows = [dict(SA_ROW, name=name, id=f"{SA_ID[:-7]}{name}") for name in names]
+    az.configure(graph=[{"data": [RG_ROW] + rows}])
+    keys = [RG] + [resource_key("storage_account", name, "demo-rg") for name in names]
+    assert all(resources_exist(keys).values())
+    assert len(az.calls("graph", "query")) == 1
+
+    # The thin wrappers are answered from the session cache
+    assert azure_helper.resource_group_exists("Demo-RG")
+    assert azure_helper.storage_account_exists("stg3", "demo-rg")
+    assert len(az.calls("graph", "query")) == 1
+    assert len(az.calls("account", "show")) == 1
+
+
+def test_wrapper_lookup_is_a_single_graph_call(az):
+    az.configure(graph=[{"data": []}])
+    assert not azure_helper.storage_account_exists("nosuchstg", "demo-rg")
+    assert len(az.calls("graph", "query")) == 1
+    assert az.calls("storage") == []
@@ -0,0 +1,96 @@
+"""Config file and resolved configuration validation"""
+
+import pytest
+
+from fasttrack_cli.utils.schema import (
+    format_errors, unknown_file_fields, validate_file_config, validate_files,
+)
+
+VALID = {
+    "project_name": "demo",
+    "resource_group": "demo-rg",
+    "storage_account": "demostg",
+    "containers": ["logs", "data"],
+}
+
+
+def errors_for(**overrides):
+    return validate_file_config(dict(VALID, **overrides))
+
+
+def test_valid_config_has_no_errors():
+    assert errors_for() == []
+
+
+def test_errors_are_aggregated_with_their_paths():
+    errors = errors_for(storage_account="Demo_Stg", containers=["logs", "Bad_Name", "logs"],
+                        enable_remote_state=True, remote_state={"container": "tfstate"})
+    assert errors == [
+        ("storage_account", "must be lowercase alphanumeric only"),
+        ("containers", "duplicate entries: logs"),
+        ("remote_state.storage_account", "is required when enable_remote_state is set"),
+    ]
+    assert format_errors(errors).count("; ") == 2
+
+
+def test_file_errors_are_reported_before_resolving():
+    assert errors_for(storage_tier="Gold", secret_rotation_months=True, containers="logs") == [
+        ("containers", "must be a list"),
+        ("storage_tier", "must be one of: Standard, Premium"),
+        ("secret_rotation_months", "must be an integer"),
+    ]
+
+
+@pytest.mark.parametrize("name, valid", [
+    ("logs", True),
+    ("abc", True),
+    ("tf-state-01", True),
+    ("a" * 63, True),
+    ("ab", False),
+    ("a" * 64, False),
+    ("Logs", False),
+    ("-logs", False),
+    ("logs-", False),
+    ("log--s", False),
+    ("log_s", False),
+])
+def test_container_name_rules(name, valid):
+    errors = errors_for(containers=["data", name])
+    assert (errors == []) is valid
+    if not valid:
+        assert errors == [("containers[1]", "must be 3-63 lowercase letters, digits or single hyphens")]
+
+
+@pytest.mark.parametrize("mode, errors", [
+    ("for_each", []),
+    ("indexed", [("migrate_indexed_containers", "requires container_mode 'for_each'")]),
+    (None, [("migrate_indexed_containers", "requires container_mode 'for_each'")]),
+])
+def test_migrating_containers_requires_for_each(mode, errors):
+    overrides = {"migrate_indexed_containers": True}
+    if mode:
+        overrides["container_mode"] = mode
+    assert errors_for(**overrides) == errors
+
+
+def test_unknown_keys_are_warnings_unless_strict():
+    remote_state = {"storage_account": "demostate", "container": "tfstate", "key": "demo.tfstate", "kee": "x"}
+    config = dict(VALID, storage_teir="Premium", remote_state=remote_state)
+    unknown = [("storage_teir", "unknown field"), ("remote_state.kee", "unknown field")]
+    assert validate_file_config(config) == []
+    assert unknown_file_fields(config) == unknown
+    assert validate_file_config(config, strict=True) == unknown
+
+
+def test_validate_files_reports_warnings_and_load_failures(tmp_path):
+    good = tmp_path / "good.yaml"
+    good.write_text("project_name: demo\nresource_group: demo-rg\nlocation_name: westeurope\n")
+    broken = tmp_path / "broken.yaml"
+    broken.write_text("project_name: [unclosed\n")
+
+    results = validate_files([good, broken])
+    assert results[str(good)] == ([], [("location_name", "unknown field")])
+    errors, warnings = results[str(broken)]
+    assert errors[0][0] == "<file>" and warnings == []
+
+    assert validate_files([good], strict=True)[str(good)] == ([("location_name", "unknown field")], [])
@@ -0,0 +1,16 @@
+"""CLI import stays cheap (see benchmarks/startup.py)"""
+
+import os
+import subprocess
+import sys
+
+STARTUP_BENCHMARK = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                 "benchmarks", "startup.py")
+
+
+def test_cli_import_is_lazy_and_within_budget():
+    # Generous budget: this guards against heavy imports creeping back in,
+    # not against noise on a loaded machine
+    result = subprocess.run([sys.executable, STARTUP_BENCHMARK, "--budget", "500", "--runs", "3"],
+                            capture_output=True, text=True, check=False)
+    assert result.returncode == 0, result.stdout + result.stderr
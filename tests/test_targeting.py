@@ -0,0 +1,83 @@
+"""Targeted plan addresses from configuration changes"""
+
+import pytest
+
+from fasttrack_cli.utils.config_loader import build_config
+from fasttrack_cli.utils.generation import record_applied, record_destroyed
+from fasttrack_cli.utils.targeting import STRUCTURAL_KEYS, affected_addresses, plan_targets
+from fasttrack_cli.utils.template_generator import TerraformTemplateGenerator
+
+
+def storage_config(containers, mode="indexed", **settings):
+    return build_config(dict({
+        "project_name": "demo",
+        "resource_group": "demo-rg",
+        "storage_account": "demostg",
+        "containers": containers,
+        "container_mode": mode,
+    }, **settings))
+
+
+def indexed(n):
+    return f"azurerm_storage_container.container_{n}"
+
+
+def keyed(name):
+    return f'azurerm_storage_container.containers["{name}"]'
+
+
+@pytest.mark.parametrize("old, new, mode, expected", [
+    (["logs"], ["logs", "data"], "indexed", [indexed(2)]),
+    (["logs", "data", "backups"], ["data", "backups"], "indexed", [indexed(1), indexed(2), indexed(3)]),
+    (["logs", "data", "backups"], ["logs", "data"], "indexed", [indexed(3)]),
+    (["logs"], ["logs", "data"], "for_each", [keyed("data")]),
+    (["logs", "data", "backups"], ["data", "backups"], "for_each", [keyed("logs")]),
+])
+def test_container_changes_target_only_affected_containers(old, new, mode, expected):
+    targets, description = affected_addresses(storage_config(old, mode), storage_config(new, mode))
+    assert targets == sorted(expected)
+    assert description == "storage_containers"
+
+
+def test_keyed_settings_target_their_resources():
+    targets, _ = affected_addresses(storage_config(["logs"]), storage_config(["logs"], storage_tier="Premium"))
+    assert targets == ["azurerm_storage_account.main"]
+
+
+@pytest.mark.parametrize("key", sorted(STRUCTURAL_KEYS))
+def test_structural_change_needs_a_full_plan(key):
+    old = storage_config(["logs"])
+    new = dict(old, **{key: "changed"})
+    assert affected_addresses(old, new) == (None, f"{key} changed")
+
+
+@pytest.fixture
+def generated(monkeypatch, tmp_path):
+    """Directory generated, applied, then regenerated with one more container"""
+    monkeypatch.setenv("FASTTRACK_CACHE_DIR", str(tmp_path / "cache"))
+    out = tmp_path / "out"
+    generator = TerraformTemplateGenerator(bytecode_cache=False)
+    generator.generate(str(out), storage_config(["logs"], "for_each"), quiet=True)
+    record_applied(str(out))
+    generator.generate(str(out), storage_config(["logs", "data"], "for_each"), quiet=True)
+    return out
+
+
+def test_plan_targets_new_container(generated):
+    assert plan_targets(str(generated)) == ([keyed("data")], "storage_containers")
+
+
+def test_destroy_needs_a_full_plan(generated):
+    record_destroyed(str(generated))
+    assert plan_targets(str(generated)) == (None, "resources were destroyed since the last apply")
+
+
+def test_unmanaged_terraform_file_needs_a_full_plan(generated):
+    (generated / "imports.tf").write_text('import {\n  to = azurerm_resource_group.main\n  id = "x"\n}\n')
+    assert plan_targets(str(generated)) == (None, "imports.tf not written by generate")
+
+
+def test_edited_generated_file_needs_a_full_plan(generated):
+    with open(generated / "main.tf", "a") as f:
+        f.write("\n# local edit\n")
+    assert plan_targets(str(generated)) == (None, "main.tf was edited")
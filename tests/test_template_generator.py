@@ -0,0 +1,64 @@
+"""Generated moved.tf when switching containers from indexed to for_each"""
+
+import click
+import pytest
+
+from fasttrack_cli.utils.config_loader import build_config
+from fasttrack_cli.utils.template_generator import TerraformTemplateGenerator
+
+
+@pytest.fixture
+def generator(monkeypatch, tmp_path):
+    monkeypatch.setenv("FASTTRACK_CACHE_DIR", str(tmp_path / "cache"))
+    return TerraformTemplateGenerator(bytecode_cache=False)
+
+
+def storage_config(containers, mode="indexed", migrate=False):
+    return build_config({
+        "project_name": "demo",
+        "resource_group": "demo-rg",
+        "storage_account": "demostg",
+        "containers": containers,
+        "container_mode": mode,
+        "migrate_indexed_containers": migrate,
+    })
+
+
+def test_moves_follow_the_indexed_generation_order(generator, tmp_path):
+    out = tmp_path / "out"
+    generator.generate(str(out), storage_config(["logs", "data", "backups"]), quiet=True)
+    generator.generate(str(out), storage_config(["backups", "logs", "data"], "for_each", migrate=True), quiet=True)
+
+    moved = (out / "moved.tf").read_text()
+    assert 'container_1\n  to   = azurerm_storage_container.containers["logs"]' in moved
+    assert 'container_2\n  to   = azurerm_storage_container.containers["data"]' in moved
+    assert 'container_3\n  to   = azurerm_storage_container.containers["backups"]' in moved
+
+
+def test_regenerating_the_migration_keeps_the_moves(generator, tmp_path):
+    out = tmp_path / "out"
+    migrated = storage_config(["logs", "data"], "for_each", migrate=True)
+    generator.generate(str(out), storage_config(["logs", "data"]), quiet=True)
+    generator.generate(str(out), migrated, quiet=True)
+    first = (out / "moved.tf").read_text()
+    generator.generate(str(out), migrated, quiet=True, force=True)
+    assert (out / "moved.tf").read_text() == first
+
+
+@pytest.mark.parametrize("previous", [["logs"], ["logs", "data", "archive"]])
+def test_refuses_to_migrate_changed_containers(generator, tmp_path, previous):
+    out = tmp_path / "out"
+    generator.generate(str(out), storage_config(previous), quiet=True)
+    with pytest.raises(click.ClickException, match="different containers"):
+        generator.generate(str(out), storage_config(["logs", "data"], "for_each", migrate=True), quiet=True)
+    assert not (out / "moved.tf").exists()
+
+
+def test_refuses_to_migrate_without_an_indexed_generation(generator, tmp_path):
+    out = tmp_path / "out"
+    with pytest.raises(click.ClickException, match="no recorded indexed generation"):
+        generator.generate(str(out), storage_config(["logs"], "for_each", migrate=True), quiet=True)
+
+    generator.generate(str(out), storage_config(["logs"], "for_each"), quiet=True)
+    with pytest.raises(click.ClickException, match="no recorded indexed generation"):
+        generator.generate(str(out), storage_config(["logs"], "for_each", migrate=True), quiet=True)